@@ -20,25 +20,48 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass, field
+from time import monotonic
 from typing import Any, Dict, List, Optional, Sequence
 
 from anthropic import APIError, Anthropic
 from dotenv import load_dotenv
 
+from robot_Driver_Playwright.admission import AdmissionController
+from robot_Driver_Playwright.llm_client import LLMCallPolicy, LLMUnavailableError, ResilientAnthropicClient
+from robot_Driver_Playwright.model_router import (
+    DEFAULT_SMALL_MODEL,
+    ESCALATE_BAD_STRATEGY,
+    ESCALATE_INVALID_JSON,
+    ESCALATE_KEYWORD_NOT_IN_CATALOG,
+    ESCALATE_MISSING_KEYWORD,
+    ModelRouter,
+)
+from robot_Driver_Playwright.prompt_builder import CatalogPrompt, CatalogPromptBuilder
 from robot_Driver_Playwright.my_robot_driver import (
-    ALLOWED_STRATEGIES,
     STRATEGY_MATCH,
     STRATEGY_MAX_PRICE,
     STRATEGY_MIN_PRICE,
     RobotDriver,
     RobotDriverResult,
 )
+from robot_Driver_Playwright.intent_router import (
+    MAX_PRICE_CUES,
+    MIN_PRICE_CUES,
+    IntentRouter,
+    RoutingDecision,
+)
 
 DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
 
+# Strategies the planner may choose; the rest need selection params it does not produce.
+PLANNER_STRATEGIES = (STRATEGY_MATCH, STRATEGY_MIN_PRICE, STRATEGY_MAX_PRICE)
+# Strategies that can pick from the whole catalog when no keyword is given.
+KEYWORDLESS_STRATEGIES = (STRATEGY_MIN_PRICE, STRATEGY_MAX_PRICE)
+
 SYSTEM_PROMPT = (
     "You are an AI planning assistant for a Playwright automation agent. "
-    "Given a user's goal and a limited snapshot of the current product catalog, "
+    "Given a user's goal and a limited snapshot of the current product catalog "
+    "(title|price rows, most relevant first), "
     "produce a JSON object with the following keys: "
     "product_keyword (string), selection_strategy (match|min_price|max_price), "
     "reasoning (string explanation), and steps (array of short action summaries). "
@@ -61,6 +84,10 @@ class AIExecutionPlan:
     reasoning: str = ""
     source: str = "claude"
     raw_response: Optional[Any] = None
+    routing: Optional[Dict[str, Any]] = None
+    model: Optional[str] = None
+    escalations: List[str] = field(default_factory=list)
+    prompt: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -71,6 +98,10 @@ class AIExecutionPlan:
             "reasoning": self.reasoning,
             "source": self.source,
             "raw_response": self.raw_response,
+            "routing": self.routing,
+            "model": self.model,
+            "escalations": self.escalations,
+            "prompt": self.prompt,
         }
 
 
@@ -81,10 +112,12 @@ class AIGoalExecution:
     plan: AIExecutionPlan
     catalog: List[Dict[str, Any]]
     result: RobotDriverResult
+    queue_seconds: float = 0.0
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "plan": self.plan.to_dict(),
+            "queue_seconds": self.queue_seconds,
             "catalog_sample": [
                 {"title": item.get("title"), "price": item.get("price_text")}
                 for item in self.catalog
@@ -109,17 +142,27 @@ class AIPlaywrightBrain:
         anthropic_client: Optional[Anthropic] = None,
         model: str = DEFAULT_MODEL,
         timeout_ms: int = 10_000,
+        intent_router: Optional[IntentRouter] = None,
+        admission: Optional[AdmissionController] = None,
+        llm_policy: Optional[LLMCallPolicy] = None,
+        model_router: Optional[ModelRouter] = None,
+        prompt_builder: Optional[CatalogPromptBuilder] = None,
     ) -> None:
         load_dotenv()
         api_key = os.getenv("ANTHROPIC_API_KEY")
-        if anthropic_client is not None:
-            self._client = anthropic_client
-        elif api_key:
-            self._client = Anthropic(api_key=api_key)
-        else:
-            self._client = None
+        client: Optional[Any] = anthropic_client
+        if client is None and api_key:
+            client = Anthropic(api_key=api_key)
+        if client is not None and not isinstance(client, ResilientAnthropicClient):
+            client = ResilientAnthropicClient(client, llm_policy)
+        self._client: Optional[ResilientAnthropicClient] = client
         self.model = model
+        # Plans start on the small model and escalate to ``model`` when invalid.
+        self.model_router = model_router or ModelRouter([DEFAULT_SMALL_MODEL, model])
+        self.prompt_builder = prompt_builder or CatalogPromptBuilder()
         self.timeout_ms = timeout_ms
+        self.intent_router = intent_router or IntentRouter()
+        self.admission = admission
 
     # ------------------------------------------------------------------
     # Public API
@@ -130,10 +173,11 @@ class AIPlaywrightBrain:
         goal: str,
         url: str,
         headless: bool = True,
+        task_id: Optional[str] = None,
     ) -> AIGoalExecution:
         """Run the AI planning flow end-to-end."""
 
-        catalog_driver = self._new_driver()
+        catalog_driver = self._new_driver(task_id)
         try:
             catalog = catalog_driver.collect_catalog_snapshot(
                 url,
@@ -147,7 +191,7 @@ class AIPlaywrightBrain:
 
         plan = self._build_plan(goal=goal, catalog=catalog)
 
-        executor_driver = self._new_driver()
+        executor_driver = self._new_driver(task_id)
         result = executor_driver.run_complete_task(
             url=url,
             product_name=plan.product_keyword,
@@ -155,48 +199,94 @@ class AIPlaywrightBrain:
             selection_strategy=plan.selection_strategy,
         )
 
-        return AIGoalExecution(plan=plan, catalog=catalog, result=result)
+        return AIGoalExecution(
+            plan=plan,
+            catalog=catalog,
+            result=result,
+            queue_seconds=round(catalog_driver.last_queue_seconds + result.queue_seconds, 3),
+        )
+
+    def llm_stats(self) -> Dict[str, Any]:
+        """Circuit breaker state, call counters, latency and model tiering of the LLM client."""
+
+        if self._client is None:
+            return {"configured": False}
+        return {"configured": True, **self._client.stats(), "routing": self.model_router.stats()}
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _new_driver(self) -> RobotDriver:
-        return RobotDriver(timeout_ms=self.timeout_ms)
+    def _new_driver(self, task_id: Optional[str] = None) -> RobotDriver:
+        return RobotDriver(timeout_ms=self.timeout_ms, task_id=task_id, admission=self.admission)
 
     def _build_plan(self, *, goal: str, catalog: List[Dict[str, Any]]) -> AIExecutionPlan:
+        decision = self.intent_router.route(goal, catalog)
+        if decision.is_local:
+            plan = self._routed_plan(goal, catalog, decision)
+        else:
+            plan = self._build_llm_plan(goal=goal, catalog=catalog)
+        decision.resolved_by = plan.source
+        decision.final_keyword = plan.product_keyword
+        decision.final_strategy = plan.selection_strategy
+        plan.routing = decision.to_dict()
+        return plan
+
+    def _build_llm_plan(self, *, goal: str, catalog: List[Dict[str, Any]]) -> AIExecutionPlan:
         if self._client is None:
             return self._fallback_plan(goal, catalog, reason="Anthropic API key not configured")
+        if not self._client.available():
+            return self._fallback_plan(goal, catalog, reason="LLM circuit breaker is open")
 
-        catalog_summary = self._summarise_catalog(catalog)
+        catalog_prompt = self._summarise_catalog(goal, catalog)
         user_prompt = (
             "User goal: "
             f"{goal}\n\n"
-            "Catalog sample: "
-            f"{catalog_summary}"
+            "Catalog:\n"
+            f"{catalog_prompt.text}"
         )
 
-        try:
-            response = self._client.messages.create(
-                model=self.model,
-                max_output_tokens=512,
-                temperature=0,
-                system=SYSTEM_PROMPT,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            raw_text = self._extract_text(response)
-            plan_payload = json.loads(raw_text)
-        except (APIError, json.JSONDecodeError, ValueError) as exc:
-            return self._fallback_plan(goal, catalog, reason=str(exc))
+        # Start on the smallest model; escalate while the plan fails validation.
+        model = self.model_router.first()
+        escalations: List[str] = []
+        while True:
+            started = monotonic()
+            try:
+                response = self._client.messages.create(
+                    model=model,
+                    max_tokens=512,
+                    temperature=0,
+                    system=SYSTEM_PROMPT,
+                    messages=[{"role": "user", "content": user_prompt}],
+                )
+            except (APIError, LLMUnavailableError) as exc:
+                self.model_router.record_call(model, monotonic() - started, ok=False)
+                return self._fallback_plan(goal, catalog, reason=str(exc))
+            usage = getattr(response, "usage", None)
+            self.model_router.record_call(model, monotonic() - started, usage)
+
+            try:
+                plan_payload = json.loads(self._extract_text(response))
+                problem = self._plan_problem(plan_payload, catalog)
+            except (json.JSONDecodeError, ValueError) as exc:
+                plan_payload, problem = None, f"{ESCALATE_INVALID_JSON}: {exc}"
+            if problem is None:
+                break
+            larger = self.model_router.escalate(model, problem.split(":")[0])
+            if larger is None:
+                if not isinstance(plan_payload, dict):
+                    return self._fallback_plan(goal, catalog, reason=problem)
+                # Largest model still imperfect: repair its plan below.
+                break
+            escalations.append(f"{model}: {problem}")
+            model = larger
 
         selection_strategy = plan_payload.get("selection_strategy", STRATEGY_MATCH)
-        if selection_strategy not in ALLOWED_STRATEGIES:
+        if selection_strategy not in PLANNER_STRATEGIES:
             selection_strategy = STRATEGY_MATCH
 
-        product_keyword = (
-            plan_payload.get("product_keyword")
-            or plan_payload.get("product")
-            or self._infer_keyword_from_goal(goal)
-        )
+        product_keyword = plan_payload.get("product_keyword") or plan_payload.get("product") or ""
+        if not product_keyword and selection_strategy not in KEYWORDLESS_STRATEGIES:
+            product_keyword = self._infer_keyword_from_goal(goal)
 
         steps = plan_payload.get("steps")
         if not isinstance(steps, Sequence):
@@ -212,14 +302,45 @@ class AIPlaywrightBrain:
             steps=steps,
             reasoning=reasoning,
             raw_response=plan_payload,
+            model=model,
+            escalations=escalations,
+            prompt={**catalog_prompt.stats(), "input_tokens": getattr(usage, "input_tokens", None)},
+        )
+
+    def _routed_plan(
+        self,
+        goal: str,
+        catalog: List[Dict[str, Any]],
+        decision: RoutingDecision,
+    ) -> AIExecutionPlan:
+        steps = [
+            "Navigate to demo store",
+            "Authenticate with demo credentials",
+            f"Gather catalog entries (total: {len(catalog)})",
+            f"Select product using strategy '{decision.selection_strategy}'",
+        ]
+        reasoning = (
+            "Resolved locally by the intent router "
+            f"(confidence {decision.confidence:.2f} >= threshold {decision.threshold:.2f}); "
+            f"'{decision.product_keyword or 'any product'}' matches "
+            f"{decision.matched_titles} catalog title(s)."
+        )
+        return AIExecutionPlan(
+            goal=goal,
+            product_keyword=decision.product_keyword,
+            selection_strategy=decision.selection_strategy,
+            steps=steps,
+            reasoning=reasoning,
+            source="router",
+            raw_response=None,
         )
 
     def _fallback_plan(self, goal: str, catalog: List[Dict[str, Any]], reason: str) -> AIExecutionPlan:
         lowered_goal = goal.lower()
         selection_strategy = STRATEGY_MATCH
-        if "most expensive" in lowered_goal or "highest" in lowered_goal:
+        if any(keyword in lowered_goal for keyword in MAX_PRICE_CUES):
             selection_strategy = STRATEGY_MAX_PRICE
-        elif any(keyword in lowered_goal for keyword in ("cheapest", "least expensive", "lowest")):
+        elif any(keyword in lowered_goal for keyword in MIN_PRICE_CUES):
             selection_strategy = STRATEGY_MIN_PRICE
 
         product_keyword = self._infer_keyword_from_goal(goal)
@@ -246,6 +367,22 @@ class AIPlaywrightBrain:
             raw_response=None,
         )
 
+    @staticmethod
+    def _plan_problem(payload: Any, catalog: List[Dict[str, Any]]) -> Optional[str]:
+        """Return why an LLM plan is unusable as-is, or ``None`` if it is valid."""
+
+        if not isinstance(payload, dict):
+            return ESCALATE_INVALID_JSON
+        strategy = payload.get("selection_strategy")
+        if strategy not in PLANNER_STRATEGIES:
+            return ESCALATE_BAD_STRATEGY
+        keyword = str(payload.get("product_keyword") or payload.get("product") or "").strip().lower()
+        if not keyword:
+            return None if strategy in KEYWORDLESS_STRATEGIES else ESCALATE_MISSING_KEYWORD
+        if not any(keyword in str(entry.get("title") or "").lower() for entry in catalog):
+            return ESCALATE_KEYWORD_NOT_IN_CATALOG
+        return None
+
     @staticmethod
     def _extract_text(response: Any) -> str:
         """Flatten the Claude response content into a single text string."""
@@ -268,17 +405,10 @@ class AIPlaywrightBrain:
             raise ValueError("Empty response from Anthropic model")
         return combined
 
-    @staticmethod
-    def _summarise_catalog(catalog: List[Dict[str, Any]], *, limit: int = 10) -> str:
-        sample = [
-            {
-                "title": entry.get("title"),
-                "price": entry.get("price_text"),
-                "price_value": entry.get("price_value"),
-            }
-            for entry in catalog[:limit]
-        ]
-        return json.dumps(sample, ensure_ascii=False)
+    def _summarise_catalog(self, goal: str, catalog: List[Dict[str, Any]]) -> CatalogPrompt:
+        """Most goal-relevant catalog entries, packed under the prompt builder's token budget."""
+
+        return self.prompt_builder.build(goal, catalog)
 
     @staticmethod
     def _infer_keyword_from_goal(goal: str) -> str:
@@ -1,21 +1,215 @@
+import json
+import os
+from contextlib import asynccontextmanager
 from time import perf_counter
 from typing import Any, Literal
 
-from fastapi import FastAPI
-
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from ai_brain_mcp import AIBrainError, AIPlaywrightBrain
-from robot_Driver_Playwright.my_robot_driver import RobotDriver
+from ai_brain_mcp import DEFAULT_MODEL, AIBrainError, AIPlaywrightBrain
+from robot_Driver_Playwright.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    HostLimits,
+    set_default_admission_controller,
+)
+from robot_Driver_Playwright.autoscaler import AdmissionTarget, Autoscaler, ScalingPolicy, WarmPoolTarget
+from robot_Driver_Playwright.browser_memory import BrowserMemoryMonitor, MemoryLimits
+from robot_Driver_Playwright.browser_sessions import (
+    SessionError,
+    SessionManager,
+    SessionNotFoundError,
+)
+from robot_Driver_Playwright.catalog_store import CatalogStore, set_default_catalog_store
+from robot_Driver_Playwright.driver_logging import configure_logging, new_task_id, ring_buffer
+from robot_Driver_Playwright.http_backend import run_task_on_backend
+from robot_Driver_Playwright.llm_client import LLMCallPolicy
+from robot_Driver_Playwright.model_router import DEFAULT_SMALL_MODEL, routers_from_config
+from robot_Driver_Playwright.my_robot_driver import RobotDriverResult, SelectionParams
+from robot_Driver_Playwright.page_pool import WarmPagePool
+from robot_Driver_Playwright.price_monitor import PriceMonitor
+from robot_Driver_Playwright.prompt_builder import CatalogPromptBuilder
+from robot_Driver_Playwright.queue_worker import QueueWorker
+from robot_Driver_Playwright.result_cache import CACHE_BYPASS, CACHE_MISS, StaleWhileRevalidateCache
+from robot_Driver_Playwright.singleflight import SingleFlight
+from robot_Driver_Playwright.work_queue import STATUS_FAILED, WorkQueue, open_work_queue
+
+# Every driver run is admitted per host. ADMISSION_LIMITS is a JSON object of
+# host -> limits; the "default" key applies to hosts not listed.
+_admission_config = json.loads(os.getenv("ADMISSION_LIMITS") or "{}")
+admission = AdmissionController(
+    HostLimits.from_dict(_admission_config.pop("default", {})),
+    {host: HostLimits.from_dict(limits) for host, limits in _admission_config.items()},
+)
+set_default_admission_controller(admission)
+
+session_manager = SessionManager(
+    idle_timeout=float(os.getenv("SESSION_IDLE_SECONDS", "300")),
+    max_sessions=int(os.getenv("SESSION_MAX", "8")),
+)
+
+# Memory of long-lived browsers is sampled and reported under /stats. Pages
+# past these limits are recycled; BROWSER_MEMORY_LIMITS is a JSON object of
+# MemoryLimits fields, e.g. {"max_browser_rss_mb": 1024, "max_context_tasks": 200}.
+browser_memory = BrowserMemoryMonitor(MemoryLimits.from_dict(json.loads(os.getenv("BROWSER_MEMORY_LIMITS") or "{}")))
+
+# Optional pool of pages parked, logged in, on the catalog; /run-basic uses it
+# for headless browser runs against WARM_POOL_URL. Disabled when size is 0.
+WARM_POOL_SIZE = int(os.getenv("WARM_POOL_SIZE", "0"))
+warm_pool: WarmPagePool | None = (
+    WarmPagePool(
+        os.getenv("WARM_POOL_URL", "https://bstackdemo.com/"),
+        size=WARM_POOL_SIZE,
+        freshness_seconds=float(os.getenv("WARM_POOL_FRESHNESS_SECONDS", "120")),
+        checkout_timeout=float(os.getenv("WARM_POOL_CHECKOUT_SECONDS", "2")),
+        memory_monitor=browser_memory,
+    )
+    if WARM_POOL_SIZE > 0
+    else None
+)
+
+# Optional autoscaling of worker and browser capacity. AUTOSCALE is a JSON
+# object with an optional "workers" section (ScalingPolicy fields plus "hosts",
+# whose admission concurrency it scales) and "browsers" section (ScalingPolicy
+# fields for the warm pool's size). Unset disables autoscaling.
+_autoscale_config = json.loads(os.getenv("AUTOSCALE") or "{}")
+autoscaler: Autoscaler | None = None
+if _autoscale_config:
+    autoscaler = Autoscaler(interval_seconds=float(_autoscale_config.get("interval_seconds", 5)))
+    _workers_config = _autoscale_config.get("workers")
+    if _workers_config:
+        for _host in _workers_config.get("hosts", ["bstackdemo.com"]):
+            autoscaler.add(AdmissionTarget(admission, _host), ScalingPolicy.from_dict(_workers_config))
+    if _autoscale_config.get("browsers") and warm_pool is not None:
+        autoscaler.add(WarmPoolTarget(warm_pool), ScalingPolicy.from_dict(_autoscale_config["browsers"]))
+
+# Every extracted catalog is recorded as per-product price changes; set
+# CATALOG_STORE_PATH to an empty string to disable. The store is opened when
+# the app starts, not on import.
+CATALOG_STORE_PATH = os.getenv("CATALOG_STORE_PATH", "catalog_history.sqlite")
+catalog_store: CatalogStore | None = None
+
+# Scheduled price watches; due watches for the same site share one extraction.
+price_monitor = PriceMonitor(
+    tick_seconds=float(os.getenv("PRICE_MONITOR_TICK_SECONDS", "1")),
+    jitter=float(os.getenv("PRICE_MONITOR_JITTER", "0.1")),
+    max_concurrent_sites=int(os.getenv("PRICE_MONITOR_MAX_SITES", "2")),
+)
+
+# Optional shared work queue. With WORK_QUEUE_URL set (memory://, sqlite:///path
+# or redis://host:port/db), /run-basic enqueues its task and waits up to
+# WORK_QUEUE_RESULT_SECONDS for a worker to finish it, instead of running the
+# browser here. Workers run as `python -m robot_Driver_Playwright.queue_worker`
+# on any host; WORK_QUEUE_LOCAL_WORKERS also runs that many in this process.
+WORK_QUEUE_URL = os.getenv("WORK_QUEUE_URL", "")
+WORK_QUEUE_RESULT_SECONDS = float(os.getenv("WORK_QUEUE_RESULT_SECONDS", "120"))
+work_queue: WorkQueue | None = open_work_queue(WORK_QUEUE_URL) if WORK_QUEUE_URL else None
+queue_worker: QueueWorker | None = None
+if work_queue is not None and int(os.getenv("WORK_QUEUE_LOCAL_WORKERS", "0")) > 0:
+    queue_worker = QueueWorker(
+        work_queue,
+        concurrency=int(os.getenv("WORK_QUEUE_LOCAL_WORKERS", "0")),
+        lease_seconds=float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "30")),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global catalog_store
+    if CATALOG_STORE_PATH:
+        catalog_store = CatalogStore(CATALOG_STORE_PATH)
+        set_default_catalog_store(catalog_store)
+    price_monitor.start()
+    if queue_worker is not None:
+        queue_worker.start()
+    if warm_pool is not None:
+        warm_pool.start()
+    if autoscaler is not None:
+        autoscaler.start()
+    yield
+    if autoscaler is not None:
+        autoscaler.shutdown()
+    price_monitor.shutdown()
+    await run_in_threadpool(session_manager.shutdown)
+    if warm_pool is not None:
+        await run_in_threadpool(warm_pool.shutdown)
+    if queue_worker is not None:
+        await run_in_threadpool(queue_worker.shutdown)
+    if work_queue is not None:
+        work_queue.close()
+    if catalog_store is not None:
+        set_default_catalog_store(None)
+        await run_in_threadpool(catalog_store.close)
+        catalog_store = None
+
 
 app = FastAPI(
     title="MCP Robot Driver API",
     description="Network-accessible service for Playwright automation",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+configure_logging(
+    os.getenv("ROBOT_DRIVER_LOG_LEVEL", "INFO").upper(),
+    ring_buffer_size=int(os.getenv("ROBOT_DRIVER_LOG_BUFFER", "1000")),
+    log_file=os.getenv("ROBOT_DRIVER_LOG_FILE") or None,
+)
+
+# Anthropic calls share a bounded number of slots, retry with backoff and stop
+# entirely while the circuit breaker is open (the brain then plans locally).
+llm_policy = LLMCallPolicy(
+    max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "4")),
+    timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "20")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+    breaker_failures=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    breaker_reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+)
+# Planning starts on a small model and escalates when its plan fails validation.
+# MODEL_ROUTES maps endpoint -> model list (smallest first); "default" covers the rest.
+model_routers = routers_from_config(
+    json.loads(os.getenv("MODEL_ROUTES") or "{}"),
+    ["run_ai"],
+    [DEFAULT_SMALL_MODEL, DEFAULT_MODEL],
+)
+ai_brain = AIPlaywrightBrain(
+    llm_policy=llm_policy,
+    model_router=model_routers["run_ai"],
+    # Planning prompts carry the most goal-relevant catalog rows that fit this budget.
+    prompt_builder=CatalogPromptBuilder(token_budget=int(os.getenv("PLAN_CATALOG_TOKEN_BUDGET", "400"))),
+)
+
+# Identical in-flight requests share one underlying run.
+basic_flight: SingleFlight = SingleFlight()
+ai_flight: SingleFlight = SingleFlight()
+
+# Successful results are served from cache: fresh hits directly, stale hits
+# directly plus a background refresh.
+CACHE_FRESH_SECONDS = float(os.getenv("RESULT_CACHE_FRESH_SECONDS", "60"))
+CACHE_STALE_SECONDS = float(os.getenv("RESULT_CACHE_STALE_SECONDS", "600"))
+basic_cache: StaleWhileRevalidateCache = StaleWhileRevalidateCache(
+    fresh_ttl=CACHE_FRESH_SECONDS,
+    stale_ttl=CACHE_STALE_SECONDS,
+    should_cache=lambda value: value[0][1].success,
+)
+ai_cache: StaleWhileRevalidateCache = StaleWhileRevalidateCache(
+    fresh_ttl=CACHE_FRESH_SECONDS,
+    stale_ttl=CACHE_STALE_SECONDS,
+    should_cache=lambda value: value[0][1].result.success,
 )
 
-ai_brain = AIPlaywrightBrain()
+StrategyName = Literal[
+    "match",
+    "min_price",
+    "max_price",
+    "price_range",
+    "top_k_cheapest",
+    "nth_cheapest",
+    "closest_price",
+    "median_price",
+]
 
 # Request Models
 class BasicTaskRequest(BaseModel):
@@ -23,12 +217,50 @@ class BasicTaskRequest(BaseModel):
     product_name: str = "iPhone 12"
     headless: bool = True
     timeout_ms: int = 10_000
-    selection_strategy: Literal["match", "min_price", "max_price"] = "match"
+    selection_strategy: StrategyName = "match"
+    price_min: float | None = None
+    price_max: float | None = None
+    target_price: float | None = None
+    rank: int = 1
+    count: int = 5
+    backend: Literal["browser", "http"] = "browser"
+    bypass_cache: bool = False
 
 class AITaskRequest(BaseModel):
     goal: str = "Find the cheapest iPhone and add it to cart"
     url: str = "https://bstackdemo.com/"
     headless: bool = True
+    bypass_cache: bool = False
+
+class SessionCreateRequest(BaseModel):
+    url: str = "https://bstackdemo.com/"
+    headless: bool = True
+    timeout_ms: int = 10_000
+    username_index: int = 0
+    password_index: int = 0
+
+class SessionCommandRequest(BaseModel):
+    command: Literal["locate_product", "set_strategy", "add_to_cart", "refresh_catalog", "sync_catalog"]
+    product_name: str | None = None
+    selection_strategy: StrategyName | None = None
+    price_min: float | None = None
+    price_max: float | None = None
+    target_price: float | None = None
+    rank: int | None = None
+    count: int | None = None
+
+class WatchRequest(BaseModel):
+    product_name: str
+    url: str = "https://bstackdemo.com/"
+    threshold: float
+    interval_seconds: float = 300.0
+    selection_strategy: StrategyName = "match"
+    price_min: float | None = None
+    price_max: float | None = None
+    target_price: float | None = None
+    rank: int = 1
+    count: int = 5
+    backend: Literal["browser", "http"] = "browser"
 
 # Response Models  
 class TaskResult(BaseModel):
@@ -41,6 +273,44 @@ class TaskResult(BaseModel):
     selection_strategy: str | None = None
     plan: dict[str, Any] | None = None
     catalog_sample: list[dict[str, Any]] | None = None
+    matches: list[dict[str, Any]] | None = None
+    backend: str | None = None
+    fallback_reason: str | None = None
+    task_id: str | None = None
+    coalesced: bool = False
+    cache: str | None = None
+    data_age_seconds: float | None = None
+    queue_seconds: float | None = None
+    retried_phases: list[str] | None = None
+
+def _basic_task_key(req: BasicTaskRequest) -> tuple:
+    """Fields that change a /run-basic result; headless, timeout and cache flags do not."""
+    return tuple(sorted(req.model_dump(exclude={"headless", "timeout_ms", "bypass_cache"}).items()))
+
+def _cache_key(req: BaseModel) -> tuple:
+    return (type(req).__name__, *sorted(req.model_dump(exclude={"bypass_cache"}).items()))
+
+def _require_work_queue() -> WorkQueue:
+    if work_queue is None:
+        raise HTTPException(status_code=503, detail="No work queue configured; set WORK_QUEUE_URL")
+    return work_queue
+
+def _run_on_work_queue(req: BasicTaskRequest, task_id: str) -> RobotDriverResult:
+    """Enqueue a /run-basic task and wait for a worker to finish it."""
+    queue = _require_work_queue()
+    queue.enqueue(req.model_dump(exclude={"bypass_cache"}), task_id=task_id)
+    item = queue.wait(task_id, WORK_QUEUE_RESULT_SECONDS)
+    if item is None:
+        waited = f"within {WORK_QUEUE_RESULT_SECONDS:g}s"
+        if queue.cancel(task_id, f"Cancelled: no worker picked it up {waited}"):
+            raise TimeoutError(f"Task {task_id} was not picked up by a queue worker {waited}; cancelled")
+        # Already leased: the worker finishes it and GET /tasks/{task_id} reports the result.
+        raise TimeoutError(
+            f"Task {task_id} not finished by a queue worker {waited}; it keeps running, see GET /tasks/{task_id}"
+        )
+    if item.status == STATUS_FAILED:
+        raise RuntimeError(f"Queue worker failed task {task_id}: {item.error}")
+    return RobotDriverResult(**item.result)
 
 # Endpoints
 
@@ -51,6 +321,14 @@ def root():
         "endpoints": {
             "/run-basic": "Run basic hardcoded automation (Part 1)",
             "/run-ai": "Run AI-style automation (Claude with fallback)", 
+            "/ai/routing": "Intent router statistics and recent routing decisions",
+            "/logs": "Recent driver log records from the in-memory ring buffer",
+            "/stats": "Service counters (coalescing, cache, sessions, warm pool, admission, ...)",
+            "/catalog/price": "Latest recorded price of a product (no browser)",
+            "/catalog/history": "Recorded price changes of a product",
+            "/watches": "Scheduled price watches and threshold-crossing events",
+            "/tasks": "Queue /run-basic tasks for workers and fetch their results (WORK_QUEUE_URL)",
+            "/sessions": "Long-lived logged-in browser sessions (REST and /sessions/{id}/ws)",
             "/docs": "Interactive API documentation"
         },
         "features": [
@@ -70,16 +348,50 @@ def run_basic_driver(req: BasicTaskRequest):
     Executes predefined steps: navigate -> login -> find product -> extract price
     """
     start_time = perf_counter()
+    task_id = new_task_id()
 
-    try:
-        driver = RobotDriver(timeout_ms=req.timeout_ms)
-        result = driver.run_complete_task(
+    def run_task():
+        if work_queue is not None:
+            return task_id, _run_on_work_queue(req, task_id)
+        selection_params = SelectionParams(
+            price_min=req.price_min,
+            price_max=req.price_max,
+            target_price=req.target_price,
+            rank=req.rank,
+            count=req.count,
+        )
+        if (
+            warm_pool is not None
+            and req.backend == "browser"
+            and req.headless
+            and warm_pool.serves(req.url)
+        ):
+            pooled = warm_pool.run_task(
+                req.product_name,
+                selection_strategy=req.selection_strategy,
+                selection_params=selection_params,
+            )
+            if pooled is not None:
+                return task_id, pooled
+        return task_id, run_task_on_backend(
+            req.backend,
+            timeout_ms=req.timeout_ms,
+            task_id=task_id,
             url=req.url,
             product_name=req.product_name,
             headless=req.headless,
             selection_strategy=req.selection_strategy,
+            selection_params=selection_params,
         )
 
+    try:
+        ((run_task_id, result), coalesced), lookup = basic_cache.get(
+            _cache_key(req),
+            lambda: basic_flight.do(_basic_task_key(req), run_task),
+            bypass=req.bypass_cache,
+        )
+        coalesced = coalesced and lookup.status in (CACHE_MISS, CACHE_BYPASS)
+
         execution_time = perf_counter() - start_time
 
         return TaskResult(
@@ -90,6 +402,15 @@ def run_basic_driver(req: BasicTaskRequest):
             approach="Basic Playwright automation",
             execution_time_seconds=round(execution_time, 2),
             selection_strategy=result.selection_strategy,
+            matches=result.matches or None,
+            backend=result.backend,
+            fallback_reason=result.fallback_reason,
+            task_id=run_task_id,
+            coalesced=coalesced,
+            cache=lookup.status,
+            data_age_seconds=round(lookup.age_seconds, 2),
+            queue_seconds=result.queue_seconds,
+            retried_phases=result.retried_phases or None,
         )
 
     except Exception as e:
@@ -98,16 +419,31 @@ def run_basic_driver(req: BasicTaskRequest):
             success=False,
             error=f"API Error: {str(e)}",
             approach="Basic Playwright automation",
-            execution_time_seconds=round(execution_time, 2)
+            execution_time_seconds=round(execution_time, 2),
+            task_id=task_id,
         )
 
 @app.post("/run-ai", response_model=TaskResult)
 def run_ai_driver(req: AITaskRequest):
     """Run AI-driven automation using Anthropic Claude with graceful fallback."""
     start_time = perf_counter()
+    task_id = new_task_id()
+
+    def run_goal():
+        return task_id, ai_brain.execute_goal(
+            goal=req.goal,
+            url=req.url,
+            headless=req.headless,
+            task_id=task_id,
+        )
 
     try:
-        execution = ai_brain.execute_goal(goal=req.goal, url=req.url, headless=req.headless)
+        ((run_task_id, execution), coalesced), lookup = ai_cache.get(
+            _cache_key(req),
+            lambda: ai_flight.do((req.goal, req.url), run_goal),
+            bypass=req.bypass_cache,
+        )
+        coalesced = coalesced and lookup.status in (CACHE_MISS, CACHE_BYPASS)
 
         execution_time = perf_counter() - start_time
 
@@ -126,6 +462,11 @@ def run_ai_driver(req: AITaskRequest):
             selection_strategy=execution.result.selection_strategy,
             plan=execution.plan.to_dict(),
             catalog_sample=catalog_sample,
+            task_id=run_task_id,
+            coalesced=coalesced,
+            cache=lookup.status,
+            data_age_seconds=round(lookup.age_seconds, 2),
+            queue_seconds=execution.queue_seconds,
         )
 
     except AIBrainError as brain_error:
@@ -134,7 +475,8 @@ def run_ai_driver(req: AITaskRequest):
             success=False,
             error=f"AI planning error: {brain_error}",
             approach="AI-guided automation (Claude with fallback)",
-            execution_time_seconds=round(execution_time, 2)
+            execution_time_seconds=round(execution_time, 2),
+            task_id=task_id,
         )
 
     except Exception as e:
@@ -143,5 +485,212 @@ def run_ai_driver(req: AITaskRequest):
             success=False,
             error=f"API Error: {str(e)}",
             approach="AI-guided automation (Claude with fallback)",
-            execution_time_seconds=round(execution_time, 2)
+            execution_time_seconds=round(execution_time, 2),
+            task_id=task_id,
+        )
+
+
+@app.get("/ai/routing")
+def ai_routing_stats(limit: int = 50):
+    """Report how often /run-ai goals were resolved locally versus escalated to Claude."""
+    return {
+        "stats": ai_brain.intent_router.stats(),
+        "decisions": ai_brain.intent_router.decisions(limit=limit),
+    }
+
+
+@app.get("/logs")
+def recent_logs(limit: int = 200, task_id: str | None = None, level: str | None = None):
+    """Return recent driver log records, optionally filtered by task id or minimum level."""
+    buffer = ring_buffer()
+    if buffer is None:
+        return {"enabled": False, "records": []}
+    return {"enabled": True, "records": buffer.records(limit=max(1, limit), task_id=task_id, level=level)}
+
+
+@app.get("/catalog/price")
+def catalog_current_price(product: str, url: str | None = None, limit: int = 50):
+    """Latest recorded price of a product, answered from the history store."""
+    if catalog_store is None:
+        raise HTTPException(status_code=404, detail="Catalog store is disabled")
+    return catalog_store.current_prices(product, url=url, limit=limit)
+
+
+@app.get("/catalog/history")
+def catalog_price_history(
+    product: str,
+    url: str | None = None,
+    since: float | None = None,
+    limit: int = 500,
+):
+    """Recorded price changes for a product, oldest first (``since`` is a Unix timestamp)."""
+    if catalog_store is None:
+        raise HTTPException(status_code=404, detail="Catalog store is disabled")
+    return {"product": product, "history": catalog_store.price_history(product, url=url, since=since, limit=limit)}
+
+
+@app.post("/watches")
+def create_watch(req: WatchRequest):
+    """Register a price watch; events fire when the price crosses ``threshold``."""
+    try:
+        watch = price_monitor.add_watch(
+            product_name=req.product_name,
+            url=req.url,
+            threshold=req.threshold,
+            interval_seconds=req.interval_seconds,
+            selection_strategy=req.selection_strategy,
+            selection_params=SelectionParams(
+                price_min=req.price_min,
+                price_max=req.price_max,
+                target_price=req.target_price,
+                rank=req.rank,
+                count=req.count,
+            ),
+            backend=req.backend,
         )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return watch.to_dict()
+
+
+@app.get("/watches")
+def list_watches():
+    return {"watches": price_monitor.watches()}
+
+
+@app.get("/watches/events")
+def watch_events(limit: int = 100, since: float | None = None):
+    """Threshold-crossing events, oldest first (``since`` is a Unix timestamp)."""
+    return {"events": price_monitor.events(limit=limit, since=since)}
+
+
+@app.delete("/watches/{watch_id}")
+def delete_watch(watch_id: str):
+    if not price_monitor.remove_watch(watch_id):
+        raise HTTPException(status_code=404, detail=f"Watch '{watch_id}' not found")
+    return {"watch_id": watch_id, "removed": True}
+
+
+@app.post("/tasks")
+def enqueue_task(req: BasicTaskRequest):
+    """Queue a /run-basic task for the workers and return without waiting for it."""
+    task_id = new_task_id()
+    _require_work_queue().enqueue(req.model_dump(exclude={"bypass_cache"}), task_id=task_id)
+    return {"task_id": task_id, "status": "queued"}
+
+
+@app.get("/tasks/{task_id}")
+def get_task(task_id: str):
+    item = _require_work_queue().get(task_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"Task '{task_id}' not found")
+    return item.to_dict()
+
+
+@app.get("/stats")
+def service_stats():
+    """Report service-level counters such as how many requests were coalesced."""
+    return {
+        "coalescing": {
+            "run_basic": basic_flight.stats(),
+            "run_ai": ai_flight.stats(),
+            "coalesced": basic_flight.stats()["coalesced"] + ai_flight.stats()["coalesced"],
+        },
+        "cache": {
+            "run_basic": basic_cache.stats(),
+            "run_ai": ai_cache.stats(),
+        },
+        "sessions": session_manager.stats(),
+        "warm_pool": warm_pool.stats() if warm_pool is not None else None,
+        "browser_memory": browser_memory.stats(),
+        "catalog_store": catalog_store.stats() if catalog_store is not None else None,
+        "price_monitor": price_monitor.stats(),
+        "admission": admission.stats(),
+        "autoscaler": autoscaler.stats() if autoscaler is not None else None,
+        "work_queue": {
+            **work_queue.stats(),
+            "local_worker": queue_worker.stats() if queue_worker is not None else None,
+        }
+        if work_queue is not None
+        else None,
+        "llm": ai_brain.llm_stats(),
+        "model_routes": {endpoint: router.stats() for endpoint, router in model_routers.items()},
+    }
+
+
+@app.post("/sessions")
+def create_session(req: SessionCreateRequest):
+    """Start a browser, log in and park it on the catalog page."""
+    start_time = perf_counter()
+    try:
+        session = session_manager.create(
+            req.url,
+            headless=req.headless,
+            timeout_ms=req.timeout_ms,
+            username_index=req.username_index,
+            password_index=req.password_index,
+        )
+    except (SessionError, AdmissionTimeoutError) as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return {
+        **session.describe(),
+        "execution_time_seconds": round(perf_counter() - start_time, 2),
+    }
+
+@app.get("/sessions")
+def list_sessions():
+    return {"sessions": session_manager.list(), **session_manager.stats()}
+
+@app.post("/sessions/{session_id}/commands")
+def run_session_command(session_id: str, req: SessionCommandRequest):
+    """Run one command against the session's live page."""
+    try:
+        session = session_manager.get(session_id)
+        return session.execute(req.command, req.model_dump(exclude={"command"}, exclude_none=True))
+    except SessionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except AdmissionTimeoutError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except (SessionError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@app.delete("/sessions/{session_id}")
+def close_session(session_id: str):
+    try:
+        session_manager.close(session_id)
+    except SessionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return {"session_id": session_id, "closed": True}
+
+@app.websocket("/sessions/{session_id}/ws")
+async def session_channel(websocket: WebSocket, session_id: str):
+    """Command channel for a session: send {"command": ..., **arguments}, receive the result."""
+    await websocket.accept()
+    try:
+        session = session_manager.get(session_id)
+    except SessionNotFoundError as exc:
+        await websocket.send_json({"success": False, "error": str(exc)})
+        await websocket.close(code=4404)
+        return
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            command = None
+            try:
+                message = json.loads(text)
+                if isinstance(message, dict) and message.get("command") == "close":
+                    await run_in_threadpool(session_manager.close, session_id)
+                    await websocket.send_json({"session_id": session_id, "closed": True})
+                    await websocket.close()
+                    return
+                req = SessionCommandRequest.model_validate(message)
+                command = req.command
+                result = await run_in_threadpool(
+                    session.execute, command, req.model_dump(exclude={"command"}, exclude_none=True)
+                )
+            except Exception as exc:  # noqa: BLE001 - a bad frame must not drop the channel
+                result = {"success": False, "command": command, "error": str(exc)}
+            await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,108 @@
+"""Benchmark streamed versus blocking LLM calls in the part2 agent loop.
+
+Runs ``AIRobotDriver``'s tool loop against the local fake Messages API with a
+scripted conversation: narrate and navigate, then find and click the cheapest
+iPhone in one turn, then report completion. Each streamed chunk costs
+``--token-ms`` of generation time. Tools are simulated with a fixed
+``--tool-ms`` delay instead of a browser, so the numbers isolate how much
+browser work overlaps with generation. Reports median time-to-first-action
+and iteration latency for both modes.
+
+Usage::
+
+    python -m benchmarks.agent_streaming --runs 5
+    python -m benchmarks.agent_streaming --token-ms 20 --tool-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+from time import perf_counter, sleep
+from typing import Dict, List, Optional
+
+from anthropic import Anthropic
+
+from benchmarks.fake_anthropic import start_fake_anthropic
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.part2_mcp_ai_brain.ai_brain_mcp import AIRobotDriver
+from robot_Driver_Playwright.trace_cache import TraceCache
+
+AGENT_SCRIPT = [
+    [
+        {"type": "text", "text": "I'll start by opening the storefront so I can see the catalog."},
+        {"type": "tool_use", "name": "playwright_navigate", "input": {"url": "https://bstackdemo.com/"}},
+    ],
+    [
+        {"type": "text", "text": "Now I'll find the cheapest iPhone and add it to the cart."},
+        {"type": "tool_use", "name": "playwright_find_cheapest_product", "input": {}},
+        {"type": "tool_use", "name": "playwright_click_cheapest_iphone", "input": {}},
+        {"type": "text", "text": "Both steps are queued; I'll confirm once the cart updates."},
+    ],
+    [{"type": "text", "text": "The cheapest iPhone is in the cart. TASK_COMPLETE"}],
+]
+
+
+class SimulatedToolDriver(AIRobotDriver):
+    """Agent whose tools take a fixed time instead of driving a browser."""
+
+    tool_seconds = 0.1
+
+    def _execute_tool(self, tool_name: str, tool_input: dict):
+        sleep(self.tool_seconds)
+        return f"Simulated {tool_name}"
+
+
+def _run(base_url: str, *, streaming: bool, runs: int) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {"first_action": [], "iteration": [], "task": []}
+    for _ in range(runs):
+        driver = SimulatedToolDriver(
+            trace_cache=TraceCache(),
+            streaming=streaming,
+            anthropic_client=Anthropic(api_key="test", base_url=base_url),
+        )
+        result = {"success": False, "steps_taken": [], "llm_calls": 0, "timings": []}
+        started = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            driver._run_agent_loop("Find the cheapest iPhone and add it to cart", "https://bstackdemo.com/", 5, result)
+        samples["task"].append(perf_counter() - started)
+        if not result["success"]:
+            raise RuntimeError("Scripted agent run did not complete")
+        for timing in result["timings"]:
+            samples["iteration"].append(timing["iteration_seconds"])
+            if timing["first_action_seconds"] is not None:
+                samples["first_action"].append(timing["first_action_seconds"])
+    return samples
+
+
+def _report(label: str, samples: Dict[str, List[float]]) -> None:
+    print(
+        f"{label:<9} first action median={statistics.median(samples['first_action']) * 1000:8.1f} ms  "
+        f"iteration median={statistics.median(samples['iteration']) * 1000:8.1f} ms  "
+        f"task median={statistics.median(samples['task']) * 1000:8.1f} ms"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--token-ms", type=float, default=10.0, help="Generation time per streamed chunk")
+    parser.add_argument("--tool-ms", type=float, default=200.0, help="Simulated time per tool call")
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    SimulatedToolDriver.tool_seconds = args.tool_ms / 1000
+    server, base_url = start_fake_anthropic(script=AGENT_SCRIPT, token_seconds=args.token_ms / 1000)
+    try:
+        _report("blocking", _run(base_url, streaming=False, runs=args.runs))
+        _report("streaming", _run(base_url, streaming=True, runs=args.runs))
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
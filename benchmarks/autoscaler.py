@@ -0,0 +1,131 @@
+"""Compare fixed worker capacity with the autoscaler under a quiet-peak-quiet load.
+
+Simulated driver runs (a sleep of ``--run-ms``) go through a real
+:class:`~robot_Driver_Playwright.admission.AdmissionController` at a low
+rate, then a peak rate, then the low rate again. Each mode reports, per
+phase, the mean and p95 queue wait and the mean admission capacity. Those
+are the latency and the worker slots (and so browsers) it costs. The
+autoscaled run uses a short evaluation interval and cooldowns so the phases
+can be seconds long.
+
+Usage::
+
+    python -m benchmarks.autoscaler
+    python -m benchmarks.autoscaler --phase-seconds 6 --peak-rate 40 --fixed 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Tuple
+
+from robot_Driver_Playwright.admission import AdmissionController, HostLimits
+from robot_Driver_Playwright.autoscaler import AdmissionTarget, Autoscaler, ScalingPolicy
+from robot_Driver_Playwright.driver_logging import configure_logging
+
+URL = "https://bstackdemo.com/"
+HOST = "bstackdemo.com"
+
+
+def _run_load(
+    controller: AdmissionController,
+    phases: List[Tuple[str, float]],
+    phase_seconds: float,
+    run_seconds: float,
+) -> Dict[str, Dict[str, float]]:
+    waits: Dict[str, List[float]] = {name: [] for name, _ in phases}
+    capacity: Dict[str, List[int]] = {name: [] for name, _ in phases}
+    threads: List[threading.Thread] = []
+    lock = threading.Lock()
+    rng = random.Random(7)
+
+    def one_run(phase: str) -> None:
+        with controller.admit(URL) as ticket:
+            sleep(run_seconds)
+        with lock:
+            waits[phase].append(ticket.queue_seconds)
+
+    for name, rate in phases:
+        ends = monotonic() + phase_seconds
+        while monotonic() < ends:
+            capacity[name].append(controller.host_stats(HOST)["limits"]["max_concurrency"])
+            thread = threading.Thread(target=one_run, args=(name,), daemon=True)
+            thread.start()
+            threads.append(thread)
+            sleep(rng.expovariate(rate))
+    for thread in threads:
+        thread.join()
+
+    report = {}
+    for name, _ in phases:
+        samples = sorted(waits[name])
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        report[name] = {
+            "runs": len(samples),
+            "mean_wait_ms": statistics.mean(samples) * 1000 if samples else 0.0,
+            "p95_wait_ms": p95 * 1000,
+            "mean_capacity": statistics.mean(capacity[name]) if capacity[name] else 0.0,
+        }
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phase-seconds", type=float, default=4.0)
+    parser.add_argument("--quiet-rate", type=float, default=3.0, help="Runs per second outside the peak")
+    parser.add_argument("--peak-rate", type=float, default=25.0, help="Runs per second during the peak")
+    parser.add_argument("--run-ms", type=float, default=200.0)
+    parser.add_argument("--fixed", type=int, default=2, help="Concurrency of the fixed-capacity run")
+    parser.add_argument("--max-capacity", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    phases = [("quiet", args.quiet_rate), ("peak", args.peak_rate), ("quiet again", args.quiet_rate)]
+    run_seconds = args.run_ms / 1000
+    limits = HostLimits(max_concurrency=args.fixed, queue_timeout=120.0)
+
+    fixed = _run_load(AdmissionController(limits), phases, args.phase_seconds, run_seconds)
+
+    controller = AdmissionController(limits)
+    scaler = Autoscaler(interval_seconds=0.25)
+    scaler.add(
+        AdmissionTarget(controller, HOST),
+        ScalingPolicy(
+            min_capacity=1,
+            max_capacity=args.max_capacity,
+            scale_up_queue_seconds=0.1,
+            step_up=2,
+            up_after=1,
+            down_after=4,
+            up_cooldown_seconds=0.5,
+            down_cooldown_seconds=1.0,
+        ),
+    )
+    scaler.start()
+    try:
+        scaled = _run_load(controller, phases, args.phase_seconds, run_seconds)
+    finally:
+        scaler.shutdown()
+
+    print(f"{'mode':<12} {'phase':<12} {'runs':>5} {'mean wait ms':>13} {'p95 wait ms':>12} {'capacity':>9}")
+    for mode, report in (("fixed", fixed), ("autoscaled", scaled)):
+        for name, _ in phases:
+            row = report[name]
+            print(
+                f"{mode:<12} {name:<12} {row['runs']:>5} {row['mean_wait_ms']:>13.0f} "
+                f"{row['p95_wait_ms']:>12.0f} {row['mean_capacity']:>9.1f}"
+            )
+    decisions = scaler.stats()["decisions"]
+    print(f"\nautoscaler decisions: {len(decisions)}")
+    for decision in decisions:
+        print(f"  {decision['action']:<5} {decision['capacity']} -> {decision['new_capacity']}: {decision['reason']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
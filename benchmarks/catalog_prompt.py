@@ -0,0 +1,84 @@
+"""Compare planning-prompt catalog summaries: first-N JSON versus goal-ranked rows.
+
+Builds stand-in catalogs of several sizes and, for a set of goals, checks
+whether the product the goal is really after (e.g. the cheapest iPhone) makes
+it into the prompt. Reports the estimated prompt tokens of each encoding.
+
+Usage::
+
+    python -m benchmarks.catalog_prompt
+    python -m benchmarks.catalog_prompt --sizes 25 500 --budget 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.standin_storefront import build_products
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.prompt_builder import CatalogPromptBuilder, estimate_tokens
+from robot_Driver_Playwright.site_adapters import BStackDemoAdapter
+
+# (goal, title fragment the answer must contain, "min" | "max" | "match")
+GOALS: List[Tuple[str, str, str]] = [
+    ("Find the cheapest iPhone", "iphone", "min"),
+    ("Show me the most expensive Galaxy phone", "galaxy", "max"),
+    ("cheapest pixel", "pixel", "min"),
+    ("Add the One Plus 8 Pro to my cart", "one plus 8 pro", "match"),
+    ("priciest OnePlus", "one plus", "max"),
+]
+
+
+def _legacy_summary(catalog: List[Dict[str, Any]], limit: int = 10) -> str:
+    # The summary the planner used before: the first ``limit`` entries as JSON.
+    sample = [
+        {"title": entry.get("title"), "price": entry.get("price_text"), "price_value": entry.get("price_value")}
+        for entry in catalog[:limit]
+    ]
+    return json.dumps(sample, ensure_ascii=False)
+
+
+def _answer(catalog: List[Dict[str, Any]], fragment: str, mode: str) -> str:
+    candidates = [entry for entry in catalog if fragment in entry["title"].lower()]
+    if mode == "match":
+        return candidates[0]["title"]
+    pick = min if mode == "min" else max
+    return pick(candidates, key=lambda entry: entry["price_value"])["title"]
+
+
+def _contains(summary: str, title: str) -> bool:
+    # Titles like "iPhone 12 #3" must not be satisfied by "iPhone 12 #30".
+    return f'"{title}"' in summary or f"\n{title}|" in summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 200, 1000])
+    parser.add_argument("--budget", type=int, default=400, help="Token budget for the ranked summary")
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    builder = CatalogPromptBuilder(token_budget=args.budget)
+    adapter = BStackDemoAdapter()
+    print(f"{'products':>8}  {'encoding':<12} {'answer in prompt':>16} {'avg tokens':>10}")
+    for size in args.sizes:
+        catalog = adapter.parse_catalog_payload({"products": build_products(size)}) or []
+        results: Dict[str, List[Tuple[bool, int]]] = {"first-10 json": [], "ranked rows": []}
+        for goal, fragment, mode in GOALS:
+            answer = _answer(catalog, fragment, mode)
+            legacy = _legacy_summary(catalog)
+            ranked = builder.build(goal, catalog).text
+            results["first-10 json"].append((_contains(legacy, answer), estimate_tokens(legacy)))
+            results["ranked rows"].append((_contains(ranked, answer), estimate_tokens(ranked)))
+        for label, rows in results.items():
+            hits = sum(hit for hit, _ in rows)
+            tokens = sum(count for _, count in rows) / len(rows)
+            print(f"{size:>8}  {label:<12} {hits:>9}/{len(rows):<6} {tokens:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
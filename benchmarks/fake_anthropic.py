@@ -0,0 +1,258 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Serves ``POST /v1/messages`` with a fixed JSON plan as the text reply, or,
+when ``script`` is set, with scripted content blocks (text and ``tool_use``)
+chosen by how many assistant turns the conversation already has. Requests
+with ``"stream": true`` get the reply as server-sent events. Each chunk of
+text or tool input JSON costs ``token_seconds``, and non-streamed replies wait
+for the same total, so both modes model the same generation time.
+
+``model_plans`` and ``model_scripts`` override the plan or script for specific
+model names, to give a small tier a worse answer than a large one.
+
+The handler's ``latency`` and ``fail_status`` class attributes can be changed
+while the server runs to simulate a slow or failing API (e.g.
+``fail_status = 529`` for "overloaded"). Point the SDK at it with
+``Anthropic(api_key="test", base_url=base_url)``.
+
+Run as a benchmark with ``python -m benchmarks.fake_anthropic``: it drives
+concurrent callers through ``ResilientAnthropicClient`` across a healthy
+phase, an outage and a recovery, and prints breaker state and latency for
+each phase.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter, sleep
+from typing import Any, Dict, List, Optional, Tuple
+
+from anthropic import Anthropic
+
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.llm_client import LLMCallPolicy, LLMUnavailableError, ResilientAnthropicClient
+
+DEFAULT_PLAN = {
+    "product_keyword": "iPhone",
+    "selection_strategy": "min_price",
+    "reasoning": "Cheapest iPhone requested",
+    "steps": ["Log in", "Find iPhones", "Pick the cheapest"],
+}
+
+CHUNK_CHARS = 4
+
+
+def _chunks(text: str) -> List[str]:
+    return [text[i : i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)] or [""]
+
+
+def _block_chunks(block: Dict[str, Any]) -> List[str]:
+    return _chunks(block["text"] if block["type"] == "text" else json.dumps(block.get("input", {})))
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency: float = 0.0
+    fail_status: Optional[int] = None
+    plan: Dict[str, Any] = DEFAULT_PLAN
+    script: Optional[List[List[Dict[str, Any]]]] = None
+    model_plans: Dict[str, Any] = {}
+    model_scripts: Dict[str, List[List[Dict[str, Any]]]] = {}
+    token_seconds: float = 0.0
+    calls: int = 0
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        return
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        type(self).calls += 1
+        if self.latency:
+            sleep(self.latency)
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": "not found"}})
+            return
+        if self.fail_status is not None:
+            self._send_json(
+                self.fail_status,
+                {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+            )
+            return
+        content = self._content(request)
+        stop_reason = "tool_use" if any(block["type"] == "tool_use" for block in content) else "end_turn"
+        message = {
+            "id": f"msg_fake_{self.calls}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 100, "output_tokens": 40},
+        }
+        if request.get("stream"):
+            self._send_stream(message)
+            return
+        if self.token_seconds:
+            sleep(self.token_seconds * sum(len(_block_chunks(block)) for block in content))
+        self._send_json(200, message)
+
+    def _content(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        model = request.get("model")
+        script = self.model_scripts.get(model) or self.script
+        if not script:
+            plan = self.model_plans.get(model, self.plan)
+            return [{"type": "text", "text": plan if isinstance(plan, str) else json.dumps(plan)}]
+        turn = sum(1 for message in request.get("messages", []) if message.get("role") == "assistant")
+        blocks = script[min(turn, len(script) - 1)]
+        return [
+            {**block, "id": f"toolu_{self.calls}_{index}"} if block["type"] == "tool_use" else dict(block)
+            for index, block in enumerate(blocks)
+        ]
+
+    def _send_stream(self, message: Dict[str, Any]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(name: str, data: Dict[str, Any]) -> None:
+            self.wfile.write(f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        content = message["content"]
+        event("message_start", {"message": {**message, "content": [], "stop_reason": None}})
+        for index, block in enumerate(content):
+            if block["type"] == "text":
+                start, delta_type, field = {"type": "text", "text": ""}, "text_delta", "text"
+            else:
+                start, delta_type, field = {**block, "input": {}}, "input_json_delta", "partial_json"
+            event("content_block_start", {"index": index, "content_block": start})
+            for chunk in _block_chunks(block):
+                if self.token_seconds:
+                    sleep(self.token_seconds)
+                event("content_block_delta", {"index": index, "delta": {"type": delta_type, field: chunk}})
+            event("content_block_stop", {"index": index})
+        event(
+            "message_delta",
+            {"delta": {"stop_reason": message["stop_reason"], "stop_sequence": None}, "usage": {"output_tokens": 40}},
+        )
+        event("message_stop", {})
+
+
+def start_fake_anthropic(
+    *,
+    port: int = 0,
+    latency: float = 0.0,
+    script: Optional[List[List[Dict[str, Any]]]] = None,
+    token_seconds: float = 0.0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the fake API on a background thread and return it with its base URL."""
+
+    handler = type(
+        "FakeAnthropic",
+        (FakeAnthropicHandler,),
+        {
+            "latency": latency,
+            "calls": 0,
+            "script": script,
+            "token_seconds": token_seconds,
+            "model_plans": {},
+            "model_scripts": {},
+        },
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _phase(label: str, client: ResilientAnthropicClient, calls: int, workers: int) -> None:
+    outcomes = {"ok": 0, "failed": 0, "rejected": 0}
+    lock = threading.Lock()
+
+    def one(_: int) -> None:
+        try:
+            client.messages.create(
+                model="fake-model",
+                max_tokens=64,
+                messages=[{"role": "user", "content": "ping"}],
+            )
+            outcome = "ok"
+        except LLMUnavailableError:
+            outcome = "rejected"
+        except Exception:  # noqa: BLE001 - counted as a failed call
+            outcome = "failed"
+        with lock:
+            outcomes[outcome] += 1
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(calls)))
+    elapsed = perf_counter() - started
+    stats = client.stats()
+    print(
+        f"{label:<9} {elapsed:6.2f}s ok={outcomes['ok']:<4} failed={outcomes['failed']:<4} "
+        f"rejected={outcomes['rejected']:<4} breaker={stats['breaker']['state']:<9} "
+        f"retries={stats['retries']:<4} p95={stats['latency']['p95_ms']} ms"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--reset-seconds", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    configure_logging("ERROR")
+    server, base_url = start_fake_anthropic(latency=args.latency)
+    handler = server.RequestHandlerClass
+    policy = LLMCallPolicy(
+        max_in_flight=4,
+        timeout_seconds=5.0,
+        max_retries=2,
+        backoff_base_seconds=0.05,
+        backoff_max_seconds=0.2,
+        breaker_failures=5,
+        breaker_reset_seconds=args.reset_seconds,
+    )
+    client = ResilientAnthropicClient(Anthropic(api_key="test", base_url=base_url), policy)
+    try:
+        _phase("healthy", client, args.calls, args.workers)
+        handler.fail_status = 529
+        _phase("outage", client, args.calls, args.workers)
+        handler.fail_status = None
+        sleep(args.reset_seconds)
+        # The half-open breaker admits one trial call; the rest follow once it closes.
+        _phase("probe", client, 1, 1)
+        _phase("recovery", client, args.calls, args.workers)
+        print(f"API requests served: {handler.calls}; breaker opens: {client.stats()['breaker']['opens']}")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""Compare catalog extraction with and without site-side filter pushdown.
+
+Runs ``RobotDriver.run_complete_task`` for each keyword twice against the demo
+storefront, once scraping the full grid and once applying the vendor filter
+first, and reports the cards extracted and the time spent in
+``_collect_catalog_entries``.
+
+Usage::
+
+    python -m benchmarks.filter_pushdown --keyword iPhone --keyword Galaxy --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+from typing import Dict, List, Optional
+
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.my_robot_driver import STRATEGY_MIN_PRICE, RobotDriver
+
+
+def _measure(url: str, keyword: str, *, pushdown: bool, repeat: int) -> Dict[str, float]:
+    cards: List[int] = []
+    seconds: List[float] = []
+    for _ in range(repeat):
+        # Pushdown only applies to DOM extraction, so keep network capture off.
+        driver = RobotDriver(filter_pushdown=pushdown, network_capture=False)
+        result = driver.run_complete_task(
+            url=url,
+            product_name=keyword,
+            selection_strategy=STRATEGY_MIN_PRICE,
+        )
+        if not result.extraction:
+            raise RuntimeError(f"Run for '{keyword}' failed before extraction: {result.error}")
+        cards.append(result.extraction["cards"])
+        seconds.append(result.extraction["collect_seconds"])
+    return {"cards": statistics.mean(cards), "collect_seconds": statistics.median(seconds)}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="https://bstackdemo.com/")
+    parser.add_argument("--keyword", action="append", dest="keywords")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    keywords = args.keywords or ["iPhone", "Galaxy", "Pixel", "OnePlus"]
+
+    configure_logging("WARNING")
+    print(f"{'keyword':<10} {'cards full':>10} {'cards pushed':>12} {'collect full':>13} {'collect pushed':>15}")
+    for keyword in keywords:
+        full = _measure(args.url, keyword, pushdown=False, repeat=args.repeat)
+        pushed = _measure(args.url, keyword, pushdown=True, repeat=args.repeat)
+        print(
+            f"{keyword:<10} {full['cards']:>10.0f} {pushed['cards']:>12.0f} "
+            f"{full['collect_seconds']:>12.3f}s {pushed['collect_seconds']:>14.3f}s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
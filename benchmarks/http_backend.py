@@ -0,0 +1,69 @@
+"""Benchmark per-lookup latency of the HTTP and browser backends.
+
+Starts the local stand-in storefront and runs the same price lookup repeatedly
+through ``HttpRobotDriver`` and (optionally) the Chromium-backed ``RobotDriver``.
+
+Usage::
+
+    python -m benchmarks.http_backend --lookups 200
+    python -m benchmarks.http_backend --lookups 5 --browser
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+from time import perf_counter
+from typing import List, Optional
+
+from benchmarks.standin_storefront import start_standin_storefront
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.http_backend import HttpRobotDriver
+from robot_Driver_Playwright.my_robot_driver import STRATEGY_MIN_PRICE, RobotDriver
+
+
+def _run(driver_factory, url: str, lookups: int) -> List[float]:
+    latencies: List[float] = []
+    for _ in range(lookups):
+        started = perf_counter()
+        result = driver_factory().run_complete_task(
+            url=url,
+            product_name="iPhone",
+            selection_strategy=STRATEGY_MIN_PRICE,
+        )
+        latencies.append(perf_counter() - started)
+        if not result.success:
+            raise RuntimeError(f"Lookup failed: {result.error}")
+    return latencies
+
+
+def _report(label: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<8} n={len(latencies):<5} median={statistics.median(latencies) * 1000:9.2f} ms "
+        f"p95={p95 * 1000:9.2f} ms"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--products", type=int, default=25)
+    parser.add_argument("--browser", action="store_true", help="Also benchmark the browser backend")
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    server, url = start_standin_storefront(product_count=args.products)
+    try:
+        _report("http", _run(HttpRobotDriver, url, args.lookups))
+        if args.browser:
+            _report("browser", _run(RobotDriver, url, max(1, min(args.lookups, 10))))
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
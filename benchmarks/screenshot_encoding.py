@@ -0,0 +1,110 @@
+"""Compare screenshot encodings by size, encode time and image tokens.
+
+Renders a stand-in 1280x720 storefront screenshot (a grid of product cards
+with text) as PNG, the way Playwright returns it. It is then encoded the way
+:class:`~robot_Driver_Playwright.screenshots.ScreenshotCapturer` would, at
+several maximum sizes and formats. Reports bytes, median encode time and the
+approximate image tokens an LLM is charged (width x height / 750).
+
+Usage::
+
+    python -m benchmarks.screenshot_encoding
+    python -m benchmarks.screenshot_encoding --runs 20 --quality 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import sys
+from concurrent.futures import Future
+from time import perf_counter
+from typing import List, Optional
+
+from PIL import Image, ImageDraw
+
+from robot_Driver_Playwright.driver_logging import configure_logging
+from robot_Driver_Playwright.screenshots import FORMAT_JPEG, FORMAT_WEBP, ScreenshotCapturer
+
+PIXELS_PER_IMAGE_TOKEN = 750
+
+
+def _storefront_png(width: int = 1280, height: int = 720) -> bytes:
+    image = Image.new("RGB", (width, height), (246, 246, 246))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 60), fill=(30, 30, 30))
+    draw.text((20, 20), "StackDemo    Offers  Orders  Favourites    demouser", fill=(255, 255, 255))
+    for row in range(3):
+        for column in range(5):
+            x, y = 40 + column * 245, 90 + row * 210
+            draw.rectangle((x, y, x + 220, y + 190), fill=(255, 255, 255), outline=(220, 220, 220))
+            # Product photos are noisy, which is what makes real screenshots large as PNG.
+            photo = Image.effect_noise((100, 95), 40 + row * 10).convert("RGB")
+            tint = Image.new("RGB", (100, 95), (40 + column * 40, 90, 160))
+            image.paste(Image.blend(photo, tint, 0.5), (x + 60, y + 15))
+            draw.text((x + 10, y + 120), f"iPhone {12 - column} Pro #{row}", fill=(20, 20, 20))
+            draw.text((x + 10, y + 140), f"${499 + column * 100}.00", fill=(20, 20, 20))
+            draw.rectangle((x + 10, y + 160, x + 210, y + 182), fill=(30, 30, 30))
+            draw.text((x + 80, y + 165), "Add to cart", fill=(255, 255, 255))
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+class _StaticPage:
+    """Just enough of a Playwright page to feed the capturer a fixed PNG."""
+
+    def __init__(self, png: bytes) -> None:
+        self.png = png
+        self.version = 0
+
+    def evaluate(self, script: str) -> str:
+        self.version += 1
+        return f"page-{self.version}"
+
+    def screenshot(self, **options) -> bytes:
+        return self.png
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--quality", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    configure_logging("WARNING")
+    png = _storefront_png()
+    tokens = 1280 * 720 // PIXELS_PER_IMAGE_TOKEN
+    print(f"{'encoding':<18} {'size':>9} {'bytes':>9} {'encode ms':>10} {'tokens':>7}")
+    print(f"{'png (raw)':<18} {'1280x720':>9} {len(png):>9} {'-':>10} {tokens:>7}")
+    for image_format in (FORMAT_JPEG, FORMAT_WEBP):
+        for max_side in (1280, 800, 512):
+            capturer = ScreenshotCapturer(
+                max_width=max_side, max_height=max_side, image_format=image_format, quality=args.quality
+            )
+            page = _StaticPage(png)
+            futures: List[Future] = []
+            for _ in range(args.runs):
+                futures.append(capturer.capture(page))
+            shots = [future.result() for future in futures]
+            encode_ms = statistics.median(shot.encode_ms for shot in shots)
+            shot = shots[-1]
+            tokens = shot.width * shot.height // PIXELS_PER_IMAGE_TOKEN
+            size = f"{shot.width}x{shot.height}"
+            print(f"{image_format + ' q' + str(args.quality):<18} {size:>9} {shot.bytes:>9} {encode_ms:>10.1f} {tokens:>7}")
+
+    # Time the browser thread spends per capture when encoding is handed off.
+    capturer = ScreenshotCapturer()
+    page = _StaticPage(png)
+    started = perf_counter()
+    futures = [capturer.capture(page) for _ in range(args.runs)]
+    handoff_ms = (perf_counter() - started) * 1000 / args.runs
+    for future in futures:
+        future.result()
+    print(f"\nbrowser-thread time per capture with off-thread encoding: {handoff_ms:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
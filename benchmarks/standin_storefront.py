@@ -0,0 +1,238 @@
+"""Local stand-in for the demo storefront used by the benchmarks.
+
+Serves a minimal page with the same selectors the driver relies on (sign-in
+drop-downs, vendor filters, ``.shelf-item`` cards) plus the JSON endpoints
+``/api/signin`` and ``/api/products``. The server speaks HTTP/1.1 keep-alive so
+pooled clients can reuse connections.
+
+Run standalone with ``python -m benchmarks.standin_storefront --port 8100``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from robot_Driver_Playwright.site_adapters import BStackDemoAdapter, register_site_adapter
+
+BASE_PRODUCTS: List[Tuple[str, str, float]] = [
+    ("iPhone 12", "Apple", 799.0),
+    ("iPhone 12 Mini", "Apple", 699.0),
+    ("iPhone 12 Pro Max", "Apple", 1099.0),
+    ("iPhone 12 Pro", "Apple", 999.0),
+    ("iPhone 11", "Apple", 699.0),
+    ("iPhone 11 Pro", "Apple", 999.0),
+    ("iPhone XS", "Apple", 999.0),
+    ("iPhone XR", "Apple", 599.0),
+    ("iPhone XS Max", "Apple", 1099.0),
+    ("Galaxy S20", "Samsung", 999.0),
+    ("Galaxy S20+", "Samsung", 1199.0),
+    ("Galaxy S20 Ultra", "Samsung", 1399.0),
+    ("Galaxy S10", "Samsung", 899.0),
+    ("Galaxy S9", "Samsung", 699.0),
+    ("Galaxy Note 20", "Samsung", 999.0),
+    ("Galaxy Note 20 Ultra", "Samsung", 1299.0),
+    ("Pixel 4", "Google", 799.0),
+    ("Pixel 3", "Google", 699.0),
+    ("Pixel 4 XL", "Google", 899.0),
+    ("Pixel 3a", "Google", 399.0),
+    ("Pixel 3a XL", "Google", 479.0),
+    ("Pixel 2", "Google", 299.0),
+    ("One Plus 8", "OnePlus", 699.0),
+    ("One Plus 8T", "OnePlus", 749.0),
+    ("One Plus 8 Pro", "OnePlus", 899.0),
+]
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>StackDemo stand-in</title></head>
+<body>
+<button id="signin" onclick="showLogin()">Sign In</button>
+<span id="user"></span>
+<div id="login" style="display:none">
+  <div onclick="document.getElementById('u-opts').style.display='block'">Select Username</div>
+  <div id="u-opts" style="display:none">{username_options}</div>
+  <div onclick="document.getElementById('p-opts').style.display='block'">Select Password</div>
+  <div id="p-opts" style="display:none">{password_options}</div>
+  <button onclick="logIn()">Log In</button>
+</div>
+<div class="filters">{filters}</div>
+<div class="products-found"><span id="found"></span></div>
+<div id="grid"></div>
+<script>
+let products = [], selectedUser = null, selectedPassword = null, vendors = new Set();
+function showLogin() {{ document.getElementById('login').style.display = 'block'; }}
+function pick(kind, value, el) {{
+  if (kind === 'u') selectedUser = value; else selectedPassword = value;
+  el.parentElement.style.display = 'none';
+}}
+function render() {{
+  const visible = products.filter(p => vendors.size === 0 || vendors.has(p.availableSizes[0]));
+  document.getElementById('found').textContent = visible.length + ' Product(s) found.';
+  document.getElementById('grid').innerHTML = visible.map(p =>
+    '<div class="shelf-item"><p class="shelf-item__title">' + p.title + '</p>' +
+    '<div class="shelf-item__price"><div class="val">$' + p.price.toFixed(2) + '</div></div>' +
+    '<div class="shelf-item__buy-btn">Add to cart</div></div>').join('');
+}}
+function toggle(el) {{ el.checked ? vendors.add(el.value) : vendors.delete(el.value); render(); }}
+async function load(user) {{
+  const res = await fetch('/api/products' + (user ? '?userName=' + user : ''));
+  products = (await res.json()).products;
+  render();
+}}
+async function logIn() {{
+  const res = await fetch('/api/signin', {{method: 'POST', headers: {{'Content-Type': 'application/json'}},
+    body: JSON.stringify({{userName: selectedUser, password: selectedPassword}})}});
+  if (res.ok) {{
+    document.getElementById('login').style.display = 'none';
+    document.getElementById('user').textContent = selectedUser;
+    await load(selectedUser);
+  }}
+}}
+load(null);
+</script>
+</body></html>
+"""
+
+
+def build_products(count: int, *, seed: int = 7) -> List[Dict[str, Any]]:
+    """Return ``count`` products shaped like the storefront's ``/api/products`` payload."""
+
+    rng = random.Random(seed)
+    products: List[Dict[str, Any]] = []
+    for index in range(count):
+        title, vendor, price = BASE_PRODUCTS[index % len(BASE_PRODUCTS)]
+        if index >= len(BASE_PRODUCTS):
+            title = f"{title} #{index // len(BASE_PRODUCTS)}"
+            price = round(price * rng.uniform(0.8, 1.2), 2)
+        products.append(
+            {
+                "id": index + 1,
+                "title": title,
+                "description": title,
+                "availableSizes": [vendor],
+                "currencyFormat": "$",
+                "currencyId": "USD",
+                "price": price,
+                "isFav": False,
+            }
+        )
+    return products
+
+
+def _render_page() -> bytes:
+    adapter = BStackDemoAdapter()
+    username_options = "".join(
+        f'<div id="react-select-2-option-{i}-{i}" onclick="pick(\'u\', \'{name}\', this)">{name}</div>'
+        for i, name in enumerate(adapter.usernames)
+    )
+    password_options = "".join(
+        f'<div id="react-select-3-option-{i}-{i}" onclick="pick(\'p\', \'{value}\', this)">{value}</div>'
+        for i, value in enumerate(adapter.passwords)
+    )
+    filters = "".join(
+        f'<label><input type="checkbox" value="{vendor}" onchange="toggle(this)">'
+        f'<span class="checkmark">{vendor}</span></label>'
+        for vendor in sorted(set(adapter.vendor_filters.values()))
+    )
+    return PAGE_TEMPLATE.format(
+        username_options=username_options,
+        password_options=password_options,
+        filters=filters,
+    ).encode("utf-8")
+
+
+class StandInStorefrontHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    products: List[Dict[str, Any]] = []
+    page: bytes = b""
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body are written separately; without this, Nagle plus
+        # delayed ACKs add ~40 ms to every keep-alive response.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        return
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/products":
+            user = parse_qs(parsed.query).get("userName", [None])[0]
+            self._send_json(200, {"products": self.products, "userName": user})
+        elif parsed.path in ("/", "/index.html"):
+            self._send(200, self.page, "text/html; charset=utf-8")
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path != "/api/signin":
+            self._send_json(404, {"error": "not found"})
+            return
+        adapter = BStackDemoAdapter()
+        if body.get("userName") in adapter.usernames and body.get("password") in adapter.passwords:
+            self._send_json(200, {"user": body["userName"]})
+        else:
+            self._send_json(422, {"errorMessage": "Invalid Username"})
+
+
+class StandInAdapter(BStackDemoAdapter):
+    """BStackDemo adapter bound to the local stand-in host."""
+
+    name = "standin"
+    hosts = ("127.0.0.1", "localhost")
+
+
+def start_standin_storefront(
+    *,
+    port: int = 0,
+    product_count: int = len(BASE_PRODUCTS),
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stand-in server on a background thread and return it with its base URL."""
+
+    handler = type(
+        "BoundStandInHandler",
+        (StandInStorefrontHandler,),
+        {"products": build_products(product_count), "page": _render_page()},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    register_site_adapter(StandInAdapter())
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the demo storefront stand-in")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--products", type=int, default=len(BASE_PRODUCTS))
+    args = parser.parse_args(argv)
+    server, base_url = start_standin_storefront(port=args.port, product_count=args.products)
+    print(f"Stand-in storefront listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
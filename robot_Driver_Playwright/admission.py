@@ -0,0 +1,305 @@
+"""Per-host admission control for driver runs.
+
+Every :class:`~robot_Driver_Playwright.my_robot_driver.RobotDriver` run asks
+the :class:`AdmissionController` for a slot on the target host before it
+starts. Driver runs include those made by ``AIPlaywrightBrain``, the HTTP
+backend and the price monitor. A host admits at most ``max_concurrency`` runs
+at once, and starts new runs no faster than its token bucket allows
+(``rate_per_second`` sustained, ``burst`` at once). Excess runs wait in line
+for up to ``queue_timeout`` seconds and then fail with
+:class:`AdmissionTimeoutError`.
+
+A host's concurrency can be changed while runs are in flight with
+:meth:`AdmissionController.resize`; the autoscaler uses it. Shrinking never
+interrupts a run: the host stops admitting until enough runs have finished.
+
+Time spent waiting is reported as ``queue_seconds``, separately from the run
+itself. Admission is re-entrant per thread, so a run that is already admitted
+for a host (for example a brain run whose driver opens a nested task) does not
+queue behind itself.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from time import monotonic, sleep
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+_log = get_logger(__name__, "admission")
+
+
+class AdmissionTimeoutError(RuntimeError):
+    """Raised when a run could not be admitted within the host's queue timeout."""
+
+    def __init__(self, message: str, queue_seconds: float) -> None:
+        super().__init__(message)
+        self.queue_seconds = queue_seconds
+
+
+@dataclass(frozen=True)
+class HostLimits:
+    """Admission limits for one host; a ``rate_per_second`` of 0 disables rate limiting."""
+
+    max_concurrency: int = 4
+    rate_per_second: float = 0.0
+    burst: int = 4
+    queue_timeout: float = 60.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HostLimits":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+
+@dataclass
+class Ticket:
+    """An admitted run; ``run_seconds`` is filled in when the run finishes."""
+
+    host: str
+    queue_seconds: float = 0.0
+    run_seconds: float = 0.0
+    nested: bool = False
+    _started: float = field(default=0.0, repr=False)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations."""
+
+    def __init__(self, rate_per_second: float, burst: int) -> None:
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Take a token, returning how long to wait for it, or ``None`` if longer than ``max_wait``."""
+
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # Tokens may go negative: later callers queue behind this reservation.
+            self._tokens -= 1.0
+            return wait
+
+    def available(self) -> float:
+        with self._lock:
+            now = monotonic()
+            return min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+
+
+class ResizableSlots:
+    """A counting semaphore whose capacity can change while slots are held."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.held = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = monotonic() + timeout
+        with self._cond:
+            while self.held >= self.capacity:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.held += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.held -= 1
+            self._cond.notify()
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity; holders above a smaller capacity keep their slots until released."""
+
+        with self._cond:
+            self.capacity = capacity
+            self._cond.notify_all()
+
+
+class _HostGate:
+    def __init__(self, host: str, limits: HostLimits) -> None:
+        self.host = host
+        self.limits = limits
+        self.slots = ResizableSlots(limits.max_concurrency)
+        self.bucket = TokenBucket(limits.rate_per_second, limits.burst)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.counts = {"admitted": 0, "timed_out": 0, "queue_seconds": 0.0, "run_seconds": 0.0, "max_queue_seconds": 0.0}
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            admitted = self.counts["admitted"]
+            return {
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in self.counts.items()},
+                "avg_queue_ms": round(self.counts["queue_seconds"] / admitted * 1000, 2) if admitted else 0.0,
+                "avg_run_ms": round(self.counts["run_seconds"] / admitted * 1000, 2) if admitted else 0.0,
+                "active": self.active,
+                "waiting": self.waiting,
+                "tokens": round(self.bucket.available(), 2),
+                "limits": asdict(self.limits),
+            }
+
+
+class AdmissionController:
+    """Per-host concurrency caps and rate limits for driver runs."""
+
+    def __init__(
+        self,
+        default_limits: Optional[HostLimits] = None,
+        host_limits: Optional[Dict[str, HostLimits]] = None,
+    ) -> None:
+        self.default_limits = default_limits or HostLimits()
+        self._host_limits: Dict[str, HostLimits] = dict(host_limits or {})
+        self._gates: Dict[str, _HostGate] = {}
+        self._lock = threading.Lock()
+        self._held = threading.local()
+
+    def configure(self, host: str, limits: HostLimits) -> None:
+        """Set the limits for ``host`` (and its subdomains); applies to runs admitted afterwards."""
+
+        host = host.lower()
+        with self._lock:
+            self._host_limits[host] = limits
+            for key in [key for key in self._gates if key == host or key.endswith(f".{host}")]:
+                del self._gates[key]
+
+    def resize(self, host: str, max_concurrency: int) -> None:
+        """Change ``host``'s concurrency cap in place; runs already admitted are not affected."""
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        gate = self._gate(host.lower())
+        with gate.lock:
+            gate.limits = replace(gate.limits, max_concurrency=max_concurrency)
+        gate.slots.resize(max_concurrency)
+
+    def host_stats(self, host: str) -> Dict[str, Any]:
+        """Counters for one host, creating its gate if no run has reached it yet."""
+
+        return self._gate(host.lower()).stats()
+
+    def limits_for(self, host: str) -> HostLimits:
+        host = host.lower()
+        with self._lock:
+            for candidate, limits in self._host_limits.items():
+                if host == candidate or host.endswith(f".{candidate}"):
+                    return limits
+        return self.default_limits
+
+    @contextmanager
+    def admit(self, url: str) -> Iterator[Ticket]:
+        """Wait for a slot and a rate token on ``url``'s host, then run the block."""
+
+        host = (urlparse(url).hostname or url).lower()
+        held = self._held_hosts()
+        if host in held:
+            yield Ticket(host=host, nested=True)
+            return
+
+        gate = self._gate(host)
+        ticket = self._acquire(gate)
+        held.add(host)
+        try:
+            yield ticket
+        finally:
+            held.discard(host)
+            ticket.run_seconds = monotonic() - ticket._started
+            with gate.lock:
+                gate.active -= 1
+                gate.counts["run_seconds"] += ticket.run_seconds
+            gate.slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            gates = list(self._gates.values())
+        return {
+            "default_limits": asdict(self.default_limits),
+            "hosts": {gate.host: gate.stats() for gate in gates},
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _held_hosts(self) -> set:
+        held = getattr(self._held, "hosts", None)
+        if held is None:
+            held = self._held.hosts = set()
+        return held
+
+    def _gate(self, host: str) -> _HostGate:
+        limits = self.limits_for(host)
+        with self._lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                gate = self._gates[host] = _HostGate(host, limits)
+            return gate
+
+    def _acquire(self, gate: _HostGate) -> Ticket:
+        started = monotonic()
+        timeout = gate.limits.queue_timeout
+        with gate.lock:
+            gate.waiting += 1
+        try:
+            if not gate.slots.acquire(timeout=timeout):
+                raise self._timed_out(gate, started, "concurrency limit")
+            wait = gate.bucket.reserve(max(0.0, timeout - (monotonic() - started)))
+            if wait is None:
+                gate.slots.release()
+                raise self._timed_out(gate, started, "rate limit")
+            if wait:
+                sleep(wait)
+        finally:
+            with gate.lock:
+                gate.waiting -= 1
+
+        queue_seconds = monotonic() - started
+        with gate.lock:
+            gate.active += 1
+            gate.counts["admitted"] += 1
+            gate.counts["queue_seconds"] += queue_seconds
+            gate.counts["max_queue_seconds"] = max(gate.counts["max_queue_seconds"], queue_seconds)
+        if queue_seconds >= 0.5:
+            _log.info("Admitted run on %s after %.2fs in queue", gate.host, queue_seconds)
+        return Ticket(host=gate.host, queue_seconds=queue_seconds, _started=monotonic())
+
+    def _timed_out(self, gate: _HostGate, started: float, reason: str) -> AdmissionTimeoutError:
+        queue_seconds = monotonic() - started
+        with gate.lock:
+            gate.counts["timed_out"] += 1
+        _log.warning("Admission to %s timed out after %.2fs (%s)", gate.host, queue_seconds, reason)
+        return AdmissionTimeoutError(
+            f"Admission to {gate.host} timed out after {queue_seconds:.1f}s ({reason})",
+            queue_seconds,
+        )
+
+
+# ----------------------------------------------------------------------
+# Process-wide default controller
+# ----------------------------------------------------------------------
+_DEFAULT_CONTROLLER = AdmissionController()
+
+
+def set_default_admission_controller(controller: AdmissionController) -> None:
+    """Make ``controller`` admit every driver run in this process that has no explicit one."""
+
+    global _DEFAULT_CONTROLLER
+    _DEFAULT_CONTROLLER = controller
+
+
+def default_admission_controller() -> AdmissionController:
+    return _DEFAULT_CONTROLLER
@@ -0,0 +1,393 @@
+"""Scale worker and browser capacity from queue wait and utilization.
+
+An :class:`Autoscaler` periodically reads each registered
+:class:`ScalingTarget` and grows or shrinks its capacity between the
+``min_capacity`` and ``max_capacity`` of its :class:`ScalingPolicy`. Two
+targets come with it:
+
+* :class:`AdmissionTarget` scales a host's admission concurrency, i.e. how
+  many driver runs (``RobotDriver`` tasks, including those started by
+  ``AIPlaywrightBrain``) execute at once on worker threads.
+* :class:`WarmPoolTarget` scales the number of browsers parked in a
+  :class:`~robot_Driver_Playwright.page_pool.WarmPagePool`.
+
+Capacity goes up when work waits: the average queue wait since the last
+evaluation reaches ``scale_up_queue_seconds``, a request timed out or found
+no capacity, or utilization reaches ``scale_up_utilization``. It goes down
+only when nothing waits, queue wait is at most ``scale_down_queue_seconds``
+and utilization is at most ``scale_down_utilization``. The gap between the
+two sets of thresholds, the number of consecutive evaluations each direction
+needs and a cooldown after every change keep capacity from flapping.
+
+Scale-down is graceful: targets stop handing out the removed capacity but
+let work that already holds it finish. Every scale-up and scale-down is
+logged with the signals behind it and kept in a short history for
+:meth:`Autoscaler.stats`. So are changes that were wanted but blocked by
+``max_capacity`` or a cooldown.
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from time import monotonic, time
+from typing import Any, Deque, Dict, List, Optional
+
+from robot_Driver_Playwright.admission import AdmissionController
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.page_pool import WarmPagePool
+
+ACTION_UP = "up"
+ACTION_DOWN = "down"
+ACTION_HOLD = "hold"
+
+DEFAULT_INTERVAL_SECONDS = 5.0
+DEFAULT_HISTORY = 200
+
+_log = get_logger(__name__, "autoscaler")
+
+
+@dataclass
+class ScalingPolicy:
+    """Bounds, thresholds and damping for one target."""
+
+    min_capacity: int = 1
+    max_capacity: int = 8
+    scale_up_queue_seconds: float = 1.0
+    scale_up_utilization: float = 0.9
+    scale_down_queue_seconds: float = 0.05
+    scale_down_utilization: float = 0.4
+    step_up: int = 1
+    step_down: int = 1
+    up_after: int = 2
+    down_after: int = 6
+    up_cooldown_seconds: float = 10.0
+    down_cooldown_seconds: float = 60.0
+
+    def __post_init__(self) -> None:
+        if self.min_capacity < 1:
+            raise ValueError("min_capacity must be at least 1")
+        if self.max_capacity < self.min_capacity:
+            raise ValueError("max_capacity cannot be below min_capacity")
+        if self.scale_down_queue_seconds > self.scale_up_queue_seconds:
+            raise ValueError("scale_down_queue_seconds must not exceed scale_up_queue_seconds")
+        if self.scale_down_utilization >= self.scale_up_utilization:
+            raise ValueError("scale_down_utilization must be below scale_up_utilization")
+        if self.step_up < 1 or self.step_down < 1 or self.up_after < 1 or self.down_after < 1:
+            raise ValueError("steps and streak lengths must be at least 1")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScalingPolicy":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+
+@dataclass
+class ScalingSignals:
+    """What a target reports at one evaluation; counts cover the time since the last one."""
+
+    capacity: int
+    in_use: int
+    waiting: int = 0
+    queue_wait_seconds: Optional[float] = None
+    served: int = 0
+    rejected: int = 0
+
+    @property
+    def utilization(self) -> float:
+        return self.in_use / self.capacity if self.capacity else 1.0
+
+    def describe(self) -> str:
+        wait = "n/a" if self.queue_wait_seconds is None else f"{self.queue_wait_seconds * 1000:.0f} ms"
+        return (
+            f"capacity={self.capacity} in_use={self.in_use} utilization={self.utilization:.0%} "
+            f"waiting={self.waiting} queue_wait={wait} served={self.served} rejected={self.rejected}"
+        )
+
+
+@dataclass
+class ScalingDecision:
+    target: str
+    action: str
+    capacity: int
+    new_capacity: int
+    reason: str
+    signals: Dict[str, Any]
+    applied: bool = False
+    at: float = field(default_factory=time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ScalingTarget(ABC):
+    """Something with a capacity the autoscaler can read and change."""
+
+    name = "target"
+
+    @abstractmethod
+    def signals(self) -> ScalingSignals:
+        """Current capacity, usage and the demand seen since the last call."""
+
+    @abstractmethod
+    def resize(self, capacity: int) -> None:
+        """Set the capacity to ``capacity``."""
+
+
+class AdmissionTarget(ScalingTarget):
+    """Worker capacity: the admission concurrency cap of one host."""
+
+    def __init__(self, controller: AdmissionController, host: str) -> None:
+        self.controller = controller
+        self.host = host.lower()
+        self.name = f"workers:{self.host}"
+        self._last = self._counters(controller.host_stats(self.host))
+
+    def signals(self) -> ScalingSignals:
+        stats = self.controller.host_stats(self.host)
+        admitted, queue_seconds, timed_out = self._counters(stats)
+        served = admitted - self._last[0]
+        waited = queue_seconds - self._last[1]
+        rejected = timed_out - self._last[2]
+        self._last = (admitted, queue_seconds, timed_out)
+        return ScalingSignals(
+            capacity=stats["limits"]["max_concurrency"],
+            in_use=stats["active"],
+            waiting=stats["waiting"],
+            queue_wait_seconds=waited / served if served else None,
+            served=served,
+            rejected=rejected,
+        )
+
+    def resize(self, capacity: int) -> None:
+        self.controller.resize(self.host, capacity)
+
+    @staticmethod
+    def _counters(stats: Dict[str, Any]) -> tuple:
+        return stats["admitted"], stats["queue_seconds"], stats["timed_out"]
+
+
+class WarmPoolTarget(ScalingTarget):
+    """Browser capacity: the number of pages parked in a warm pool."""
+
+    def __init__(self, pool: WarmPagePool) -> None:
+        self.pool = pool
+        self.name = "browsers:warm_pool"
+        self._last = self._counters(pool.stats())
+
+    def signals(self) -> ScalingSignals:
+        stats = self.pool.stats()
+        checkouts, wait_seconds, exhausted = self._counters(stats)
+        served = checkouts - self._last[0]
+        waited = wait_seconds - self._last[1]
+        rejected = exhausted - self._last[2]
+        self._last = (checkouts, wait_seconds, exhausted)
+        return ScalingSignals(
+            capacity=stats["size"],
+            in_use=max(0, stats["open"] - stats["idle"]),
+            queue_wait_seconds=waited / served if served else None,
+            served=served,
+            rejected=rejected,
+        )
+
+    def resize(self, capacity: int) -> None:
+        self.pool.resize(capacity)
+
+    @staticmethod
+    def _counters(stats: Dict[str, Any]) -> tuple:
+        return stats["checkouts"], stats["wait_seconds"], stats["exhausted"]
+
+
+class _TargetState:
+    def __init__(self, target: ScalingTarget, policy: ScalingPolicy) -> None:
+        self.target = target
+        self.policy = policy
+        self.up_streak = 0
+        self.down_streak = 0
+        self.last_change = float("-inf")
+        self.counts = {"evaluations": 0, "scaled_up": 0, "scaled_down": 0, "blocked": 0}
+        self.last_signals: Optional[ScalingSignals] = None
+
+
+class Autoscaler:
+    """Periodically resizes registered targets within their policies' bounds."""
+
+    def __init__(self, *, interval_seconds: float = DEFAULT_INTERVAL_SECONDS, history: int = DEFAULT_HISTORY) -> None:
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.interval_seconds = interval_seconds
+        self._targets: Dict[str, _TargetState] = {}
+        self._history: Deque[ScalingDecision] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="autoscaler", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def add(self, target: ScalingTarget, policy: Optional[ScalingPolicy] = None) -> None:
+        """Register ``target``; its capacity is clamped into the policy's bounds right away."""
+
+        state = _TargetState(target, policy or ScalingPolicy())
+        with self._lock:
+            self._targets[target.name] = state
+        capacity = target.signals().capacity
+        bounded = min(max(capacity, state.policy.min_capacity), state.policy.max_capacity)
+        if bounded != capacity:
+            _log.info("Scaling %s from %d to %d to fit its bounds", target.name, capacity, bounded)
+            target.resize(bounded)
+
+    def evaluate(self) -> List[ScalingDecision]:
+        """Run one evaluation of every target and return the decisions that were not steady holds."""
+
+        with self._lock:
+            states = list(self._targets.values())
+        decisions = []
+        for state in states:
+            try:
+                decision = self._evaluate(state)
+            except Exception as exc:  # noqa: BLE001 - one broken target must not stop the others
+                _log.warning("Could not evaluate %s: %s", state.target.name, exc)
+                continue
+            if decision is not None:
+                decisions.append(decision)
+        return decisions
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states = list(self._targets.values())
+            history = [decision.to_dict() for decision in self._history]
+        return {
+            "interval_seconds": self.interval_seconds,
+            "targets": {
+                state.target.name: {
+                    **state.counts,
+                    "policy": asdict(state.policy),
+                    "signals": asdict(state.last_signals) if state.last_signals else None,
+                }
+                for state in states
+            },
+            "decisions": history,
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _evaluate(self, state: _TargetState) -> Optional[ScalingDecision]:
+        policy = state.policy
+        signals = state.target.signals()
+        state.last_signals = signals
+        state.counts["evaluations"] += 1
+
+        up_reason = self._pressure(policy, signals)
+        down_reason = None if up_reason else self._slack(policy, signals)
+        state.up_streak = state.up_streak + 1 if up_reason else 0
+        state.down_streak = state.down_streak + 1 if down_reason else 0
+
+        capacity = signals.capacity
+        since_change = monotonic() - state.last_change
+        if up_reason and state.up_streak >= policy.up_after:
+            wanted = min(policy.max_capacity, capacity + policy.step_up)
+            blocked = self._blocked(capacity, wanted, since_change, policy.up_cooldown_seconds, "max_capacity")
+            return self._decide(state, ACTION_UP, capacity, wanted, up_reason, signals, blocked)
+        if down_reason and state.down_streak >= policy.down_after:
+            wanted = max(policy.min_capacity, capacity - policy.step_down)
+            if wanted == capacity:
+                # Idle at the floor is the steady state, not a blocked decision.
+                state.down_streak = 0
+                return None
+            blocked = self._blocked(capacity, wanted, since_change, policy.down_cooldown_seconds, "min_capacity")
+            return self._decide(state, ACTION_DOWN, capacity, wanted, down_reason, signals, blocked)
+        return None
+
+    @staticmethod
+    def _pressure(policy: ScalingPolicy, signals: ScalingSignals) -> Optional[str]:
+        if signals.rejected:
+            return f"{signals.rejected} request(s) found no capacity"
+        wait = signals.queue_wait_seconds
+        if wait is not None and wait >= policy.scale_up_queue_seconds:
+            return f"queue wait {wait * 1000:.0f} ms >= {policy.scale_up_queue_seconds * 1000:.0f} ms"
+        if signals.utilization >= policy.scale_up_utilization:
+            return f"utilization {signals.utilization:.0%} >= {policy.scale_up_utilization:.0%}"
+        return None
+
+    @staticmethod
+    def _slack(policy: ScalingPolicy, signals: ScalingSignals) -> Optional[str]:
+        wait = signals.queue_wait_seconds
+        if signals.waiting or (wait is not None and wait > policy.scale_down_queue_seconds):
+            return None
+        if signals.utilization > policy.scale_down_utilization:
+            return None
+        return f"utilization {signals.utilization:.0%} <= {policy.scale_down_utilization:.0%} with no queue"
+
+    @staticmethod
+    def _blocked(capacity: int, wanted: int, since_change: float, cooldown: float, bound: str) -> Optional[str]:
+        if wanted == capacity:
+            return f"at {bound}"
+        if since_change < cooldown:
+            return f"cooling down ({cooldown - since_change:.1f}s left)"
+        return None
+
+    def _decide(
+        self,
+        state: _TargetState,
+        action: str,
+        capacity: int,
+        wanted: int,
+        reason: str,
+        signals: ScalingSignals,
+        blocked: Optional[str],
+    ) -> ScalingDecision:
+        name = state.target.name
+        decision = ScalingDecision(
+            target=name,
+            action=action if blocked is None else ACTION_HOLD,
+            capacity=capacity,
+            new_capacity=capacity if blocked else wanted,
+            reason=reason if blocked is None else f"{reason}; {blocked}",
+            signals={**asdict(signals), "utilization": round(signals.utilization, 3)},
+        )
+        if blocked is None:
+            try:
+                state.target.resize(wanted)
+            except Exception as exc:  # noqa: BLE001 - keep evaluating; try again next round
+                decision.reason = f"{reason}; resize failed: {exc}"
+                _log.warning("Scaling %s %s to %d failed: %s", name, action, wanted, exc)
+            else:
+                decision.applied = True
+                state.last_change = monotonic()
+                state.counts["scaled_up" if action == ACTION_UP else "scaled_down"] += 1
+                _log.info(
+                    "Scaled %s %s from %d to %d: %s [%s]",
+                    name,
+                    action,
+                    capacity,
+                    wanted,
+                    reason,
+                    signals.describe(),
+                )
+        else:
+            state.counts["blocked"] += 1
+            _log.info("Holding %s at %d: %s [%s]", name, capacity, decision.reason, signals.describe())
+        # A new streak is needed before the next decision, so a blocked one is not repeated every round.
+        state.up_streak = state.down_streak = 0
+        with self._lock:
+            self._history.append(decision)
+        return decision
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.evaluate()
@@ -0,0 +1,361 @@
+"""Memory sampling for long-lived browsers, and the limits that trigger recycling.
+
+Browsers that stay up for days (the warm page pool, the MCP context pool)
+slowly grow their renderers. :class:`BrowserMemoryMonitor` keeps the latest
+sample for each browser and context it is shown, and decides when one has
+grown past its limits and should be recycled.
+
+Two sources feed a sample:
+
+* The OS process tree. CDP's ``SystemInfo.getProcessInfo`` names the
+  browser's own process; the monitor adds up the resident memory (RSS) of it
+  and every process below it: renderers, GPU and utility processes. RSS is
+  read with ``psutil`` when it is installed, otherwise from ``/proc`` on
+  Linux. Elsewhere it is left empty.
+* CDP ``Performance.getMetrics`` for each page: JS heap used and total, DOM
+  nodes and documents. These are added up per context.
+
+Sampling talks to the browser, so call :func:`sample_browser` and
+:func:`sample_context` on the thread that owns it. The monitor itself is
+thread-safe.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from time import monotonic, time
+from typing import Any, Dict, Iterable, List, Optional
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+KIND_BROWSER = "browser"
+KIND_CONTEXT = "context"
+
+DEFAULT_MAX_BROWSER_RSS_MB = 1536.0
+DEFAULT_MAX_CONTEXT_HEAP_MB = 256.0
+DEFAULT_MAX_CONTEXT_TASKS = 500
+DEFAULT_MAX_BROWSER_TASKS = 2000
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 30.0
+
+RECYCLE_RSS = "rss"
+RECYCLE_HEAP = "js_heap"
+RECYCLE_TASKS = "tasks"
+
+RSS_SOURCE_PSUTIL = "psutil"
+RSS_SOURCE_PROC = "proc"
+
+_MB = 1024 * 1024
+
+_log = get_logger(__name__, "browser-memory")
+
+
+@dataclass
+class MemoryLimits:
+    """When a browser or context should be recycled; ``None`` disables a limit."""
+
+    max_browser_rss_mb: Optional[float] = DEFAULT_MAX_BROWSER_RSS_MB
+    max_context_heap_mb: Optional[float] = DEFAULT_MAX_CONTEXT_HEAP_MB
+    max_context_tasks: Optional[int] = DEFAULT_MAX_CONTEXT_TASKS
+    max_browser_tasks: Optional[int] = DEFAULT_MAX_BROWSER_TASKS
+    sample_interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS
+
+    def __post_init__(self) -> None:
+        for name in ("max_browser_rss_mb", "max_context_heap_mb", "max_context_tasks", "max_browser_tasks"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive (or None to disable it)")
+        if self.sample_interval_seconds < 0:
+            raise ValueError("sample_interval_seconds cannot be negative")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MemoryLimits":
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown memory limit(s): {sorted(unknown)}")
+        return cls(**data)
+
+
+@dataclass
+class MemorySample:
+    """One reading for a browser (its whole process tree) or a context (its pages)."""
+
+    label: str
+    kind: str
+    tasks: int = 0
+    rss_bytes: Optional[int] = None
+    processes: int = 0
+    js_heap_used_bytes: Optional[int] = None
+    js_heap_total_bytes: Optional[int] = None
+    dom_nodes: Optional[int] = None
+    documents: Optional[int] = None
+    pages: int = 0
+    sampled_at: float = field(default_factory=time)
+
+    @property
+    def rss_mb(self) -> Optional[float]:
+        return None if self.rss_bytes is None else round(self.rss_bytes / _MB, 1)
+
+    @property
+    def js_heap_mb(self) -> Optional[float]:
+        return None if self.js_heap_used_bytes is None else round(self.js_heap_used_bytes / _MB, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "rss_mb": self.rss_mb, "js_heap_mb": self.js_heap_mb}
+
+
+# ----------------------------------------------------------------------
+# Sampling (call on the browser's thread)
+# ----------------------------------------------------------------------
+def sample_browser(browser: Any, label: str, *, tasks: int = 0, contexts: Iterable[Any] = ()) -> MemorySample:
+    """Measure ``browser``'s process tree and the JS heap of ``contexts``' pages."""
+
+    sample = MemorySample(label=label, kind=KIND_BROWSER, tasks=tasks)
+    pid = _browser_pid(browser)
+    if pid is not None:
+        pids = process_tree(pid)
+        sample.processes = len(pids)
+        sample.rss_bytes = rss_bytes(pids)
+    for context in contexts:
+        _add_page_metrics(sample, context)
+    return sample
+
+
+def sample_context(context: Any, label: str, *, tasks: int = 0) -> MemorySample:
+    """Add up the CDP performance metrics of every page in ``context``."""
+
+    sample = MemorySample(label=label, kind=KIND_CONTEXT, tasks=tasks)
+    _add_page_metrics(sample, context)
+    return sample
+
+
+def _browser_pid(browser: Any) -> Optional[int]:
+    try:
+        session = browser.new_browser_cdp_session()
+        try:
+            info = session.send("SystemInfo.getProcessInfo")
+        finally:
+            with suppress(Exception):
+                session.detach()
+    except Exception as exc:  # noqa: BLE001 - not Chromium, or the browser is gone
+        _log.debug("Could not read the browser's process info: %s", exc)
+        return None
+    for process in info.get("processInfo", []):
+        if process.get("type") == "browser":
+            return int(process["id"])
+    return None
+
+
+def _add_page_metrics(sample: MemorySample, context: Any) -> None:
+    try:
+        pages = list(context.pages)
+    except Exception:  # noqa: BLE001 - a closed context has no pages
+        return
+    for page in pages:
+        metrics = page_metrics(context, page)
+        if metrics is None:
+            continue
+        sample.pages += 1
+        for name, attribute in (
+            ("JSHeapUsedSize", "js_heap_used_bytes"),
+            ("JSHeapTotalSize", "js_heap_total_bytes"),
+            ("Nodes", "dom_nodes"),
+            ("Documents", "documents"),
+        ):
+            if name in metrics:
+                setattr(sample, attribute, (getattr(sample, attribute) or 0) + int(metrics[name]))
+
+
+def page_metrics(context: Any, page: Any) -> Optional[Dict[str, float]]:
+    """Return ``page``'s CDP ``Performance.getMetrics`` as a dict, or ``None``."""
+
+    try:
+        session = context.new_cdp_session(page)
+        try:
+            session.send("Performance.enable")
+            result = session.send("Performance.getMetrics")
+        finally:
+            with suppress(Exception):
+                session.detach()
+    except Exception as exc:  # noqa: BLE001 - closed or crashed page
+        _log.debug("Could not read page metrics: %s", exc)
+        return None
+    return {metric["name"]: metric["value"] for metric in result.get("metrics", [])}
+
+
+# ----------------------------------------------------------------------
+# OS process tree
+# ----------------------------------------------------------------------
+def rss_source() -> Optional[str]:
+    """Where RSS comes from on this host: ``psutil``, ``/proc``, or nowhere."""
+
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        return RSS_SOURCE_PROC if os.path.isdir("/proc/self") else None
+    return RSS_SOURCE_PSUTIL
+
+
+def process_tree(pid: int) -> List[int]:
+    """``pid`` and all of its descendants that are still running."""
+
+    source = rss_source()
+    if source == RSS_SOURCE_PSUTIL:
+        import psutil
+
+        try:
+            root = psutil.Process(pid)
+            return [pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return []
+    if source != RSS_SOURCE_PROC:
+        return [pid]
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as handle:
+                stat = handle.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after its ")".
+        parent = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        children.setdefault(parent, []).append(int(entry))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def rss_bytes(pids: Iterable[int]) -> Optional[int]:
+    """Total resident memory of ``pids``, or ``None`` if it cannot be read here."""
+
+    source = rss_source()
+    total = 0
+    if source == RSS_SOURCE_PSUTIL:
+        import psutil
+
+        for pid in pids:
+            with suppress(psutil.Error):
+                total += psutil.Process(pid).memory_info().rss
+        return total
+    if source != RSS_SOURCE_PROC:
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as handle:
+                total += int(handle.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+# ----------------------------------------------------------------------
+# Monitor
+# ----------------------------------------------------------------------
+class BrowserMemoryMonitor:
+    """Latest samples per browser and context, and the recycle decisions made on them."""
+
+    def __init__(self, limits: Optional[MemoryLimits] = None) -> None:
+        self.limits = limits or MemoryLimits()
+        self._samples: Dict[str, MemorySample] = {}
+        self._sampled_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._counts = {"sampled": 0, "recycled_browsers": 0, "recycled_contexts": 0}
+        self._recycle_reasons: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def due(self, label: str) -> bool:
+        """Return ``True`` if ``label`` has not been sampled within the sample interval."""
+
+        with self._lock:
+            last = self._sampled_at.get(label)
+        return last is None or monotonic() - last >= self.limits.sample_interval_seconds
+
+    def record(self, sample: MemorySample) -> Optional[str]:
+        """Keep ``sample`` and return why it should be recycled, or ``None``."""
+
+        with self._lock:
+            self._samples[sample.label] = sample
+            self._sampled_at[sample.label] = monotonic()
+            self._counts["sampled"] += 1
+        reason = self.recycle_reason(sample)
+        _log.debug(
+            "%s %s: rss=%s MB heap=%s MB tasks=%d%s",
+            sample.kind,
+            sample.label,
+            sample.rss_mb,
+            sample.js_heap_mb,
+            sample.tasks,
+            f" -> recycle ({reason})" if reason else "",
+        )
+        return reason
+
+    def recycle_reason(self, sample: MemorySample) -> Optional[str]:
+        limits = self.limits
+        if sample.kind == KIND_BROWSER:
+            max_tasks = limits.max_browser_tasks
+            if limits.max_browser_rss_mb is not None and sample.rss_bytes is not None:
+                if sample.rss_bytes > limits.max_browser_rss_mb * _MB:
+                    return RECYCLE_RSS
+        else:
+            max_tasks = limits.max_context_tasks
+            if limits.max_context_heap_mb is not None and sample.js_heap_used_bytes is not None:
+                if sample.js_heap_used_bytes > limits.max_context_heap_mb * _MB:
+                    return RECYCLE_HEAP
+        if max_tasks is not None and sample.tasks >= max_tasks:
+            return RECYCLE_TASKS
+        return None
+
+    def recycled(self, label: str, kind: str, reason: str) -> None:
+        """Count a recycle and drop ``label``'s samples; its replacement starts fresh."""
+
+        with self._lock:
+            sample = self._samples.pop(label, None)
+            self._sampled_at.pop(label, None)
+            self._counts["recycled_browsers" if kind == KIND_BROWSER else "recycled_contexts"] += 1
+            self._recycle_reasons[reason] = self._recycle_reasons.get(reason, 0) + 1
+        if sample is None:
+            _log.warning("Recycling %s %s (%s)", kind, label, reason)
+            return
+        _log.warning(
+            "Recycling %s %s (%s): rss=%s MB heap=%s MB tasks=%d",
+            kind,
+            label,
+            reason,
+            sample.rss_mb,
+            sample.js_heap_mb,
+            sample.tasks,
+        )
+
+    def forget(self, label: str) -> None:
+        with self._lock:
+            self._samples.pop(label, None)
+            self._sampled_at.pop(label, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples.values())
+            counts = dict(self._counts)
+            reasons = dict(self._recycle_reasons)
+        browsers = [sample for sample in samples if sample.kind == KIND_BROWSER]
+        known_rss = [sample.rss_bytes for sample in browsers if sample.rss_bytes is not None]
+        heaps = [sample.js_heap_used_bytes for sample in samples if sample.js_heap_used_bytes is not None]
+        return {
+            **counts,
+            "recycle_reasons": reasons,
+            "rss_source": rss_source(),
+            "total_browser_rss_mb": round(sum(known_rss) / _MB, 1) if known_rss else None,
+            "max_browser_rss_mb": round(max(known_rss) / _MB, 1) if known_rss else None,
+            "max_js_heap_mb": round(max(heaps) / _MB, 1) if heaps else None,
+            "limits": asdict(self.limits),
+            "samples": [sample.to_dict() for sample in sorted(samples, key=lambda sample: sample.label)],
+        }
@@ -0,0 +1,436 @@
+"""Long-lived, logged-in browser sessions driven by individual commands.
+
+A :class:`BrowserSession` starts a browser once, navigates, logs in and
+extracts the catalog, then accepts commands (locate a product, change the
+default strategy, add to cart, refresh the catalog, or sync only the cards that
+changed since the last sync) against the same live page.
+Playwright's sync API is bound to the thread that started it, so every session
+owns a single worker thread and all of its driver calls run there.
+
+Opening a session and every command or lookup on it is admitted on the site's
+host, like a one-shot driver run. An idle session holds no admission slot.
+
+:class:`SessionManager` hands out session ids, enforces a session cap and
+reaps sessions that have been idle longer than the configured timeout.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict
+from time import monotonic, perf_counter
+from typing import Any, Callable, ContextManager, Dict, List, Optional, TypeVar
+
+from robot_Driver_Playwright.browser_memory import MemorySample, sample_browser, sample_context
+from robot_Driver_Playwright.catalog import ColumnarCatalog
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.my_robot_driver import (
+    ALLOWED_STRATEGIES,
+    STRATEGY_MATCH,
+    RobotDriver,
+    RobotDriverResult,
+    SelectionParams,
+)
+
+COMMAND_LOCATE_PRODUCT = "locate_product"
+COMMAND_SET_STRATEGY = "set_strategy"
+COMMAND_ADD_TO_CART = "add_to_cart"
+COMMAND_REFRESH_CATALOG = "refresh_catalog"
+COMMAND_SYNC_CATALOG = "sync_catalog"
+ALLOWED_COMMANDS = [
+    COMMAND_LOCATE_PRODUCT,
+    COMMAND_SET_STRATEGY,
+    COMMAND_ADD_TO_CART,
+    COMMAND_REFRESH_CATALOG,
+    COMMAND_SYNC_CATALOG,
+]
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 300.0
+DEFAULT_MAX_SESSIONS = 8
+
+T = TypeVar("T")
+
+
+class SessionError(RuntimeError):
+    """Raised when a session cannot be created or a command cannot run."""
+
+
+class SessionNotFoundError(SessionError):
+    """Raised when a session id is unknown or already closed."""
+
+
+class BrowserSession:
+    """One browser, logged in and parked on the catalog page."""
+
+    def __init__(self, session_id: str, *, timeout_ms: int = 10_000) -> None:
+        self.session_id = session_id
+        # No filter pushdown: a ticked vendor filter would outlive this request on the live page.
+        self.driver = RobotDriver(timeout_ms=timeout_ms, task_id=f"session-{session_id}", filter_pushdown=False)
+        self.selection_strategy = STRATEGY_MATCH
+        self.selection_params = SelectionParams()
+        self.catalog: List[Dict[str, Any]] = []
+        # Set by sync_catalog and kept current by later syncs; a full refresh clears it.
+        self.columnar: Optional[ColumnarCatalog] = None
+        self.url: Optional[str] = None
+        self.created_at = monotonic()
+        self.last_used = self.created_at
+        self.refreshed_at = self.created_at
+        self.commands_run = 0
+        self.closed = False
+        # Commands in flight; the idle reaper never closes a session while this is non-zero.
+        self._busy = 0
+        self._state_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"session-{session_id}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def open(
+        self,
+        url: str,
+        *,
+        headless: bool = True,
+        username_index: int = 0,
+        password_index: int = 0,
+    ) -> Dict[str, Any]:
+        def _open() -> Dict[str, Any]:
+            driver = self.driver
+            if not driver._start_browser(headless=headless):
+                raise SessionError("Failed to start browser")
+            if not driver._navigate(url):
+                raise SessionError("Failed to navigate to site")
+            if not driver._login(username_index=username_index, password_index=password_index):
+                raise SessionError("Failed to login")
+            self.url = url
+            self.catalog = driver._gather_catalog()
+            self.refreshed_at = monotonic()
+            return {"catalog_size": len(self.catalog), "extraction": driver.last_extraction}
+
+        try:
+            with self.driver._admission_controller().admit(url):
+                return self._run(_open)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        with self._state_lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._teardown()
+
+    def close_if_idle(self, cutoff: float) -> bool:
+        """Close the session if no command is running and it was last used before ``cutoff``."""
+
+        with self._state_lock:
+            if self.closed or self._busy or self.last_used >= cutoff:
+                return False
+            self.closed = True
+        self._teardown()
+        return True
+
+    def _teardown(self) -> None:
+        try:
+            self._executor.submit(self.driver._close_browser).result(timeout=30)
+        except Exception:  # noqa: BLE001 - closing must not raise
+            pass
+        self._executor.shutdown(wait=False)
+
+    def describe(self) -> Dict[str, Any]:
+        now = monotonic()
+        return {
+            "session_id": self.session_id,
+            "url": self.url,
+            "selection_strategy": self.selection_strategy,
+            "selection_params": asdict(self.selection_params),
+            "catalog_size": len(self.catalog),
+            "commands_run": self.commands_run,
+            "age_seconds": round(now - self.created_at, 2),
+            "refreshed_seconds_ago": round(now - self.refreshed_at, 2),
+            "idle_seconds": round(now - self.last_used, 2),
+            "busy": self._busy > 0,
+        }
+
+    def is_parked(self) -> bool:
+        """Return ``True`` while the page is still logged in on the catalog."""
+
+        if self.closed or self.url is None:
+            return False
+        url = self.url
+        return self._run(lambda: self.driver._is_parked(url))
+
+    def sample_memory(self) -> List[MemorySample]:
+        """Measure this session's browser process tree and the pages in its context.
+
+        Sampling does not count as use, so it never keeps an idle session alive.
+        """
+
+        if self.closed:
+            raise SessionNotFoundError(f"Session '{self.session_id}' is closed")
+        driver = self.driver
+        label = f"session-{self.session_id}"
+
+        def _sample() -> List[MemorySample]:
+            return [
+                sample_browser(driver._browser, label, tasks=self.commands_run),
+                sample_context(driver._context, f"{label}/context", tasks=self.commands_run),
+            ]
+
+        return self._executor.submit(_sample).result()
+
+    def locate(
+        self,
+        product_name: str,
+        *,
+        selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
+    ) -> RobotDriverResult:
+        """Extract the catalog from the live page and select a product."""
+
+        if self.closed:
+            raise SessionNotFoundError(f"Session '{self.session_id}' is closed")
+        with self._admitted():
+            result = self._run(
+                lambda: self.driver.locate_on_current_page(
+                    product_name,
+                    selection_strategy=selection_strategy,
+                    selection_params=selection_params,
+                )
+            )
+        self.commands_run += 1
+        return result
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    def execute(self, command: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run ``command`` against the live page and return a JSON-friendly result."""
+
+        if self.closed:
+            raise SessionNotFoundError(f"Session '{self.session_id}' is closed")
+        if command not in ALLOWED_COMMANDS:
+            raise SessionError(f"Unsupported command '{command}'. Choose from {ALLOWED_COMMANDS}.")
+        arguments = arguments or {}
+        handler: Callable[[Dict[str, Any]], Dict[str, Any]] = getattr(self, f"_cmd_{command}")
+        started = perf_counter()
+        with self._admitted():
+            result = self._run(lambda: handler(arguments))
+        self.commands_run += 1
+        result.update(
+            {
+                "session_id": self.session_id,
+                "command": command,
+                "execution_time_seconds": round(perf_counter() - started, 3),
+            }
+        )
+        return result
+
+    def _cmd_locate_product(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        product_name = arguments.get("product_name") or ""
+        strategy = arguments.get("selection_strategy") or self.selection_strategy
+        params = self._params_from(arguments) or self.selection_params
+        if strategy not in ALLOWED_STRATEGIES:
+            raise SessionError(f"Unsupported selection strategy '{strategy}'.")
+        params.validate(strategy)
+        found, matched, price = self.driver._locate_product(
+            product_name,
+            strategy=strategy,
+            params=params,
+            entries=self.catalog,
+            catalog=self.columnar,
+        )
+        return {
+            "success": bool(found and price and price != "Price not available"),
+            "product": matched,
+            "price": price,
+            "selection_strategy": strategy,
+            "matches": self.driver.last_matches,
+        }
+
+    def _cmd_set_strategy(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        strategy = arguments.get("selection_strategy") or STRATEGY_MATCH
+        if strategy not in ALLOWED_STRATEGIES:
+            raise SessionError(f"Unsupported selection strategy '{strategy}'.")
+        params = self._params_from(arguments) or SelectionParams()
+        params.validate(strategy)
+        self.selection_strategy = strategy
+        self.selection_params = params
+        return {"success": True, "selection_strategy": strategy}
+
+    def _cmd_add_to_cart(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        product_name = arguments.get("product_name")
+        if not product_name:
+            located = self._cmd_locate_product(arguments)
+            if not located["success"]:
+                return {**located, "added_to_cart": False}
+            product_name = located["product"]
+        added = self.driver._add_to_cart(product_name)
+        return {"success": added, "product": product_name, "added_to_cart": added}
+
+    def _cmd_refresh_catalog(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        self.catalog = self.driver._refresh_catalog()
+        self.columnar = None
+        self.refreshed_at = monotonic()
+        return {
+            "success": bool(self.catalog),
+            "catalog_size": len(self.catalog),
+            "extraction": self.driver.last_extraction,
+        }
+
+    def _cmd_sync_catalog(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        delta = self.driver._sync_catalog()
+        incremental = self.driver.incremental_catalog
+        self.catalog = incremental.entries()
+        self.columnar = incremental.columnar()
+        self.refreshed_at = monotonic()
+        return {
+            "success": bool(self.catalog),
+            "catalog_size": len(self.catalog),
+            "delta": delta.to_dict(),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _run(self, fn: Callable[[], T]) -> T:
+        with self._state_lock:
+            if self.closed:
+                raise SessionNotFoundError(f"Session '{self.session_id}' is closed")
+            self._busy += 1
+            self.last_used = monotonic()
+        try:
+            return self._executor.submit(fn).result()
+        finally:
+            with self._state_lock:
+                self._busy -= 1
+                self.last_used = monotonic()
+
+    def _admitted(self) -> ContextManager[Any]:
+        if self.url is None:
+            return nullcontext()
+        return self.driver._admission_controller().admit(self.url)
+
+    @staticmethod
+    def _params_from(arguments: Dict[str, Any]) -> Optional[SelectionParams]:
+        fields = ("price_min", "price_max", "target_price", "rank", "count")
+        provided = {name: arguments[name] for name in fields if arguments.get(name) is not None}
+        if not provided:
+            return None
+        return SelectionParams(**provided)
+
+
+class SessionManager:
+    """Registry of live sessions with a size cap and an idle reaper."""
+
+    def __init__(
+        self,
+        *,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        reap_interval: float = 15.0,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, BrowserSession] = {}
+        self._lock = threading.Lock()
+        self._reaped = 0
+        self._log = get_logger(__name__, "session-manager")
+        self._stop = threading.Event()
+        self._reaper = threading.Thread(
+            target=self._reap_loop,
+            args=(reap_interval,),
+            name="session-reaper",
+            daemon=True,
+        )
+        self._reaper.start()
+
+    def create(
+        self,
+        url: str,
+        *,
+        headless: bool = True,
+        timeout_ms: int = 10_000,
+        username_index: int = 0,
+        password_index: int = 0,
+    ) -> BrowserSession:
+        session = BrowserSession(uuid.uuid4().hex[:12], timeout_ms=timeout_ms)
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionError(f"Session limit reached ({self.max_sessions})")
+            self._sessions[session.session_id] = session
+        try:
+            session.open(
+                url,
+                headless=headless,
+                username_index=username_index,
+                password_index=password_index,
+            )
+        except Exception:
+            with self._lock:
+                self._sessions.pop(session.session_id, None)
+            raise
+        self._log.info("Opened session %s on %s", session.session_id, url)
+        return session
+
+    def get(self, session_id: str) -> BrowserSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or session.closed:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+        return session
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+        session.close()
+        self._log.info("Closed session %s", session_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [session.describe() for session in sessions]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout_seconds": self.idle_timeout,
+                "reaped": self._reaped,
+            }
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def reap_idle(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout``; return how many."""
+
+        cutoff = monotonic() - self.idle_timeout
+        with self._lock:
+            candidates = [s for s in self._sessions.values() if s.last_used < cutoff]
+        # close_if_idle re-checks under the session's own lock, so a command that
+        # started since the scan keeps its session.
+        idle = [session for session in candidates if session.close_if_idle(cutoff)]
+        with self._lock:
+            for session in idle:
+                if self._sessions.get(session.session_id) is session:
+                    del self._sessions[session.session_id]
+            self._reaped += len(idle)
+        for session in idle:
+            self._log.info("Reaped idle session %s", session.session_id)
+        return len(idle)
+
+    def _reap_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.reap_idle()
@@ -0,0 +1,214 @@
+"""Columnar, NumPy-backed view of a catalog snapshot.
+
+:class:`RobotDriver` extracts the catalog as a list of dictionaries. Selection
+used to re-filter that list in Python for every query; :class:`ColumnarCatalog`
+instead converts the snapshot once into parallel arrays (titles, lowered titles,
+prices) and answers price strategies with vectorized NumPy operations. Keyword
+masks are computed on first use and cached, so repeated queries against the
+same snapshot only pay for the reduction.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CatalogRow:
+    """A single selected catalog entry."""
+
+    title: str
+    price_text: str
+    price_value: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "price_text": self.price_text,
+            "price_value": self.price_value,
+        }
+
+
+class ColumnarCatalog:
+    """Immutable columnar snapshot of catalog entries."""
+
+    def __init__(
+        self,
+        titles: Sequence[str],
+        price_texts: Sequence[str],
+        prices: Sequence[Optional[float]],
+    ) -> None:
+        if not len(titles) == len(price_texts) == len(prices):
+            raise ValueError("Catalog columns must have the same length")
+        self.titles: List[str] = list(titles)
+        self.price_texts: List[str] = list(price_texts)
+        self.lower_titles = np.array([title.lower() for title in self.titles], dtype=np.str_)
+        self.prices = np.array(
+            [np.nan if price is None else price for price in prices],
+            dtype=np.float64,
+        )
+        self.priced = ~np.isnan(self.prices)
+        self._mask_cache: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> "ColumnarCatalog":
+        titles: List[str] = []
+        price_texts: List[str] = []
+        prices: List[Optional[float]] = []
+        for entry in entries:
+            titles.append(str(entry.get("title") or ""))
+            price_texts.append(str(entry.get("price_text") or "Price not available"))
+            prices.append(entry.get("price_value"))
+        return cls(titles, price_texts, prices)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def with_prices(self, updates: Mapping[int, Tuple[str, Optional[float]]]) -> "ColumnarCatalog":
+        """Return a copy with the given rows re-priced.
+
+        Titles are unchanged, so the lowered titles and cached keyword masks are
+        shared with this snapshot; only the price columns are copied.
+        """
+
+        updated = ColumnarCatalog.__new__(ColumnarCatalog)
+        updated.titles = self.titles
+        updated.lower_titles = self.lower_titles
+        updated.price_texts = list(self.price_texts)
+        updated.prices = self.prices.copy()
+        for index, (price_text, price) in updates.items():
+            updated.price_texts[index] = price_text
+            updated.prices[index] = np.nan if price is None else price
+        updated.priced = ~np.isnan(updated.prices)
+        updated._mask_cache = self._mask_cache
+        return updated
+
+    # ------------------------------------------------------------------
+    # Masks
+    # ------------------------------------------------------------------
+    def keyword_mask(self, keyword: str) -> np.ndarray:
+        """Boolean mask of rows whose lowered title contains ``keyword``."""
+
+        normalized = keyword.strip().lower()
+        if not normalized:
+            return np.zeros(len(self), dtype=bool)
+        cached = self._mask_cache.get(normalized)
+        if cached is None:
+            cached = np.char.find(self.lower_titles, normalized) >= 0
+            self._mask_cache[normalized] = cached
+        return cached
+
+    def keyword_matrix(self, keywords: Sequence[str]) -> np.ndarray:
+        """Stack the masks for ``keywords`` into a ``(len(keywords), len(self))`` matrix."""
+
+        if not keywords:
+            return np.zeros((0, len(self)), dtype=bool)
+        return np.vstack([self.keyword_mask(keyword) for keyword in keywords])
+
+    def candidate_mask(self, keyword: str) -> np.ndarray:
+        """Priced rows matching ``keyword``, or every priced row when nothing matches."""
+
+        mask = self.keyword_mask(keyword)
+        if not mask.any():
+            return self.priced
+        return mask & self.priced
+
+    # ------------------------------------------------------------------
+    # Selection strategies
+    # ------------------------------------------------------------------
+    def cheapest(self, keyword: str) -> Optional[CatalogRow]:
+        return self._pick(keyword, np.argmin)
+
+    def most_expensive(self, keyword: str) -> Optional[CatalogRow]:
+        return self._pick(keyword, np.argmax)
+
+    def nth_cheapest(self, keyword: str, rank: int) -> Optional[CatalogRow]:
+        """Return the ``rank``-th cheapest row (1-based) among the candidates."""
+
+        if rank < 1:
+            raise ValueError("rank must be at least 1")
+        indices = np.flatnonzero(self.candidate_mask(keyword))
+        if rank > indices.size:
+            return None
+        position = rank - 1
+        prices = self.prices[indices]
+        pivot = np.partition(prices, position)[position]
+        # Break ties between equally priced rows by catalog position.
+        cheaper = int(np.count_nonzero(prices < pivot))
+        tied = indices[prices == pivot]
+        return self._row(int(tied[position - cheaper]))
+
+    def top_k_cheapest(self, keyword: str, count: int) -> List[CatalogRow]:
+        """Return up to ``count`` cheapest rows, ordered by price then position."""
+
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        indices = np.flatnonzero(self.candidate_mask(keyword))
+        return [self._row(int(index)) for index in self._smallest(indices, count)]
+
+    def price_range(
+        self,
+        keyword: str,
+        *,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        count: Optional[int] = None,
+    ) -> List[CatalogRow]:
+        """Return rows priced within ``[price_min, price_max]``, cheapest first."""
+
+        mask = self.candidate_mask(keyword).copy()
+        if price_min is not None:
+            mask &= self.prices >= price_min
+        if price_max is not None:
+            mask &= self.prices <= price_max
+        indices = np.flatnonzero(mask)
+        if count is not None:
+            indices = self._smallest(indices, count)
+        else:
+            indices = indices[np.argsort(self.prices[indices], kind="stable")]
+        return [self._row(int(index)) for index in indices]
+
+    def closest_to_price(self, keyword: str, target_price: float) -> Optional[CatalogRow]:
+        indices = np.flatnonzero(self.candidate_mask(keyword))
+        if indices.size == 0:
+            return None
+        distances = np.abs(self.prices[indices] - target_price)
+        return self._row(int(indices[np.argmin(distances)]))
+
+    def median(self, keyword: str) -> Optional[CatalogRow]:
+        """Return the row at the (lower) median price among the candidates."""
+
+        indices = np.flatnonzero(self.candidate_mask(keyword))
+        if indices.size == 0:
+            return None
+        return self.nth_cheapest(keyword, (indices.size - 1) // 2 + 1)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _pick(self, keyword: str, reducer) -> Optional[CatalogRow]:
+        indices = np.flatnonzero(self.candidate_mask(keyword))
+        if indices.size == 0:
+            return None
+        return self._row(int(indices[reducer(self.prices[indices])]))
+
+    def _smallest(self, indices: np.ndarray, count: int) -> np.ndarray:
+        prices = self.prices[indices]
+        if count < indices.size:
+            # Keep every row tied with the k-th price so the final order is stable.
+            kth_price = np.partition(prices, count - 1)[count - 1]
+            keep = prices <= kth_price
+            indices, prices = indices[keep], prices[keep]
+        order = np.lexsort((indices, prices))
+        return indices[order][:count]
+
+    def _row(self, index: int) -> CatalogRow:
+        price = self.prices[index]
+        return CatalogRow(
+            title=self.titles[index],
+            price_text=self.price_texts[index],
+            price_value=None if np.isnan(price) else float(price),
+        )
@@ -0,0 +1,443 @@
+"""Persistent price history for scraped catalogs.
+
+Every catalog the driver extracts is handed to a :class:`CatalogStore`, which
+keeps it in SQLite. Only per-product deltas are written: a row in
+``price_changes`` when a product appears, changes price or disappears, plus one
+small header row per snapshot in ``snapshots``. ``current_prices`` holds the
+latest known state of every product, so "what does it cost now?" and "how has
+the price moved?" are answered from indexed tables without a browser.
+
+Writes go through a bounded queue drained by a single writer thread in
+batched transactions, so recording a snapshot never blocks a request. When the
+queue is full, snapshots are dropped and counted rather than blocking.
+
+Parquet export (:meth:`CatalogStore.export_parquet`) is optional and needs
+``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_QUEUE_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    source TEXT,
+    complete INTEGER NOT NULL,
+    products INTEGER NOT NULL,
+    changes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_site_time ON snapshots (site, taken_at);
+
+CREATE TABLE IF NOT EXISTS price_changes (
+    site TEXT NOT NULL,
+    title TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    snapshot_id INTEGER NOT NULL,
+    price_text TEXT,
+    price_value REAL,
+    present INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS price_changes_product_time ON price_changes (site, title, taken_at);
+CREATE INDEX IF NOT EXISTS price_changes_time ON price_changes (taken_at);
+
+CREATE TABLE IF NOT EXISTS current_prices (
+    site TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price_text TEXT,
+    price_value REAL,
+    present INTEGER NOT NULL,
+    changed_at REAL NOT NULL,
+    PRIMARY KEY (site, title)
+);
+"""
+
+_log = get_logger(__name__, "catalog-store")
+
+
+def site_key(url: str) -> str:
+    """Return the key snapshots are grouped under: the URL's host (and port)."""
+
+    parsed = urlparse(url)
+    return (parsed.netloc or parsed.path).lower()
+
+
+@dataclass
+class _Snapshot:
+    site: str
+    entries: List[Dict[str, Any]]
+    source: Optional[str]
+    complete: bool
+    taken_at: float = field(default_factory=time.time)
+
+
+class CatalogStore:
+    """SQLite-backed catalog history with batched, off-thread writes."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[_Snapshot]]" = queue.Queue(maxsize=queue_size)
+        self._known: Dict[str, Dict[str, Tuple[Optional[str], Optional[float]]]] = {}
+        self._lock = threading.Lock()
+        self._counts = {"snapshots": 0, "changes": 0, "batches": 0, "dropped": 0, "write_errors": 0}
+        with self._reader() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="catalog-store", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        url: str,
+        entries: Sequence[Dict[str, Any]],
+        *,
+        source: Optional[str] = None,
+        complete: bool = True,
+    ) -> bool:
+        """Queue a catalog snapshot; return ``False`` if it was dropped.
+
+        ``complete`` snapshots cover the whole catalog, so products missing
+        from them are recorded as gone. Partial snapshots (for example after a
+        vendor filter) only record appearances and price changes.
+        """
+
+        snapshot = _Snapshot(site_key(url), list(entries), source, complete)
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            with self._lock:
+                self._counts["dropped"] += 1
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Block until every queued snapshot has been written."""
+
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join(timeout=30)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def current_prices(self, product: str, *, url: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """Return the latest known price of products matching ``product``.
+
+        An exact title match wins; otherwise titles containing ``product``
+        (case-insensitively) are returned, cheapest first.
+        """
+
+        site_clause, site_args = self._site_filter(url)
+        columns = "SELECT site, title, price_text, price_value, changed_at FROM current_prices"
+        with self._reader() as conn:
+            rows = conn.execute(
+                f"{columns} WHERE present = 1 AND title = ?{site_clause} LIMIT ?",
+                (product, *site_args, limit),
+            ).fetchall()
+            if not rows:
+                rows = conn.execute(
+                    f"{columns} WHERE present = 1 AND title LIKE ? ESCAPE '\\'{site_clause} "
+                    "ORDER BY price_value IS NULL, price_value, title LIMIT ?",
+                    (self._contains(product), *site_args, limit),
+                ).fetchall()
+            as_of = conn.execute(
+                f"SELECT MAX(taken_at) FROM snapshots WHERE 1 = 1{site_clause}",
+                site_args,
+            ).fetchone()[0]
+        return {
+            "product": product,
+            "as_of": as_of,
+            "data_age_seconds": round(time.time() - as_of, 2) if as_of else None,
+            "matches": [
+                {
+                    "site": site,
+                    "title": title,
+                    "price_text": price_text,
+                    "price_value": price_value,
+                    "changed_at": changed_at,
+                }
+                for site, title, price_text, price_value, changed_at in rows
+            ],
+        }
+
+    def price_history(
+        self,
+        product: str,
+        *,
+        url: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Return every recorded change for ``product``, oldest first.
+
+        Like :meth:`current_prices`, falls back to titles containing
+        ``product`` when no title matches exactly.
+        """
+
+        site_clause, site_args = self._site_filter(url)
+        with self._reader() as conn:
+            exact = conn.execute(
+                f"SELECT 1 FROM current_prices WHERE title = ?{site_clause} LIMIT 1",
+                (product, *site_args),
+            ).fetchone()
+            where = ("title = ?" if exact else "title LIKE ? ESCAPE '\\'") + site_clause
+            args: List[Any] = [product if exact else self._contains(product), *site_args]
+            if since is not None:
+                where += " AND taken_at >= ?"
+                args.append(since)
+            rows = conn.execute(
+                "SELECT site, title, taken_at, price_text, price_value, present FROM price_changes "
+                f"WHERE {where} ORDER BY taken_at, title LIMIT ?",
+                (*args, limit),
+            ).fetchall()
+        return [
+            {
+                "site": site,
+                "title": title,
+                "taken_at": taken_at,
+                "price_text": price_text,
+                "price_value": price_value,
+                "present": bool(present),
+            }
+            for site, title, taken_at, price_text, price_value, present in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counts, "pending": self._queue.qsize(), "path": self.path}
+
+    def export_parquet(self, directory: str) -> Dict[str, str]:
+        """Write each table to ``<directory>/<table>.parquet`` (requires ``pyarrow``)."""
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from exc
+
+        out_dir = Path(directory)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written: Dict[str, str] = {}
+        with self._reader() as conn:
+            for table in ("snapshots", "price_changes", "current_prices"):
+                cursor = conn.execute(f"SELECT * FROM {table}")
+                columns = [column[0] for column in cursor.description]
+                rows = cursor.fetchall()
+                data = {name: [row[index] for row in rows] for index, name in enumerate(columns)}
+                target = out_dir / f"{table}.parquet"
+                pq.write_table(pa.table(data), target)
+                written[table] = str(target)
+        return written
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _contains(product: str) -> str:
+        """LIKE pattern matching titles that contain ``product`` literally."""
+
+        escaped = product.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
+
+    @staticmethod
+    def _site_filter(url: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+        if not url:
+            return "", ()
+        return " AND site = ?", (site_key(url),)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                snapshots = [item for item in batch if item is not None]
+                try:
+                    if snapshots:
+                        self._write_batch(conn, snapshots)
+                except Exception as exc:  # noqa: BLE001 - keep the writer alive
+                    conn.rollback()
+                    self._known.clear()
+                    with self._lock:
+                        self._counts["write_errors"] += 1
+                    _log.error("Failed to write %d catalog snapshot(s): %s", len(snapshots), exc)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(snapshots) != len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, snapshots: List[_Snapshot]) -> None:
+        changes_written = 0
+        with conn:
+            for snapshot in snapshots:
+                known = self._known_prices(conn, snapshot.site)
+                seen: Dict[str, Tuple[Optional[str], Optional[float]]] = {}
+                for entry in snapshot.entries:
+                    title = str(entry.get("title") or "")
+                    if title:
+                        seen[title] = (entry.get("price_text"), entry.get("price_value"))
+                changed = [(title, price) for title, price in seen.items() if known.get(title) != price]
+                gone = [title for title in known if title not in seen] if snapshot.complete else []
+
+                snapshot_id = conn.execute(
+                    "INSERT INTO snapshots (site, taken_at, source, complete, products, changes) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        snapshot.site,
+                        snapshot.taken_at,
+                        snapshot.source,
+                        int(snapshot.complete),
+                        len(seen),
+                        len(changed) + len(gone),
+                    ),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO price_changes (site, title, taken_at, snapshot_id, price_text, price_value, present) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (snapshot.site, title, snapshot.taken_at, snapshot_id, text, value, 1)
+                        for title, (text, value) in changed
+                    ]
+                    + [(snapshot.site, title, snapshot.taken_at, snapshot_id, None, None, 0) for title in gone],
+                )
+                conn.executemany(
+                    "INSERT INTO current_prices (site, title, price_text, price_value, present, changed_at) "
+                    "VALUES (?, ?, ?, ?, 1, ?) ON CONFLICT (site, title) DO UPDATE SET "
+                    "price_text = excluded.price_text, price_value = excluded.price_value, "
+                    "present = 1, changed_at = excluded.changed_at",
+                    [(snapshot.site, title, text, value, snapshot.taken_at) for title, (text, value) in changed],
+                )
+                conn.executemany(
+                    "UPDATE current_prices SET present = 0, changed_at = ? WHERE site = ? AND title = ?",
+                    [(snapshot.taken_at, snapshot.site, title) for title in gone],
+                )
+                for title, price in changed:
+                    known[title] = price
+                for title in gone:
+                    known.pop(title, None)
+                changes_written += len(changed) + len(gone)
+        with self._lock:
+            self._counts["snapshots"] += len(snapshots)
+            self._counts["changes"] += changes_written
+            self._counts["batches"] += 1
+
+    def _known_prices(
+        self,
+        conn: sqlite3.Connection,
+        site: str,
+    ) -> Dict[str, Tuple[Optional[str], Optional[float]]]:
+        known = self._known.get(site)
+        if known is None:
+            known = {
+                title: (price_text, price_value)
+                for title, price_text, price_value in conn.execute(
+                    "SELECT title, price_text, price_value FROM current_prices WHERE site = ? AND present = 1",
+                    (site,),
+                )
+            }
+            self._known[site] = known
+        return known
+
+
+# ----------------------------------------------------------------------
+# Process-wide default store
+# ----------------------------------------------------------------------
+_DEFAULT_STORE: Optional[CatalogStore] = None
+
+
+def set_default_catalog_store(store: Optional[CatalogStore]) -> None:
+    """Make ``store`` record every catalog extracted by drivers in this process."""
+
+    global _DEFAULT_STORE
+    _DEFAULT_STORE = store
+
+
+def default_catalog_store() -> Optional[CatalogStore]:
+    return _DEFAULT_STORE
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or export the catalog history store")
+    parser.add_argument("--db", required=True, help="Path to the SQLite catalog store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    price = sub.add_parser("price", help="Show the current price of a product")
+    price.add_argument("product")
+    history = sub.add_parser("history", help="Show the price history of a product")
+    history.add_argument("product")
+    export = sub.add_parser("export", help="Export all tables as Parquet files")
+    export.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    store = CatalogStore(args.db)
+    try:
+        if args.command == "price":
+            for match in store.current_prices(args.product)["matches"]:
+                print(f"{match['site']:<24} {match['title']:<32} {match['price_text']}")
+        elif args.command == "history":
+            for change in store.price_history(args.product):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(change["taken_at"]))
+                print(f"{stamp}  {change['title']:<32} {change['price_text'] if change['present'] else '(gone)'}")
+        else:
+            for table, target in store.export_parquet(args.directory).items():
+                print(f"{table}: {target}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+"""Incremental catalog synchronisation for long-lived pages.
+
+Rescanning every product card to notice a single price change costs one
+Playwright round trip per card. Instead, :func:`read_catalog_delta` installs a
+``MutationObserver`` in the page (once per document) that records which cards
+were added, removed or had their text changed. The page keeps a content hash
+per card, so each sync returns only the cards whose hash differs from the
+previous sync, in a single ``evaluate`` call. Cards are keyed by their product
+id (the element's ``id`` or ``data-sku``), or else by a serial number given to
+the card element, never by title: two cards with the same title stay two rows,
+just as in a full extraction.
+
+:class:`IncrementalCatalog` applies those deltas to an in-memory catalog and
+keeps a :class:`~robot_Driver_Playwright.catalog.ColumnarCatalog` in step:
+price-only deltas patch the price columns and reuse the cached keyword masks,
+while added or removed cards trigger a rebuild on next use.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from robot_Driver_Playwright.catalog import ColumnarCatalog
+
+# Installed on first use and after every navigation or reload, which discard
+# the previous document's observer; the first sync on a document is a full one.
+CATALOG_SYNC_SCRIPT = """
+({cardSelector, titleSelector, priceSelector}) => {
+  let state = window.__robotCatalogSync;
+  let full = false;
+  if (!state || state.cardSelector !== cardSelector) {
+    if (state) state.observer.disconnect();
+    state = {cardSelector, hashes: new Map(), keys: new WeakMap(), dirty: new Set(), removed: new Set(), serial: 0};
+    const cardOf = (node) => {
+      const el = node.nodeType === 1 ? node : node.parentElement;
+      return el ? el.closest(cardSelector) : null;
+    };
+    const each = (node, fn) => {
+      if (node.nodeType !== 1) return;
+      if (node.matches(cardSelector)) fn(node);
+      node.querySelectorAll(cardSelector).forEach(fn);
+    };
+    state.handle = (records) => {
+      for (const record of records) {
+        const card = cardOf(record.target);
+        if (card) state.dirty.add(card);
+        record.addedNodes.forEach((node) => each(node, (c) => state.dirty.add(c)));
+        record.removedNodes.forEach((node) => each(node, (c) => {
+          const key = state.keys.get(c);
+          if (key !== undefined) state.removed.add(key);
+          state.dirty.delete(c);
+        }));
+      }
+    };
+    state.observer = new MutationObserver(state.handle);
+    state.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    document.querySelectorAll(cardSelector).forEach((c) => state.dirty.add(c));
+    window.__robotCatalogSync = state;
+    full = true;
+  }
+  state.handle(state.observer.takeRecords());
+
+  const text = (card, selector) => {
+    const el = card.querySelector(selector);
+    return el ? el.innerText.trim() : "";
+  };
+  const hash = (value) => {
+    let h = 0x811c9dc5;
+    for (let i = 0; i < value.length; i++) {
+      h ^= value.charCodeAt(i);
+      h = Math.imul(h, 0x01000193);
+    }
+    return (h >>> 0).toString(16);
+  };
+  const added = [], changed = [], removed = [], seen = new Set();
+  for (const card of state.dirty) {
+    if (!card.isConnected) continue;
+    const title = text(card, titleSelector);
+    if (!title) continue;
+    const priceText = text(card, priceSelector);
+    const digest = hash(title + "\\u0000" + priceText);
+    let key = state.keys.get(card);
+    if (key === undefined) {
+      key = card.id || card.getAttribute("data-sku") || "card-" + ++state.serial;
+      state.keys.set(card, key);
+    }
+    seen.add(key);
+    const previous = state.hashes.get(key);
+    if (previous === undefined) added.push({key, title, price_text: priceText});
+    else if (previous !== digest) changed.push({key, title, price_text: priceText});
+    state.hashes.set(key, digest);
+  }
+  for (const key of state.removed) {
+    if (seen.has(key) || !state.hashes.has(key)) continue;
+    state.hashes.delete(key);
+    removed.push(key);
+  }
+  const scanned = state.dirty.size;
+  state.dirty.clear();
+  state.removed.clear();
+  return {full, added, changed, removed, scanned, tracked: state.hashes.size};
+}
+"""
+
+
+@dataclass
+class CatalogDelta:
+    """Cards added, changed or removed since the previous sync."""
+
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    full: bool = False
+    scanned: int = 0
+    tracked: int = 0
+    sync_seconds: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed,
+            "full": self.full,
+            "scanned": self.scanned,
+            "tracked": self.tracked,
+            "sync_seconds": self.sync_seconds,
+        }
+
+
+def read_catalog_delta(
+    page,
+    *,
+    card_selector: str,
+    title_selector: str,
+    price_selector: str,
+    parse_price: Callable[[str], Optional[float]],
+) -> CatalogDelta:
+    """Return the cards that changed on ``page`` since the last call."""
+
+    started = perf_counter()
+    payload = page.evaluate(
+        CATALOG_SYNC_SCRIPT,
+        {
+            "cardSelector": card_selector,
+            "titleSelector": title_selector,
+            "priceSelector": price_selector,
+        },
+    )
+
+    def _entry(card: Dict[str, Any]) -> Dict[str, Any]:
+        price_text = card.get("price_text") or "Price not available"
+        return {
+            "key": str(card["key"]),
+            "title": card["title"],
+            "price_text": price_text,
+            "price_value": parse_price(price_text),
+        }
+
+    return CatalogDelta(
+        added=[_entry(card) for card in payload.get("added", [])],
+        changed=[_entry(card) for card in payload.get("changed", [])],
+        removed=[str(key) for key in payload.get("removed", [])],
+        full=bool(payload.get("full")),
+        scanned=int(payload.get("scanned", 0)),
+        tracked=int(payload.get("tracked", 0)),
+        sync_seconds=round(perf_counter() - started, 4),
+    )
+
+
+class IncrementalCatalog:
+    """In-memory catalog, keyed by card, maintained from :class:`CatalogDelta` objects."""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._index: Dict[str, int] = {}
+        self._columnar: Optional[ColumnarCatalog] = None
+        self.syncs = 0
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def apply(self, delta: CatalogDelta) -> None:
+        self.syncs += 1
+        if delta.full:
+            self._rows = {}
+        for key in delta.removed:
+            self._rows.pop(key, None)
+        for entry in delta.added:
+            self._rows[entry["key"]] = self._row(entry)
+        retitled = False
+        for entry in delta.changed:
+            previous = self._rows.get(entry["key"])
+            retitled = retitled or previous is None or previous["title"] != entry["title"]
+            self._rows[entry["key"]] = self._row(entry)
+
+        if delta.full or delta.added or delta.removed or retitled:
+            self._columnar = None
+        elif delta.changed and self._columnar is not None:
+            self._columnar = self._columnar.with_prices(
+                {
+                    self._index[entry["key"]]: (entry["price_text"], entry["price_value"])
+                    for entry in delta.changed
+                }
+            )
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return list(self._rows.values())
+
+    def columnar(self) -> ColumnarCatalog:
+        """Columnar view of the current rows, rebuilt only after cards come or go."""
+
+        if self._columnar is None:
+            self._columnar = ColumnarCatalog.from_entries(self.entries())
+            self._index = {key: index for index, key in enumerate(self._rows)}
+            self.rebuilds += 1
+        return self._columnar
+
+    @staticmethod
+    def _row(entry: Dict[str, Any]) -> Dict[str, Any]:
+        # Same fields as a full extraction; the card key only indexes the row.
+        return {name: value for name, value in entry.items() if name != "key"}
@@ -0,0 +1,120 @@
+"""Step checkpoints for a driver run, so a failed run can pick up where it stopped.
+
+A :class:`TaskCheckpoint` records each phase of a run as it completes:
+browser ready, navigated, authenticated and catalog extracted. When a phase
+fails for a reason a retry can fix (the page crashed, the browser went away,
+the page was closed under us, or the step timed out and the page no longer
+runs scripts), the driver opens a
+fresh browser context and resumes from the last good checkpoint instead of
+starting the whole run again.
+
+Only results that outlive a page survive the reset. The login is kept as the
+context's saved storage state, and the new context is created with it, so
+signing in again is only needed if the site no longer accepts the saved
+session. An extracted catalog is kept as-is and never scraped twice. Browser
+and navigation checkpoints belong to the old page and are redone.
+
+Every phase that runs more than once is listed in ``retried_phases``, and
+every reset is recorded in ``recoveries``; both end up on the run's result.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+PHASE_BROWSER_READY = "browser_ready"
+PHASE_NAVIGATED = "navigated"
+PHASE_AUTHENTICATED = "authenticated"
+PHASE_CATALOG_EXTRACTED = "catalog_extracted"
+PHASES = [PHASE_BROWSER_READY, PHASE_NAVIGATED, PHASE_AUTHENTICATED, PHASE_CATALOG_EXTRACTED]
+
+DEFAULT_MAX_RECOVERIES = 2
+
+
+class StepFailedError(RuntimeError):
+    """A phase failed; ``error`` is the message the run's result reports."""
+
+    def __init__(self, phase: str, error: str) -> None:
+        super().__init__(f"{phase}: {error}")
+        self.phase = phase
+        self.error = error
+
+
+class RecoverableStepError(StepFailedError):
+    """A phase failed in a way a fresh browser context may fix."""
+
+    def __init__(self, phase: str, error: str, reason: str) -> None:
+        super().__init__(phase, error)
+        self.reason = reason
+
+
+@dataclass
+class TaskCheckpoint:
+    """The phases a run has completed and what it needs to resume after a reset."""
+
+    reached: List[str] = field(default_factory=list)
+    storage_state: Optional[Dict[str, Any]] = None
+    catalog: Optional[List[dict]] = None
+    extraction: Dict[str, Any] = field(default_factory=dict)
+    retried_phases: List[str] = field(default_factory=list)
+    recoveries: List[Dict[str, Any]] = field(default_factory=list)
+    _attempted: Set[str] = field(default_factory=set, repr=False)
+
+    @property
+    def last(self) -> Optional[str]:
+        """The latest phase, in run order, that is still good."""
+
+        for phase in reversed(PHASES):
+            if phase in self.reached:
+                return phase
+        return None
+
+    def has(self, phase: str) -> bool:
+        return phase in self.reached
+
+    def begin(self, phase: str) -> None:
+        """Note that ``phase`` is starting; a second start marks it as retried."""
+
+        if phase in self._attempted and phase not in self.retried_phases:
+            self.retried_phases.append(phase)
+        self._attempted.add(phase)
+
+    def reach(
+        self,
+        phase: str,
+        *,
+        storage_state: Optional[Dict[str, Any]] = None,
+        catalog: Optional[List[dict]] = None,
+        extraction: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.reached = [known for known in PHASES if known in self.reached or known == phase]
+        if storage_state is not None:
+            self.storage_state = storage_state
+        if catalog is not None:
+            self.catalog = catalog
+            self.extraction = dict(extraction or {})
+
+    def rewind(self, failed_phase: str, reason: str) -> str:
+        """Drop the checkpoints that died with the old page; return where the run resumes.
+
+        The login survives only if its storage state was saved, and the
+        catalog only if it was extracted.
+        """
+
+        keep = []
+        if PHASE_AUTHENTICATED in self.reached and self.storage_state is not None:
+            keep.append(PHASE_AUTHENTICATED)
+        if PHASE_CATALOG_EXTRACTED in self.reached and self.catalog is not None:
+            keep.append(PHASE_CATALOG_EXTRACTED)
+        self.reached = keep
+        resumed_from = self.last or "start"
+        self.recoveries.append(
+            {
+                "attempt": len(self.recoveries) + 1,
+                "failed_phase": failed_phase,
+                "reason": reason,
+                "resumed_from": resumed_from,
+            }
+        )
+        return resumed_from
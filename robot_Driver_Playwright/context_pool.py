@@ -0,0 +1,387 @@
+"""Shared browsers handing out isolated, pre-opened browser contexts.
+
+A :class:`BrowserContextPool` runs a small, fixed number of Chromium
+processes. Playwright's sync API is bound to the thread that started it, so
+each browser lives on its own worker thread and every call that touches it,
+or one of its contexts, runs there.
+
+Each browser keeps a few spare contexts open, each with a blank page. Leasing
+one is a queue pop plus a :class:`RobotDriver` bound to the page, with no
+browser launch and no context creation on the caller's path. A lease is
+isolated: cookies, storage, login and cart belong to that lease alone.
+Released contexts are closed rather than reused, and a fresh spare is opened
+in the background to replace them.
+
+Leases on the same browser take turns on its thread. Leases on different
+browsers run in parallel. Leases go to the browser with the fewest leases.
+
+Each browser's memory is sampled through a
+:class:`~robot_Driver_Playwright.browser_memory.BrowserMemoryMonitor`. A
+browser that passes its RSS limit, or has served its quota of contexts, stops
+taking new leases. Once its last lease is released it is closed and a fresh
+one is launched in its place.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from time import monotonic, perf_counter
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from playwright.sync_api import sync_playwright
+
+from robot_Driver_Playwright.browser_memory import KIND_BROWSER, BrowserMemoryMonitor, sample_browser
+from robot_Driver_Playwright.browser_sessions import SessionError
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.my_robot_driver import RobotDriver
+
+DEFAULT_BROWSERS = 2
+DEFAULT_SPARE_CONTEXTS = 1
+DEFAULT_MAX_CONTEXTS = 16
+
+T = TypeVar("T")
+
+
+class ContextPoolExhaustedError(SessionError):
+    """Raised when every context the pool may hand out is already leased."""
+
+
+class ContextLease:
+    """One browser context and its page, driven through a :class:`RobotDriver`."""
+
+    def __init__(self, lease_id: int, host: "_BrowserHost", context: Any, driver: RobotDriver, *, warm: bool) -> None:
+        self.lease_id = lease_id
+        self.driver = driver
+        self.warm = warm
+        self.leased_at = monotonic()
+        self.calls = 0
+        self.released = False
+        self._host = host
+        self._context = context
+
+    @property
+    def page(self) -> Any:
+        return self.driver.page
+
+    def run(self, fn: Callable[[RobotDriver], T]) -> T:
+        """Run ``fn(driver)`` on the browser's thread and return its result."""
+
+        if self.released:
+            raise SessionError(f"Context lease {self.lease_id} was released")
+        self.calls += 1
+        return self._host.run(lambda: fn(self.driver))
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "lease_id": self.lease_id,
+            "browser": self._host.index,
+            "warm": self.warm,
+            "calls": self.calls,
+            "age_seconds": round(monotonic() - self.leased_at, 2),
+        }
+
+
+class _BrowserHost:
+    """A browser on its own thread, with a queue of spare contexts."""
+
+    def __init__(
+        self,
+        index: int,
+        *,
+        headless: bool,
+        timeout_ms: int,
+        spare_contexts: int,
+        memory: BrowserMemoryMonitor,
+    ) -> None:
+        self.index = index
+        self.label = f"browser-{index}"
+        self.headless = headless
+        self.timeout_ms = timeout_ms
+        self.spare_contexts = spare_contexts
+        self.memory = memory
+        self.leased = 0
+        self.launches = 0
+        self.recycles = 0
+        # Contexts handed out by the current browser process.
+        self.contexts_served = 0
+        self.recycle_pending: Optional[str] = None
+        self._playwright = None
+        self._browser = None
+        # Only touched on the host thread.
+        self._spares: Deque[Tuple[Any, Any]] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"browser-{index}")
+        self._log = get_logger(__name__, f"browser-{index}")
+
+    def run(self, fn: Callable[[], T]) -> T:
+        return self._executor.submit(fn).result()
+
+    def submit(self, fn: Callable[[], Any]) -> Future:
+        return self._executor.submit(fn)
+
+    def spare_count(self) -> int:
+        return len(self._spares)
+
+    # ------------------------------------------------------------------
+    # Host thread only
+    # ------------------------------------------------------------------
+    def take(self) -> Tuple[Any, Any, bool]:
+        """Pop a live spare context, or open one if none is ready; the flag says which."""
+
+        self.contexts_served += 1
+        while self._spares:
+            context, page = self._spares.popleft()
+            if self._browser is not None and self._browser.is_connected() and not page.is_closed():
+                return context, page, True
+            with suppress(Exception):
+                context.close()
+        context, page = self._open_context()
+        return context, page, False
+
+    def maintain(self) -> None:
+        """Check memory, recycle the browser if it is due and idle, then refill the spares."""
+
+        self.check_memory()
+        self.top_up()
+
+    def check_memory(self) -> None:
+        if self._browser is None or not self._browser.is_connected():
+            return
+        if self.recycle_pending is None and self.memory.due(self.label):
+            try:
+                sample = sample_browser(
+                    self._browser,
+                    self.label,
+                    tasks=self.contexts_served,
+                    contexts=self._browser.contexts,
+                )
+            except Exception as exc:  # noqa: BLE001 - sampling must not break leasing
+                self._log.warning("Could not sample browser memory: %s", exc)
+                return
+            self.recycle_pending = self.memory.record(sample)
+            if self.recycle_pending:
+                self._log.warning(
+                    "Browser over its %s limit; recycling once its %d lease(s) are released",
+                    self.recycle_pending,
+                    self.leased,
+                )
+        if self.recycle_pending is not None and self.leased == 0:
+            self.recycle()
+
+    def recycle(self) -> None:
+        """Close the browser and its spares; the next context opened relaunches it."""
+
+        self.memory.recycled(self.label, KIND_BROWSER, self.recycle_pending or "requested")
+        while self._spares:
+            context, _ = self._spares.popleft()
+            with suppress(Exception):
+                context.close()
+        with suppress(Exception):
+            self._browser.close()
+        self._browser = None
+        self.recycles += 1
+        self.contexts_served = 0
+        self.recycle_pending = None
+
+    def top_up(self) -> None:
+        try:
+            while len(self._spares) < self.spare_contexts:
+                self._spares.append(self._open_context())
+        except Exception as exc:  # noqa: BLE001 - spares are an optimisation
+            self._log.warning("Could not open a spare context: %s", exc)
+
+    def close_context(self, context: Any) -> None:
+        with suppress(Exception):
+            context.close()
+        self.maintain()
+
+    def stop(self) -> None:
+        while self._spares:
+            context, _ = self._spares.popleft()
+            with suppress(Exception):
+                context.close()
+        with suppress(Exception):
+            if self._browser:
+                self._browser.close()
+        with suppress(Exception):
+            if self._playwright:
+                self._playwright.stop()
+        self._browser = None
+        self._playwright = None
+
+    def shutdown(self) -> None:
+        with suppress(Exception):
+            self.run(self.stop)
+        self._executor.shutdown(wait=False)
+
+    def _open_context(self) -> Tuple[Any, Any]:
+        context = self._ready_browser().new_context()
+        page = context.new_page()
+        with suppress(Exception):
+            page.set_default_timeout(self.timeout_ms)
+        return context, page
+
+    def _ready_browser(self) -> Any:
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            # Contexts die with their browser; spares are useless now.
+            self._log.warning("Browser disconnected; relaunching")
+            self._spares.clear()
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self.launches += 1
+        self._log.info("Browser launched (launch #%d)", self.launches)
+        return self._browser
+
+
+class BrowserContextPool:
+    """A few shared browsers leasing out isolated, pre-opened contexts."""
+
+    def __init__(
+        self,
+        *,
+        browsers: int = DEFAULT_BROWSERS,
+        spare_contexts: int = DEFAULT_SPARE_CONTEXTS,
+        max_contexts: int = DEFAULT_MAX_CONTEXTS,
+        headless: bool = True,
+        timeout_ms: int = 10_000,
+        memory_monitor: Optional[BrowserMemoryMonitor] = None,
+    ) -> None:
+        if browsers < 1:
+            raise ValueError("browsers must be at least 1")
+        if spare_contexts < 0:
+            raise ValueError("spare_contexts cannot be negative")
+        if max_contexts < 1:
+            raise ValueError("max_contexts must be at least 1")
+        self.max_contexts = max_contexts
+        self.timeout_ms = timeout_ms
+        self.memory = memory_monitor or BrowserMemoryMonitor()
+        self._hosts: List[_BrowserHost] = [
+            _BrowserHost(
+                index,
+                headless=headless,
+                timeout_ms=timeout_ms,
+                spare_contexts=spare_contexts,
+                memory=self.memory,
+            )
+            for index in range(browsers)
+        ]
+        self._leased = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._log = get_logger(__name__, "context-pool")
+        self._counts = {
+            "leases": 0,
+            "warm_leases": 0,
+            "cold_leases": 0,
+            "released": 0,
+            "exhausted": 0,
+            "failures": 0,
+            "acquire_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Launch every browser and open its spare contexts in the background."""
+
+        for host in self._hosts:
+            host.submit(host.top_up)
+
+    def shutdown(self) -> None:
+        for host in self._hosts:
+            host.shutdown()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def acquire(self, *, task_id: Optional[str] = None) -> ContextLease:
+        """Lease a context on the least busy browser, avoiding ones waiting to be recycled."""
+
+        with self._lock:
+            if self._leased >= self.max_contexts:
+                self._counts["exhausted"] += 1
+                raise ContextPoolExhaustedError(f"All {self.max_contexts} browser contexts are leased")
+            host = min(
+                self._hosts,
+                key=lambda candidate: (candidate.recycle_pending is not None, candidate.leased),
+            )
+            host.leased += 1
+            self._leased += 1
+            lease_id = next(self._ids)
+
+        started = perf_counter()
+        try:
+            context, page, warm = host.run(host.take)
+        except Exception as exc:  # noqa: BLE001 - surface as a session error
+            with self._lock:
+                host.leased -= 1
+                self._leased -= 1
+                self._counts["failures"] += 1
+            raise SessionError(f"Could not open a browser context: {exc}") from exc
+        # Replace the spare we just took while the caller gets to work.
+        host.submit(host.maintain)
+
+        # No filter pushdown: a ticked vendor filter would outlive this request on the leased page.
+        driver = RobotDriver(
+            timeout_ms=self.timeout_ms, task_id=task_id or f"context-{lease_id}", filter_pushdown=False
+        )
+        driver.page = page
+        lease = ContextLease(lease_id, host, context, driver, warm=warm)
+        elapsed = perf_counter() - started
+        with self._lock:
+            self._counts["leases"] += 1
+            self._counts["warm_leases" if warm else "cold_leases"] += 1
+            self._counts["acquire_seconds"] += elapsed
+        self._log.info(
+            "Leased context %d on browser %d (%s, %.3fs)",
+            lease_id,
+            host.index,
+            "warm" if warm else "cold",
+            elapsed,
+        )
+        return lease
+
+    def release(self, lease: ContextLease) -> None:
+        """Close ``lease``'s context; a fresh spare replaces it in the background."""
+
+        if lease.released:
+            return
+        lease.released = True
+        host = lease._host
+        with self._lock:
+            host.leased -= 1
+            self._leased -= 1
+            self._counts["released"] += 1
+        host.submit(lambda: host.close_context(lease._context))
+        self._log.info("Released context %d after %d call(s)", lease.lease_id, lease.calls)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            acquire_seconds = counts.pop("acquire_seconds")
+            return {
+                **counts,
+                "avg_acquire_ms": round(acquire_seconds / counts["leases"] * 1000, 1) if counts["leases"] else None,
+                "leased": self._leased,
+                "max_contexts": self.max_contexts,
+                "browsers": [
+                    {
+                        "index": host.index,
+                        "leased": host.leased,
+                        "spare": host.spare_count(),
+                        "launches": host.launches,
+                        "recycles": host.recycles,
+                        "contexts_served": host.contexts_served,
+                        "recycle_pending": host.recycle_pending,
+                    }
+                    for host in self._hosts
+                ],
+                "memory": self.memory.stats(),
+            }
@@ -0,0 +1,228 @@
+"""Leveled, low-overhead logging for the robot driver and API service.
+
+The driver used to ``print`` for every catalog card and every step. This module
+routes those messages through :mod:`logging` instead:
+
+* messages use lazy ``%``-style arguments so nothing is formatted unless a
+  handler will actually emit the record;
+* every record carries a ``task_id`` so interleaved runs can be told apart;
+* an optional in-memory ring buffer keeps the most recent records for the API;
+* an optional file sink writes through a background queue listener so request
+  threads never block on disk I/O.
+
+Per-card messages are logged at ``DEBUG``; with the default ``INFO`` level the
+hot path only pays for a cached ``isEnabledFor`` check.
+
+Until :func:`configure_logging` is called, ``INFO`` and above go to stderr as
+bare messages, so scripts that use the driver directly still show progress.
+That default steps aside when the application has configured root logging.
+"""
+
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, MutableMapping, Optional, TextIO, Tuple
+
+LOGGER_NAMESPACE = "robot_driver"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-5s [%(task_id)s] %(name)s: %(message)s"
+CLI_FORMAT = "%(message)s"
+
+_configure_lock = threading.Lock()
+_installed_handlers: List[logging.Handler] = []
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_ring_buffer: Optional["RingBufferHandler"] = None
+
+
+def new_task_id() -> str:
+    """Return a short random identifier for correlating one run's records."""
+
+    return uuid.uuid4().hex[:12]
+
+
+class TaskLoggerAdapter(logging.LoggerAdapter):
+    """Attach a ``task_id`` to every record emitted through the adapter."""
+
+    def __init__(self, logger: logging.Logger, task_id: str) -> None:
+        super().__init__(logger, {"task_id": task_id})
+
+    @property
+    def task_id(self) -> str:
+        return self.extra["task_id"]
+
+    def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
+        extra = kwargs.get("extra")
+        kwargs["extra"] = {**self.extra, **extra} if extra else self.extra
+        return msg, kwargs
+
+
+class _TaskIdDefaultFilter(logging.Filter):
+    """Give records from plain loggers a placeholder ``task_id``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "task_id"):
+            record.task_id = "-"
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the most recent log records in memory as plain dictionaries."""
+
+    def __init__(self, capacity: int = 1_000, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            entry = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "task_id": getattr(record, "task_id", "-"),
+                "message": record.getMessage(),
+            }
+        except Exception:  # noqa: BLE001 - logging must never raise
+            self.handleError(record)
+            return
+        with self.lock:
+            self._records.append(entry)
+
+    def records(
+        self,
+        *,
+        limit: Optional[int] = None,
+        task_id: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self.lock:
+            entries = list(self._records)
+        if task_id is not None:
+            entries = [entry for entry in entries if entry["task_id"] == task_id]
+        if level is not None:
+            minimum = logging.getLevelName(level.upper())
+            if isinstance(minimum, int):
+                entries = [
+                    entry for entry in entries
+                    if logging.getLevelName(entry["level"]) >= minimum
+                ]
+        if limit is not None:
+            entries = entries[-limit:]
+        return entries
+
+
+class _DefaultStderrHandler(logging.StreamHandler):
+    """Print records until :func:`configure_logging` runs, unless root logging is set up."""
+
+    def __init__(self) -> None:
+        super().__init__(sys.stderr)
+        self.setFormatter(logging.Formatter(CLI_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if logging.getLogger().handlers:
+            return  # the record propagates to the application's handlers instead
+        self.stream = sys.stderr
+        super().emit(record)
+
+
+def get_logger(name: str, task_id: Optional[str] = None) -> TaskLoggerAdapter:
+    """Return a task-scoped logger under the shared ``robot_driver`` namespace."""
+
+    if not name.startswith(LOGGER_NAMESPACE):
+        name = f"{LOGGER_NAMESPACE}.{name.rsplit('.', 1)[-1]}"
+    return TaskLoggerAdapter(logging.getLogger(name), task_id or new_task_id())
+
+
+def configure_logging(
+    level: int | str = logging.INFO,
+    *,
+    stream: Optional[TextIO] = sys.stdout,
+    fmt: str = DEFAULT_FORMAT,
+    ring_buffer_size: Optional[int] = None,
+    log_file: Optional[str] = None,
+) -> None:
+    """Install handlers on the ``robot_driver`` logger, replacing earlier ones.
+
+    ``stream`` may be ``None`` to silence console output entirely. When
+    ``log_file`` is given, records are handed to a queue and written by a
+    background listener thread.
+    """
+
+    global _queue_listener, _ring_buffer
+
+    root = logging.getLogger(LOGGER_NAMESPACE)
+    with _configure_lock:
+        _reset_handlers(root)
+        root.setLevel(level)
+        root.propagate = False
+        formatter = logging.Formatter(fmt)
+        default_filter = _TaskIdDefaultFilter()
+
+        if stream is not None:
+            stream_handler = logging.StreamHandler(stream)
+            stream_handler.setFormatter(formatter)
+            stream_handler.addFilter(default_filter)
+            _install(root, stream_handler)
+
+        if ring_buffer_size:
+            _ring_buffer = RingBufferHandler(capacity=ring_buffer_size)
+            _ring_buffer.addFilter(default_filter)
+            _install(root, _ring_buffer)
+
+        if log_file:
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+            file_handler.addFilter(default_filter)
+            log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            _install(root, logging.handlers.QueueHandler(log_queue))
+            _queue_listener = logging.handlers.QueueListener(
+                log_queue, file_handler, respect_handler_level=True
+            )
+            _queue_listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush the background file sink and remove installed handlers."""
+
+    with _configure_lock:
+        _reset_handlers(logging.getLogger(LOGGER_NAMESPACE))
+
+
+def ring_buffer() -> Optional[RingBufferHandler]:
+    """Return the active in-memory ring buffer, if one was configured."""
+
+    return _ring_buffer
+
+
+def _install(logger: logging.Logger, handler: logging.Handler) -> None:
+    logger.addHandler(handler)
+    _installed_handlers.append(handler)
+
+
+def _reset_handlers(logger: logging.Logger) -> None:
+    global _queue_listener, _ring_buffer
+
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+    while _installed_handlers:
+        handler = _installed_handlers.pop()
+        logger.removeHandler(handler)
+        handler.close()
+    _ring_buffer = None
+
+
+def _install_default_handler() -> None:
+    logger = logging.getLogger(LOGGER_NAMESPACE)
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    _install(logger, _DefaultStderrHandler())
+
+
+_install_default_handler()
@@ -0,0 +1,214 @@
+"""Browserless backend that answers price lookups over the storefront's JSON API.
+
+:class:`HttpRobotDriver` is a drop-in alternative to :class:`RobotDriver` with
+the same ``run_complete_task`` and ``collect_catalog_snapshot`` signatures and
+the same :class:`RobotDriverResult`. Instead of launching Chromium it signs in
+and downloads the catalog through the endpoints declared by the site adapter,
+then reuses the driver's selection logic unchanged.
+
+All instances share one keep-alive connection pool, while each task gets its
+own :class:`requests.Session` so login cookies never leak between tasks.
+
+When the JSON path itself breaks (no API for the site, a transport error, a
+rejected login or an empty catalog), the driver sets ``fallback_reason`` and
+:func:`run_task_on_backend` retries in the browser. A clean negative answer,
+such as no product matching the strategy, is returned as-is.
+"""
+
+from __future__ import annotations
+
+import threading
+from time import perf_counter
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from robot_Driver_Playwright.checkpoints import PHASE_CATALOG_EXTRACTED
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.my_robot_driver import (
+    STRATEGY_MATCH,
+    RobotDriver,
+    RobotDriverResult,
+    SelectionParams,
+)
+from robot_Driver_Playwright.site_adapters import adapter_for_url
+
+BACKEND_BROWSER = "browser"
+BACKEND_HTTP = "http"
+ALLOWED_BACKENDS = [BACKEND_BROWSER, BACKEND_HTTP]
+
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+_pool_lock = threading.Lock()
+_shared_adapter: Optional[HTTPAdapter] = None
+
+
+def shared_http_adapter() -> HTTPAdapter:
+    """Return the process-wide pooled transport used by every HTTP session."""
+
+    global _shared_adapter
+    with _pool_lock:
+        if _shared_adapter is None:
+            _shared_adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=False,
+            )
+        return _shared_adapter
+
+
+class HttpRobotDriver(RobotDriver):
+    """RobotDriver variant that talks to the storefront's JSON endpoints."""
+
+    backend_name = BACKEND_HTTP
+
+    def __init__(self, timeout_ms: int = 10_000, *, task_id: Optional[str] = None) -> None:
+        super().__init__(timeout_ms=timeout_ms, task_id=task_id, network_capture=False)
+        self._session: Optional[requests.Session] = None
+        self._base_url: Optional[str] = None
+        self._username: Optional[str] = None
+        self.fallback_reason: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle overrides
+    # ------------------------------------------------------------------
+    def _start_browser(self, headless: bool) -> bool:
+        session = requests.Session()
+        adapter = shared_http_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self._session = session
+        self.log.info("HTTP session ready (pooled transport)")
+        return True
+
+    def _close_browser(self) -> None:
+        # Do not call Session.close(): it would close the shared pool.
+        if self._session is not None:
+            self._session.cookies.clear()
+        self._session = None
+        self.log.info("HTTP session released")
+
+    def _navigate(self, url: str) -> bool:
+        if self.site_adapter is None:
+            self.site_adapter = adapter_for_url(url)
+        if not self.site_adapter.supports_http:
+            self.log.warning("Site adapter '%s' has no JSON API for %s", self.site_adapter.name, url)
+            self.fallback_reason = f"site adapter '{self.site_adapter.name}' has no JSON API"
+            return False
+        self._base_url = url
+        self.site_url = url
+        return True
+
+    def _login(self, username_index: int, password_index: int) -> bool:
+        try:
+            self._username = self.site_adapter.http_login(
+                self._session,
+                self._base_url,
+                username_index,
+                password_index,
+                timeout=self.timeout_ms / 1000,
+            )
+        except requests.RequestException as exc:
+            self.log.error("HTTP login failed: %s", exc)
+            self.fallback_reason = f"login request failed: {exc}"
+            return False
+        if self._username is None:
+            self.log.warning("HTTP login rejected")
+            self.fallback_reason = "login rejected"
+            return False
+        self.log.info("HTTP login successful.")
+        return True
+
+    def _gather_catalog(self, product_name: Optional[str] = None) -> List[dict]:
+        started = perf_counter()
+        try:
+            entries = self.site_adapter.http_fetch_catalog(
+                self._session,
+                self._base_url,
+                self._username,
+                timeout=self.timeout_ms / 1000,
+            )
+        except (requests.RequestException, ValueError) as exc:
+            self.log.error("HTTP catalog request failed: %s", exc)
+            self.fallback_reason = f"catalog request failed: {exc}"
+            entries = None
+        if not entries and self.fallback_reason is None:
+            self.fallback_reason = "catalog request returned no products"
+        entries = entries or []
+        self.last_extraction = {
+            "cards": len(entries),
+            "collect_seconds": round(perf_counter() - started, 4),
+            "site_filter": None,
+            "source": BACKEND_HTTP,
+        }
+        self._record_snapshot(entries)
+        return entries
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def run_complete_task(
+        self,
+        url: str,
+        product_name: str = "iPhone 12",
+        *,
+        headless: bool = True,
+        username_index: int = 0,
+        password_index: int = 0,
+        selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
+    ) -> RobotDriverResult:
+        self.fallback_reason = None
+        result = super().run_complete_task(
+            url,
+            product_name,
+            headless=headless,
+            username_index=username_index,
+            password_index=password_index,
+            selection_strategy=selection_strategy,
+            selection_params=selection_params,
+        )
+        result.backend = self.backend_name
+        if not result.success and self.fallback_reason is None and PHASE_CATALOG_EXTRACTED not in result.checkpoints:
+            # Any other failure before the catalog arrived is the JSON path's, too.
+            self.fallback_reason = result.error
+        return result
+
+
+def run_task_on_backend(
+    backend: str,
+    *,
+    url: str,
+    product_name: str,
+    headless: bool = True,
+    timeout_ms: int = 10_000,
+    task_id: Optional[str] = None,
+    selection_strategy: str = STRATEGY_MATCH,
+    selection_params: Optional[SelectionParams] = None,
+) -> RobotDriverResult:
+    """Run a task on ``backend``, falling back to the browser if the HTTP path itself fails."""
+
+    if backend not in ALLOWED_BACKENDS:
+        raise ValueError(f"Unsupported backend '{backend}'. Choose from {ALLOWED_BACKENDS}.")
+
+    task = dict(
+        url=url,
+        product_name=product_name,
+        headless=headless,
+        selection_strategy=selection_strategy,
+        selection_params=selection_params,
+    )
+    if backend == BACKEND_HTTP:
+        http_driver = HttpRobotDriver(timeout_ms=timeout_ms, task_id=task_id)
+        result = http_driver.run_complete_task(**task)
+        if result.success or http_driver.fallback_reason is None:
+            return result
+        get_logger(__name__, task_id).warning(
+            "HTTP backend failed (%s); falling back to the browser backend", http_driver.fallback_reason
+        )
+        fallback = RobotDriver(timeout_ms=timeout_ms, task_id=task_id).run_complete_task(**task)
+        fallback.fallback_reason = f"http backend: {http_driver.fallback_reason}"
+        return fallback
+    return RobotDriver(timeout_ms=timeout_ms, task_id=task_id).run_complete_task(**task)
@@ -0,0 +1,280 @@
+"""Local intent router that resolves simple goals without calling the LLM.
+
+Most planning goals are short phrases such as "cheapest iPhone" or "find the
+iPhone 12 Pro". The router builds a vocabulary from the titles of the current
+catalog snapshot, scores how confidently it can map a goal to a product keyword
+and selection strategy, and lets :class:`AIPlaywrightBrain` skip the Claude call
+when that confidence clears a threshold. Every decision is recorded so the
+threshold can be tuned against latency and accuracy.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from robot_Driver_Playwright.my_robot_driver import (
+    STRATEGY_MATCH,
+    STRATEGY_MAX_PRICE,
+    STRATEGY_MIN_PRICE,
+)
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.75
+DEFAULT_HISTORY_SIZE = 500
+
+MAX_PRICE_CUES = ("most expensive", "highest", "priciest", "costliest")
+MIN_PRICE_CUES = ("cheapest", "least expensive", "lowest", "most affordable")
+
+# Words that carry no product information in typical goals. Intent cue words are
+# listed here too so they do not count against keyword coverage.
+STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "any", "add", "buy", "can", "cart", "device", "devices",
+        "find", "for", "get", "give", "i", "in", "is", "it", "item", "its", "me",
+        "most", "of", "on", "one", "phone", "phones", "please", "price", "product",
+        "products", "select", "show", "site", "store", "that", "the", "this", "to",
+        "want", "what", "which", "with",
+        "affordable", "cheapest", "costliest", "expensive", "highest", "least",
+        "lowest", "priciest",
+    }
+)
+
+ROUTE_LOCAL = "local"
+ROUTE_LLM = "llm"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class RoutingDecision:
+    """Outcome of routing a single goal."""
+
+    goal: str
+    route: str
+    confidence: float
+    product_keyword: str
+    selection_strategy: str
+    strategy_score: float
+    keyword_score: float
+    threshold: float
+    latency_ms: float
+    matched_titles: int = 0
+    unmatched_tokens: List[str] = field(default_factory=list)
+    resolved_by: Optional[str] = None
+    final_keyword: Optional[str] = None
+    final_strategy: Optional[str] = None
+
+    @property
+    def is_local(self) -> bool:
+        return self.route == ROUTE_LOCAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "goal": self.goal,
+            "route": self.route,
+            "confidence": round(self.confidence, 3),
+            "product_keyword": self.product_keyword,
+            "selection_strategy": self.selection_strategy,
+            "strategy_score": round(self.strategy_score, 3),
+            "keyword_score": round(self.keyword_score, 3),
+            "threshold": self.threshold,
+            "latency_ms": round(self.latency_ms, 3),
+            "matched_titles": self.matched_titles,
+            "unmatched_tokens": self.unmatched_tokens,
+            "resolved_by": self.resolved_by,
+            "final_keyword": self.final_keyword,
+            "final_strategy": self.final_strategy,
+        }
+
+
+def detect_strategy(goal: str) -> Tuple[str, float]:
+    """Return the selection strategy implied by ``goal`` and a confidence score."""
+
+    lowered_goal = goal.lower()
+    wants_max = any(cue in lowered_goal for cue in MAX_PRICE_CUES)
+    wants_min = any(cue in lowered_goal for cue in MIN_PRICE_CUES)
+    if wants_max and wants_min:
+        return STRATEGY_MATCH, 0.2
+    if wants_max:
+        return STRATEGY_MAX_PRICE, 1.0
+    if wants_min:
+        return STRATEGY_MIN_PRICE, 1.0
+    return STRATEGY_MATCH, 0.6
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class CatalogVocabulary:
+    """Phrase vocabulary built from the titles of one catalog snapshot."""
+
+    def __init__(self, titles: Sequence[str]) -> None:
+        self.phrase_counts: Dict[str, int] = {}
+        self.full_titles: set[str] = set()
+        for title in titles:
+            normalized_title = " ".join(title.lower().split())
+            tokens = _tokenize(normalized_title)
+            if not tokens:
+                continue
+            seen: set[str] = set()
+            for start in range(len(tokens)):
+                for end in range(start + 1, len(tokens) + 1):
+                    phrase = " ".join(tokens[start:end])
+                    # Skip spans that cross punctuation in the raw title so the
+                    # keyword remains a literal substring for RobotDriver.
+                    if phrase in seen or phrase not in normalized_title:
+                        continue
+                    seen.add(phrase)
+                    self.phrase_counts[phrase] = self.phrase_counts.get(phrase, 0) + 1
+            full_phrase = " ".join(tokens)
+            if full_phrase in normalized_title:
+                self.full_titles.add(full_phrase)
+
+    def longest_phrase(self, tokens: Sequence[str]) -> Tuple[Optional[str], int, int]:
+        """Find the longest contiguous token span of ``tokens`` present in the vocabulary."""
+
+        for length in range(len(tokens), 0, -1):
+            for start in range(len(tokens) - length + 1):
+                span = tokens[start:start + length]
+                if all(token in STOPWORDS for token in span):
+                    continue
+                phrase = " ".join(span)
+                if phrase in self.phrase_counts:
+                    return phrase, start, start + length
+        return None, 0, 0
+
+
+class IntentRouter:
+    """Score goals locally and decide whether the LLM planner is needed."""
+
+    def __init__(
+        self,
+        *,
+        threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ) -> None:
+        self.threshold = threshold
+        self._decisions: Deque[RoutingDecision] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._counts = {ROUTE_LOCAL: 0, ROUTE_LLM: 0}
+        self._vocabulary_key: Optional[Tuple[str, ...]] = None
+        self._vocabulary: Optional[CatalogVocabulary] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def route(self, goal: str, catalog: List[Dict[str, Any]]) -> RoutingDecision:
+        """Score ``goal`` against ``catalog`` and record the routing decision."""
+
+        started = perf_counter()
+        vocabulary = self._vocabulary_for(catalog)
+        selection_strategy, strategy_score = detect_strategy(goal)
+
+        tokens = _tokenize(goal)
+        phrase, start, end = vocabulary.longest_phrase(tokens)
+        content_tokens = [
+            token for index, token in enumerate(tokens)
+            if token not in STOPWORDS and not start <= index < end
+        ]
+
+        if phrase is None:
+            # A bare "cheapest product" goal is still answerable over the whole
+            # catalog; anything else with no catalog vocabulary is ambiguous.
+            product_keyword = ""
+            matched_titles = len(catalog)
+            if content_tokens or selection_strategy == STRATEGY_MATCH:
+                keyword_score = 0.0
+            else:
+                keyword_score = 0.8
+        else:
+            product_keyword = phrase
+            matched_titles = vocabulary.phrase_counts[phrase]
+            covered = len([token for token in tokens[start:end] if token not in STOPWORDS])
+            keyword_score = covered / (covered + len(content_tokens))
+            if selection_strategy == STRATEGY_MATCH and strategy_score < 1.0:
+                if phrase in vocabulary.full_titles:
+                    strategy_score = 1.0
+
+        confidence = strategy_score * keyword_score
+        decision = RoutingDecision(
+            goal=goal,
+            route=ROUTE_LOCAL if confidence >= self.threshold else ROUTE_LLM,
+            confidence=confidence,
+            product_keyword=product_keyword,
+            selection_strategy=selection_strategy,
+            strategy_score=strategy_score,
+            keyword_score=keyword_score,
+            threshold=self.threshold,
+            latency_ms=(perf_counter() - started) * 1000,
+            matched_titles=matched_titles,
+            unmatched_tokens=content_tokens,
+        )
+        self._record(decision)
+        return decision
+
+    def decisions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the most recent routing decisions, newest last."""
+
+        with self._lock:
+            recent = list(self._decisions)
+        if limit is not None:
+            recent = recent[-limit:]
+        return [decision.to_dict() for decision in recent]
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarise routing counts, confidence and agreement with the LLM."""
+
+        with self._lock:
+            recent = list(self._decisions)
+            local = self._counts[ROUTE_LOCAL]
+            escalated = self._counts[ROUTE_LLM]
+        total = local + escalated
+        resolved_by_llm = [
+            decision for decision in recent
+            if decision.route == ROUTE_LLM and decision.resolved_by == "claude"
+        ]
+        agreed = [
+            decision for decision in resolved_by_llm
+            if decision.final_strategy == decision.selection_strategy
+            and (decision.final_keyword or "").lower() == decision.product_keyword
+        ]
+        return {
+            "threshold": self.threshold,
+            "total": total,
+            "local": local,
+            "escalated": escalated,
+            "local_rate": round(local / total, 3) if total else 0.0,
+            "mean_confidence": (
+                round(sum(d.confidence for d in recent) / len(recent), 3) if recent else 0.0
+            ),
+            "mean_routing_latency_ms": (
+                round(sum(d.latency_ms for d in recent) / len(recent), 3) if recent else 0.0
+            ),
+            "llm_agreement_rate": (
+                round(len(agreed) / len(resolved_by_llm), 3) if resolved_by_llm else None
+            ),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _vocabulary_for(self, catalog: List[Dict[str, Any]]) -> CatalogVocabulary:
+        titles = tuple(str(entry.get("title") or "") for entry in catalog)
+        with self._lock:
+            if self._vocabulary is not None and self._vocabulary_key == titles:
+                return self._vocabulary
+        vocabulary = CatalogVocabulary(titles)
+        with self._lock:
+            self._vocabulary_key = titles
+            self._vocabulary = vocabulary
+        return vocabulary
+
+    def _record(self, decision: RoutingDecision) -> None:
+        with self._lock:
+            self._decisions.append(decision)
+            self._counts[decision.route] += 1
@@ -0,0 +1,318 @@
+"""Resilient wrapper around the Anthropic client.
+
+:class:`ResilientAnthropicClient` exposes the same ``messages.create`` and
+``messages.stream`` calls as ``anthropic.Anthropic`` and adds:
+
+* a bounded in-flight semaphore, so a slow API cannot tie up every request
+  thread;
+* a per-call timeout;
+* jittered exponential-backoff retries for retryable failures (connection
+  errors, timeouts, 408/409/429 and 5xx responses), honouring ``retry-after``
+  when the server sends one;
+* a circuit breaker that opens after consecutive retryable failures and
+  rejects calls immediately until ``breaker_reset_seconds`` have passed. It
+  then lets a single trial call through (half-open).
+
+A stream is retried only while it is being opened; once events have been
+handed to the caller, a failure is recorded and re-raised.
+
+Callers check :meth:`ResilientAnthropicClient.available` to skip the LLM
+entirely while the breaker is open. :meth:`ResilientAnthropicClient.stats`
+reports breaker state and call latency.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from time import monotonic, sleep
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from anthropic import APIConnectionError, APIStatusError
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+_log = get_logger(__name__, "llm-client")
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when a call is rejected without reaching the API."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised while the circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class LLMCallPolicy:
+    """Limits applied to every LLM call."""
+
+    max_in_flight: int = 4
+    timeout_seconds: float = 20.0
+    max_retries: int = 2
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    breaker_failures: int = 5
+    breaker_reset_seconds: float = 30.0
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._opens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """Return ``True`` if a call may proceed (claiming the trial slot when half-open)."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == BREAKER_CLOSED:
+                return True
+            if state == BREAKER_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = BREAKER_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            half_open = self._current_state() == BREAKER_HALF_OPEN
+            self._trial_in_flight = False
+            if half_open or self._failures >= self.failure_threshold:
+                if self._state != BREAKER_OPEN or half_open:
+                    self._opens += 1
+                    _log.warning("LLM circuit breaker opened after %d consecutive failure(s)", self._failures)
+                self._state = BREAKER_OPEN
+                self._opened_at = monotonic()
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot that ended without a verdict."""
+
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opens": self._opens,
+                "retry_in_seconds": (
+                    round(max(0.0, self._opened_at + self.reset_seconds - monotonic()), 2)
+                    if state == BREAKER_OPEN
+                    else 0.0
+                ),
+            }
+
+    def _current_state(self) -> str:
+        # Caller holds the lock.
+        if self._state == BREAKER_OPEN and monotonic() - self._opened_at >= self.reset_seconds:
+            return BREAKER_HALF_OPEN
+        return self._state
+
+
+class _LatencyWindow:
+    def __init__(self, size: int = 512) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"samples": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+
+        def pick(fraction: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+        return {"samples": len(ordered), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": pick(1.0)}
+
+
+class _Messages:
+    def __init__(self, owner: "ResilientAnthropicClient") -> None:
+        self._owner = owner
+
+    def create(self, **kwargs: Any) -> Any:
+        return self._owner._call(kwargs)
+
+    def stream(self, **kwargs: Any) -> Any:
+        return self._owner._stream(kwargs)
+
+
+class ResilientAnthropicClient:
+    """Drop-in ``messages.create``/``messages.stream`` with a concurrency cap, retries and a circuit breaker."""
+
+    def __init__(self, client: Any, policy: Optional[LLMCallPolicy] = None) -> None:
+        self.policy = policy or LLMCallPolicy()
+        # Retries are ours; stop the SDK from retrying underneath us.
+        self._client = client.with_options(max_retries=0) if hasattr(client, "with_options") else client
+        self.breaker = CircuitBreaker(self.policy.breaker_failures, self.policy.breaker_reset_seconds)
+        self.messages = _Messages(self)
+        self._slots = threading.BoundedSemaphore(self.policy.max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = _LatencyWindow()
+        self._counts = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "short_circuited": 0, "saturated": 0}
+
+    def available(self) -> bool:
+        """``False`` while the breaker is open, so callers can skip straight to a fallback."""
+
+        return self.breaker.state != BREAKER_OPEN
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            in_flight = self._in_flight
+            latency = self._latency.summary()
+        return {
+            **counts,
+            "in_flight": in_flight,
+            "breaker": self.breaker.stats(),
+            "latency": latency,
+            "policy": asdict(self.policy),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _call(self, kwargs: Dict[str, Any]) -> Any:
+        with self._slot():
+            started, response = self._retrying(
+                lambda: self._client.messages.create(timeout=self.policy.timeout_seconds, **kwargs)
+            )
+            self._succeeded(started)
+            return response
+
+    @contextmanager
+    def _stream(self, kwargs: Dict[str, Any]) -> Iterator[Any]:
+        with self._slot():
+            managers = []
+
+            def open_stream() -> Any:
+                manager = self._client.messages.stream(timeout=self.policy.timeout_seconds, **kwargs)
+                stream = manager.__enter__()
+                managers.append(manager)
+                return stream
+
+            started, stream = self._retrying(open_stream)
+            try:
+                yield stream
+            except BaseException as exc:
+                managers[-1].__exit__(type(exc), exc, exc.__traceback__)
+                self._failed(started, exc)
+                raise
+            managers[-1].__exit__(None, None, None)
+            self._succeeded(started)
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError("LLM circuit breaker is open")
+        if not self._slots.acquire(timeout=self.policy.timeout_seconds):
+            self.breaker.release_trial()
+            self._count("saturated")
+            raise LLMUnavailableError(f"No LLM call slot free within {self.policy.timeout_seconds:.0f}s")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _retrying(self, attempt: Callable[[], Any]) -> Tuple[float, Any]:
+        """Run ``attempt`` until it succeeds or retries run out; return its start time and result."""
+
+        retries = 0
+        while True:
+            started = monotonic()
+            try:
+                return started, attempt()
+            except Exception as exc:  # noqa: BLE001 - classified below
+                # Stop retrying once other callers have tripped the breaker.
+                if (
+                    not self._is_retryable(exc)
+                    or retries >= self.policy.max_retries
+                    or self.breaker.state == BREAKER_OPEN
+                ):
+                    self._failed(started, exc)
+                    raise
+                retries += 1
+                delay = self._backoff(retries, exc)
+                self._count("retries")
+                _log.warning("LLM call failed (%s); retry %d in %.2fs", type(exc).__name__, retries, delay)
+                sleep(delay)
+
+    def _succeeded(self, started: float) -> None:
+        self.breaker.record_success()
+        self._record(monotonic() - started, ok=True)
+
+    def _failed(self, started: float, exc: BaseException) -> None:
+        if isinstance(exc, Exception) and self._is_retryable(exc):
+            self.breaker.record_failure()
+        else:
+            # The service answered (or the caller gave up); this request was just bad.
+            self.breaker.release_trial()
+        self._record(monotonic() - started, ok=False)
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        if isinstance(exc, APIConnectionError):
+            return True
+        if isinstance(exc, APIStatusError):
+            return exc.status_code in RETRYABLE_STATUS_CODES or exc.status_code >= 500
+        return False
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        ceiling = min(self.policy.backoff_max_seconds, self.policy.backoff_base_seconds * 2 ** (attempt - 1))
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.policy.backoff_max_seconds, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        # Full jitter keeps a burst of failed callers from retrying in lockstep.
+        return random.uniform(0, ceiling)
+
+    def _record(self, seconds: float, *, ok: bool) -> None:
+        with self._lock:
+            self._latency.add(seconds)
+            self._counts["succeeded" if ok else "failed"] += 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
@@ -0,0 +1,773 @@
+"""Model Context Protocol server for the Robot Driver.
+
+Exposes the :class:`RobotDriver` steps (open a site and log in, extract the
+catalog, select a product, add it to the cart) and the part2 Playwright tools
+(navigate, click, fill, wait, page info, text, screenshot) as MCP tools over two
+transports:
+
+* ``stdio``: newline-delimited JSON-RPC on stdin/stdout, one client per process.
+* ``http``: the streamable HTTP transport on a single ``/mcp`` endpoint.
+  ``initialize`` answers with an ``Mcp-Session-Id`` header, later requests
+  echo it, and ``DELETE /mcp`` ends the session.
+
+An MCP session leases its own context from a shared
+:class:`~robot_Driver_Playwright.context_pool.BrowserContextPool` on its first
+browser tool call. It keeps that context until the client ends the session or
+it sits idle past the idle timeout. Stdio sessions are never reaped: a stdio
+client initializes once per process and could not open a new session. Cookies, login, the current page and the
+extracted catalog carry over between tool calls. No call pays for a browser
+launch, and concurrent clients never share a page.
+
+Every tool call that drives a site is admitted on that site's host, like a
+one-shot driver run. The host is taken from the call's ``url`` argument, or
+else from the last URL the session opened. Leasing a context is not admitted:
+it opens no site, and the pool's context cap already bounds it.
+
+The protocol (``initialize``, ``ping``, ``tools/list``, ``tools/call``) is
+implemented directly on JSON-RPC 2.0 rather than through the ``mcp`` SDK, so
+the server needs nothing beyond the API's own dependencies.
+
+Usage::
+
+    python -m robot_Driver_Playwright.mcp_server
+    python -m robot_Driver_Playwright.mcp_server --transport http --port 8765
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import uuid
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import asdict
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.admission import AdmissionController, default_admission_controller
+from robot_Driver_Playwright.browser_memory import (
+    DEFAULT_MAX_BROWSER_RSS_MB,
+    DEFAULT_MAX_BROWSER_TASKS,
+    BrowserMemoryMonitor,
+    MemoryLimits,
+)
+from robot_Driver_Playwright.browser_sessions import (
+    DEFAULT_IDLE_TIMEOUT_SECONDS,
+    DEFAULT_MAX_SESSIONS,
+    BrowserSession,
+    SessionError,
+    SessionNotFoundError,
+)
+from robot_Driver_Playwright.context_pool import BrowserContextPool, ContextLease
+from robot_Driver_Playwright.driver_logging import configure_logging, get_logger
+from robot_Driver_Playwright.my_robot_driver import (
+    ALLOWED_STRATEGIES,
+    STRATEGY_MATCH,
+    RobotDriver,
+    SelectionParams,
+)
+from robot_Driver_Playwright.part2_mcp_ai_brain.playwright_tools import (
+    TOOL_DEFINITIONS,
+    PlaywrightTools,
+    tool_failed,
+)
+from robot_Driver_Playwright.screenshots import ScreenshotCapturer
+
+SERVER_NAME = "robot-driver"
+SERVER_VERSION = "1.0.0"
+LATEST_PROTOCOL_VERSION = "2025-06-18"
+SUPPORTED_PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+
+SESSION_HEADER = "Mcp-Session-Id"
+DEFAULT_HTTP_PATH = "/mcp"
+DEFAULT_HTTP_PORT = 8765
+
+# JSON-RPC 2.0 error codes, plus one server-defined code.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SESSION_LIMIT = -32000
+
+# Entries returned by robot_extract_catalog unless the client asks for more.
+DEFAULT_CATALOG_LIMIT = 50
+
+_SELECTION_PROPERTIES: Dict[str, Any] = {
+    "selection_strategy": {"type": "string", "enum": list(ALLOWED_STRATEGIES)},
+    "price_min": {"type": "number"},
+    "price_max": {"type": "number"},
+    "target_price": {"type": "number"},
+    "rank": {"type": "integer", "minimum": 1},
+    "count": {"type": "integer", "minimum": 1},
+}
+
+DRIVER_TOOL_DEFINITIONS: List[Dict[str, Any]] = [
+    {
+        "name": "robot_open_site",
+        "description": "Open a storefront in this session's browser context, log in and extract its catalog.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "description": "Storefront URL"},
+                "login": {"type": "boolean", "default": True},
+                "username_index": {"type": "integer", "minimum": 0, "default": 0},
+                "password_index": {"type": "integer", "minimum": 0, "default": 0},
+            },
+            "required": ["url"],
+        },
+    },
+    {
+        "name": "robot_extract_catalog",
+        "description": "Extract the product catalog from the current page, or reload the page first with refresh.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "refresh": {"type": "boolean", "default": False},
+                "limit": {"type": "integer", "minimum": 0, "default": DEFAULT_CATALOG_LIMIT},
+            },
+        },
+    },
+    {
+        "name": "robot_select_product",
+        "description": "Select a product from the extracted catalog by name or price strategy.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"product_name": {"type": "string"}, **_SELECTION_PROPERTIES},
+            "required": ["product_name"],
+        },
+    },
+    {
+        "name": "robot_add_to_cart",
+        "description": "Add a product to the cart by exact title, or select one first with the same arguments as robot_select_product.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"product_name": {"type": "string"}, **_SELECTION_PROPERTIES},
+            "required": ["product_name"],
+        },
+    },
+]
+
+
+class McpError(Exception):
+    """A JSON-RPC error to send back to the client."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _mcp_tool(definition: Dict[str, Any]) -> Dict[str, Any]:
+    # The part2 tools use the Anthropic spelling of the schema key.
+    return {
+        "name": definition["name"],
+        "description": definition["description"],
+        "inputSchema": definition.get("inputSchema") or definition["input_schema"],
+    }
+
+
+class McpSession:
+    """One MCP client session and the browser context it has leased."""
+
+    def __init__(self, session_id: str, protocol_version: str, client_info: Dict[str, Any]) -> None:
+        self.session_id = session_id
+        self.protocol_version = protocol_version
+        self.client_info = client_info
+        self.initialized = False
+        self.lease: Optional[ContextLease] = None
+        self.catalog: List[Dict[str, Any]] = []
+        # The last URL a tool opened; later calls are admitted on its host.
+        self.url: Optional[str] = None
+        self.screenshots = ScreenshotCapturer()
+        self.created_at = monotonic()
+        self.last_used = self.created_at
+        self.tool_calls = 0
+        self.closed = False
+        # Tool calls of one session run one at a time, in arrival order.
+        self.lock = threading.Lock()
+
+    def describe(self) -> Dict[str, Any]:
+        now = monotonic()
+        return {
+            "session_id": self.session_id,
+            "protocol_version": self.protocol_version,
+            "client": self.client_info.get("name"),
+            "tool_calls": self.tool_calls,
+            "catalog_size": len(self.catalog),
+            "context": self.lease.describe() if self.lease else None,
+            "screenshots": self.screenshots.stats(),
+            "age_seconds": round(now - self.created_at, 2),
+            "idle_seconds": round(now - self.last_used, 2),
+        }
+
+
+class McpServer:
+    """MCP protocol handling on top of a pool of browser contexts."""
+
+    def __init__(
+        self,
+        pool: BrowserContextPool,
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        reap_interval: float = 15.0,
+        admission: Optional[AdmissionController] = None,
+    ) -> None:
+        self.pool = pool
+        self.admission = admission
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._sessions: Dict[str, McpSession] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self._started = False
+        self._log = get_logger(__name__, "mcp-server")
+        self._counts = {"sessions_opened": 0, "sessions_reaped": 0, "tool_calls": 0, "tool_errors": 0}
+        self._driver_tools: Dict[str, Callable[[McpSession, RobotDriver, Dict[str, Any]], Dict[str, Any]]] = {
+            "robot_open_site": self._tool_open_site,
+            "robot_extract_catalog": self._tool_extract_catalog,
+            "robot_select_product": self._tool_select_product,
+            "robot_add_to_cart": self._tool_add_to_cart,
+        }
+        self._page_tools = {definition["name"] for definition in TOOL_DEFINITIONS}
+        self._tools = [_mcp_tool(definition) for definition in DRIVER_TOOL_DEFINITIONS + TOOL_DEFINITIONS]
+        self._methods: Dict[str, Callable[[McpSession, Dict[str, Any]], Dict[str, Any]]] = {
+            "ping": lambda session, params: {},
+            "tools/list": self._rpc_tools_list,
+            "tools/call": self._rpc_tools_call,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Warm the context pool and start reaping idle sessions (unless ``idle_timeout`` is ``None``)."""
+
+        if self._started:
+            return
+        self._started = True
+        self.pool.start()
+        if self.idle_timeout is None:
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="mcp-session-reaper", daemon=True)
+        self._reaper.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._release(session)
+        self.pool.shutdown()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def handle(self, message: Any, session_id: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Handle one JSON-RPC message from a client.
+
+        Returns the response, or ``None`` for notifications and client
+        responses, together with the id of the session the message belongs
+        to (a new one after ``initialize``). Raises
+        :class:`SessionNotFoundError` when a request other than
+        ``initialize`` or ``ping`` names no live session.
+        """
+
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0":
+            return _error(None, INVALID_REQUEST, "Expected a single JSON-RPC 2.0 message"), session_id
+        method = message.get("method")
+        request_id = message.get("id")
+        is_request = "id" in message
+        if method is None:
+            # A response to a server request; this server never sends any.
+            return None, session_id
+        if not isinstance(method, str):
+            return _error(request_id, INVALID_REQUEST, "method must be a string"), session_id
+        params = message.get("params") or {}
+        if not isinstance(params, dict):
+            return _error(request_id, INVALID_PARAMS, "params must be an object"), session_id
+
+        if method == "initialize":
+            if not is_request:
+                return None, session_id
+            try:
+                session = self.open_session(params)
+            except SessionError as exc:
+                return _error(request_id, SESSION_LIMIT, str(exc)), session_id
+            return {"jsonrpc": "2.0", "id": request_id, "result": self._initialize_result(session)}, session.session_id
+
+        session = self._session(session_id) if session_id or method != "ping" else None
+        if session is not None:
+            session.last_used = monotonic()
+        if not is_request:
+            if method == "notifications/initialized" and session is not None:
+                session.initialized = True
+            return None, session_id
+
+        handler = self._methods.get(method)
+        if handler is None:
+            return _error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}"), session_id
+        try:
+            result = handler(session, params)
+        except McpError as exc:
+            return _error(request_id, exc.code, exc.message), session_id
+        except SessionNotFoundError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - report, keep serving
+            self._log.exception("Unhandled error in %s", method)
+            return _error(request_id, INTERNAL_ERROR, str(exc)), session_id
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}, session_id
+
+    def open_session(self, params: Optional[Dict[str, Any]] = None) -> McpSession:
+        params = params or {}
+        requested = params.get("protocolVersion")
+        version = requested if requested in SUPPORTED_PROTOCOL_VERSIONS else LATEST_PROTOCOL_VERSION
+        session = McpSession(uuid.uuid4().hex, version, params.get("clientInfo") or {})
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionError(f"Session limit reached ({self.max_sessions})")
+            self._sessions[session.session_id] = session
+            self._counts["sessions_opened"] += 1
+        self._log.info(
+            "Opened MCP session %s for %s (protocol %s)",
+            session.session_id,
+            session.client_info.get("name", "unknown client"),
+            version,
+        )
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+        self._release(session)
+        self._log.info("Closed MCP session %s after %d tool call(s)", session_id, session.tool_calls)
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [session.describe() for session in sessions]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                **self._counts,
+                "open_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout_seconds": self.idle_timeout,
+            }
+        stats["contexts"] = self.pool.stats()
+        return stats
+
+    def reap_idle(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout``; return how many."""
+
+        if self.idle_timeout is None:
+            return 0
+        cutoff = monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [s for s in self._sessions.values() if s.last_used < cutoff and not s.lock.locked()]
+            for session in idle:
+                self._sessions.pop(session.session_id, None)
+            self._counts["sessions_reaped"] += len(idle)
+        for session in idle:
+            self._log.info("Reaping idle MCP session %s", session.session_id)
+            self._release(session)
+        return len(idle)
+
+    # ------------------------------------------------------------------
+    # Protocol methods
+    # ------------------------------------------------------------------
+    def _initialize_result(self, session: McpSession) -> Dict[str, Any]:
+        return {
+            "protocolVersion": session.protocol_version,
+            "capabilities": {"tools": {"listChanged": False}},
+            "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+            "instructions": (
+                "Each session has its own browser context. Call robot_open_site first, then "
+                "robot_select_product or robot_add_to_cart; the playwright_* tools act on the same page."
+            ),
+        }
+
+    def _rpc_tools_list(self, session: McpSession, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"tools": self._tools}
+
+    def _rpc_tools_call(self, session: McpSession, params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get("name")
+        arguments = params.get("arguments") or {}
+        if name not in self._driver_tools and name not in self._page_tools:
+            raise McpError(INVALID_PARAMS, f"Unknown tool: {name}")
+        if not isinstance(arguments, dict):
+            raise McpError(INVALID_PARAMS, "arguments must be an object")
+
+        started = perf_counter()
+        with session.lock:
+            if session.closed:
+                raise SessionNotFoundError(f"Session '{session.session_id}' is closed")
+            session.tool_calls += 1
+            try:
+                lease = self._lease_for(session)
+                url = arguments.get("url") if isinstance(arguments.get("url"), str) else None
+                if url:
+                    session.url = url
+                admitted = self._admission().admit(session.url) if session.url else nullcontext()
+                with admitted:
+                    payload, text, is_error, screenshot = self._call_tool(session, lease, name, arguments)
+            except Exception as exc:  # noqa: BLE001 - tool failures are results, not protocol errors
+                payload, text, is_error, screenshot = None, f"Error: {exc}", True, None
+            finally:
+                session.last_used = monotonic()
+
+        with self._lock:
+            self._counts["tool_calls"] += 1
+            self._counts["tool_errors"] += int(is_error)
+        self._log.info(
+            "Session %s: %s %s in %.3fs",
+            session.session_id,
+            name,
+            "failed" if is_error else "ok",
+            perf_counter() - started,
+        )
+        content: List[Dict[str, Any]] = [{"type": "text", "text": text}]
+        if screenshot is not None and screenshot.data:
+            content.append({"type": "image", "data": screenshot.base64(), "mimeType": screenshot.media_type})
+        result: Dict[str, Any] = {"content": content, "isError": is_error}
+        if payload is not None:
+            result["structuredContent"] = payload
+        return result
+
+    def _call_tool(
+        self, session: McpSession, lease: ContextLease, name: str, arguments: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], str, bool, Optional[Any]]:
+        """Run one tool on the lease; return its payload, text, error flag and screenshot."""
+
+        if name in self._driver_tools:
+            handler = self._driver_tools[name]
+            payload = lease.run(lambda driver: handler(session, driver, arguments))
+            return payload, json.dumps(payload), not payload.get("success", False), None
+        outcome = lease.run(lambda driver: PlaywrightTools(driver.page, session.screenshots).execute(name, arguments))
+        if isinstance(outcome, Future):
+            # Screenshots encode on a worker; the browser thread is already free.
+            screenshot = outcome.result()
+            return screenshot.to_dict(), screenshot.summary(), False, screenshot
+        return None, outcome, tool_failed(outcome), None
+
+    def _admission(self) -> AdmissionController:
+        return self.admission or default_admission_controller()
+
+    # ------------------------------------------------------------------
+    # Driver tools (run on the lease's browser thread)
+    # ------------------------------------------------------------------
+    def _tool_open_site(self, session: McpSession, driver: RobotDriver, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        url = arguments.get("url")
+        if not url:
+            return {"success": False, "error": "url is required"}
+        if not driver._navigate(url):
+            return {"success": False, "url": url, "error": "Failed to navigate to site"}
+        logged_in = False
+        if arguments.get("login", True):
+            logged_in = driver._login(
+                username_index=int(arguments.get("username_index", 0)),
+                password_index=int(arguments.get("password_index", 0)),
+            )
+            if not logged_in:
+                return {"success": False, "url": url, "error": "Failed to login"}
+        session.catalog = driver._gather_catalog()
+        return {
+            "success": True,
+            "url": url,
+            "logged_in": logged_in,
+            "catalog_size": len(session.catalog),
+            "extraction": driver.last_extraction,
+        }
+
+    def _tool_extract_catalog(
+        self, session: McpSession, driver: RobotDriver, arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if driver.page.url in ("", "about:blank"):
+            return {"success": False, "error": "No page open; call robot_open_site first"}
+        session.catalog = driver._refresh_catalog() if arguments.get("refresh") else driver._gather_catalog()
+        limit = max(0, int(arguments.get("limit", DEFAULT_CATALOG_LIMIT)))
+        return {
+            "success": bool(session.catalog),
+            "catalog_size": len(session.catalog),
+            "extraction": driver.last_extraction,
+            "products": [
+                {"title": entry.get("title"), "price": entry.get("price_text"), "price_value": entry.get("price_value")}
+                for entry in session.catalog[:limit]
+            ],
+        }
+
+    def _tool_select_product(
+        self, session: McpSession, driver: RobotDriver, arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        product_name = arguments.get("product_name") or ""
+        strategy = arguments.get("selection_strategy") or STRATEGY_MATCH
+        if strategy not in ALLOWED_STRATEGIES:
+            return {"success": False, "error": f"Unsupported selection strategy '{strategy}'."}
+        params = BrowserSession._params_from(arguments) or SelectionParams()
+        try:
+            params.validate(strategy)
+        except ValueError as exc:
+            return {"success": False, "error": str(exc)}
+        # Reuse the catalog from robot_open_site/robot_extract_catalog; extract on demand otherwise.
+        found, matched, price = driver._locate_product(
+            product_name,
+            strategy=strategy,
+            params=params,
+            entries=session.catalog or None,
+        )
+        return {
+            "success": bool(found and price and price != "Price not available"),
+            "product": matched,
+            "price": price,
+            "selection_strategy": strategy,
+            "selection_params": asdict(params),
+            "matches": driver.last_matches,
+        }
+
+    def _tool_add_to_cart(self, session: McpSession, driver: RobotDriver, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        product_name = arguments.get("product_name")
+        if arguments.get("selection_strategy", STRATEGY_MATCH) != STRATEGY_MATCH or not product_name:
+            selected = self._tool_select_product(session, driver, arguments)
+            if not selected["success"]:
+                return {**selected, "added_to_cart": False}
+            product_name = selected["product"]
+        added = driver._add_to_cart(product_name)
+        return {"success": added, "product": product_name, "added_to_cart": added}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _session(self, session_id: Optional[str]) -> McpSession:
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+        if session is None or session.closed:
+            raise SessionNotFoundError(f"Session '{session_id}' not found")
+        return session
+
+    def _lease_for(self, session: McpSession) -> ContextLease:
+        if session.lease is None:
+            session.lease = self.pool.acquire(task_id=f"mcp-{session.session_id[:12]}")
+        return session.lease
+
+    def _release(self, session: McpSession) -> None:
+        # Wait for an in-flight tool call before handing the context back.
+        with session.lock:
+            session.closed = True
+            lease, session.lease = session.lease, None
+        if lease is not None:
+            self.pool.release(lease)
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval):
+            self.reap_idle()
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+def serve_stdio(server: McpServer, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout) -> None:
+    """Serve one client over newline-delimited JSON-RPC until stdin closes."""
+
+    session_id: Optional[str] = None
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            message = json.loads(line)
+        except ValueError:
+            response: Optional[Dict[str, Any]] = _error(None, PARSE_ERROR, "Parse error")
+        else:
+            try:
+                response, session_id = server.handle(message, session_id)
+            except SessionNotFoundError as exc:
+                response = _error(message.get("id"), INVALID_REQUEST, f"{exc}; send initialize first")
+        if response is not None:
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+    if session_id is not None:
+        try:
+            server.close_session(session_id)
+        except SessionNotFoundError:
+            pass
+
+
+def _origin_allowed(origin: Optional[str], allowed_origins: Sequence[str]) -> bool:
+    # Browsers send Origin; refusing foreign ones blocks DNS-rebinding attacks.
+    if origin is None:
+        return True
+    if origin in allowed_origins:
+        return True
+    return urlparse(origin).hostname in ("localhost", "127.0.0.1", "::1")
+
+
+def create_http_app(
+    server: McpServer,
+    *,
+    path: str = DEFAULT_HTTP_PATH,
+    allowed_origins: Sequence[str] = (),
+):
+    """Build a Starlette app serving the streamable HTTP transport at ``path``.
+
+    ``POST`` carries one JSON-RPC message and is answered with JSON (``202``
+    for notifications). ``DELETE`` ends the session. ``GET`` is refused with
+    ``405`` because the server never initiates messages. ``GET {path}/stats``
+    reports session and context-pool statistics.
+    """
+
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    def _forbidden(request: Request) -> Optional[Response]:
+        if _origin_allowed(request.headers.get("origin"), allowed_origins):
+            return None
+        return JSONResponse(_error(None, INVALID_REQUEST, "Origin not allowed"), status_code=403)
+
+    async def post(request: Request) -> Response:
+        refused = _forbidden(request)
+        if refused is not None:
+            return refused
+        try:
+            message = await request.json()
+        except ValueError:
+            return JSONResponse(_error(None, PARSE_ERROR, "Parse error"), status_code=400)
+        session_id = request.headers.get(SESSION_HEADER)
+        try:
+            response, session_id = await run_in_threadpool(server.handle, message, session_id)
+        except SessionNotFoundError as exc:
+            # 404 tells the client to start over with a new initialize.
+            request_id = message.get("id") if isinstance(message, dict) else None
+            status = 404 if request.headers.get(SESSION_HEADER) else 400
+            return JSONResponse(_error(request_id, INVALID_REQUEST, str(exc)), status_code=status)
+        headers = {SESSION_HEADER: session_id} if session_id else {}
+        if response is None:
+            return Response(status_code=202, headers=headers)
+        return JSONResponse(response, headers=headers)
+
+    async def delete(request: Request) -> Response:
+        refused = _forbidden(request)
+        if refused is not None:
+            return refused
+        session_id = request.headers.get(SESSION_HEADER)
+        if not session_id:
+            return Response(status_code=400)
+        try:
+            await run_in_threadpool(server.close_session, session_id)
+        except SessionNotFoundError:
+            return Response(status_code=404)
+        return Response(status_code=204)
+
+    async def get(request: Request) -> Response:
+        return Response(status_code=405, headers={"Allow": "POST, DELETE"})
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse({**server.stats(), "sessions": server.sessions()})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        server.start()
+        try:
+            yield
+        finally:
+            server.shutdown()
+
+    routes = [
+        Route(path, post, methods=["POST"]),
+        Route(path, delete, methods=["DELETE"]),
+        Route(path, get, methods=["GET"]),
+        Route(f"{path.rstrip('/')}/stats", stats, methods=["GET"]),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the Robot Driver tools over MCP")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=DEFAULT_HTTP_PORT, help="HTTP port")
+    parser.add_argument("--path", default=DEFAULT_HTTP_PATH, help="HTTP endpoint path")
+    parser.add_argument(
+        "--allow-origin",
+        action="append",
+        default=[],
+        help="Extra Origin allowed to call the HTTP endpoint (repeatable)",
+    )
+    parser.add_argument("--browsers", type=int, default=2, help="Browser processes shared by all sessions")
+    parser.add_argument("--spare-contexts", type=int, default=1, help="Pre-opened contexts kept per browser")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+        help="Seconds before an idle HTTP session is closed; stdio sessions are kept",
+    )
+    parser.add_argument("--timeout", type=int, default=10_000, help="Default Playwright timeout in milliseconds")
+    parser.add_argument(
+        "--max-browser-rss-mb",
+        type=float,
+        default=DEFAULT_MAX_BROWSER_RSS_MB,
+        help="Recycle a browser once its process tree's RSS passes this",
+    )
+    parser.add_argument(
+        "--max-browser-contexts",
+        type=int,
+        default=DEFAULT_MAX_BROWSER_TASKS,
+        help="Recycle a browser after it has handed out this many contexts",
+    )
+    parser.add_argument("--show-browser", dest="headless", action="store_false", help="Display the browser windows")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    # stdout carries the protocol on stdio; keep logs on stderr for both transports.
+    configure_logging(args.log_level.upper(), stream=sys.stderr)
+    pool = BrowserContextPool(
+        browsers=args.browsers,
+        spare_contexts=args.spare_contexts,
+        max_contexts=args.max_sessions,
+        headless=args.headless,
+        timeout_ms=args.timeout,
+        memory_monitor=BrowserMemoryMonitor(
+            MemoryLimits(max_browser_rss_mb=args.max_browser_rss_mb, max_browser_tasks=args.max_browser_contexts)
+        ),
+    )
+    # A stdio client initializes once per process; reaping its session would strand it.
+    idle_timeout = args.idle_timeout if args.transport == "http" else None
+    server = McpServer(pool, max_sessions=args.max_sessions, idle_timeout=idle_timeout)
+
+    if args.transport == "http":
+        import uvicorn
+
+        app = create_http_app(server, path=args.path, allowed_origins=args.allow_origin)
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level.lower())
+        return 0
+
+    server.start()
+    try:
+        serve_stdio(server)
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Model tiering for LLM calls.
+
+A :class:`ModelRouter` holds an ordered list of models, smallest and fastest
+first. Callers start every request on the first tier and call
+:meth:`ModelRouter.escalate` when the answer is unusable. For
+``AIPlaywrightBrain`` that means the plan JSON fails validation. For the
+part2 agent it means the agent is stuck. The router then hands out the next,
+larger model. Per-tier call counts, latency, token usage and escalation
+reasons are kept for :meth:`ModelRouter.stats`.
+
+Routers are configured per endpoint with :func:`routers_from_config`, which
+reads the same ``{"default": ..., "<endpoint>": ...}`` shape as the admission
+limits.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+DEFAULT_SMALL_MODEL = "claude-3-5-haiku-20241022"
+
+ESCALATE_INVALID_JSON = "invalid_json"
+ESCALATE_BAD_STRATEGY = "bad_strategy"
+ESCALATE_MISSING_KEYWORD = "missing_keyword"
+ESCALATE_KEYWORD_NOT_IN_CATALOG = "keyword_not_in_catalog"
+ESCALATE_STUCK = "stuck"
+
+_log = get_logger(__name__, "model-router")
+
+
+class _TierStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.seconds: List[float] = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.escalated_from = 0
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.seconds)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else None
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "escalated_from": self.escalated_from,
+            "avg_latency_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else None,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+class ModelRouter:
+    """Ordered model tiers with escalation and per-tier statistics."""
+
+    def __init__(self, models: Sequence[str], *, latency_window: int = 512) -> None:
+        # Drop repeats, keeping order, so ["sonnet", "sonnet"] is one tier.
+        self.models: List[str] = list(dict.fromkeys(model.strip() for model in models if model.strip()))
+        if not self.models:
+            raise ValueError("A model router needs at least one model")
+        self.latency_window = latency_window
+        self._tiers = {model: _TierStats() for model in self.models}
+        self._escalations: Counter = Counter()
+        self._unresolved: Counter = Counter()
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def first(self) -> str:
+        """Model for the first attempt of a new request."""
+
+        with self._lock:
+            self._requests += 1
+        return self.models[0]
+
+    def escalate(self, model: str, reason: str) -> Optional[str]:
+        """Return the next larger model after ``model``, or ``None`` if it is already the largest."""
+
+        index = self.models.index(model) if model in self.models else len(self.models) - 1
+        with self._lock:
+            if index + 1 >= len(self.models):
+                self._unresolved[reason] += 1
+                return None
+            self._escalations[reason] += 1
+            self._tiers[model].escalated_from += 1
+        larger = self.models[index + 1]
+        _log.info("Escalating from %s to %s (%s)", model, larger, reason)
+        return larger
+
+    def record_call(self, model: str, seconds: float, usage: Any = None, *, ok: bool = True) -> None:
+        """Record one call's latency and, when the response has ``usage``, its token counts."""
+
+        with self._lock:
+            tier = self._tiers.get(model)
+            if tier is None:
+                return
+            tier.calls += 1
+            if not ok:
+                tier.failures += 1
+            tier.seconds.append(seconds)
+            del tier.seconds[: -self.latency_window]
+            if usage is not None:
+                tier.input_tokens += int(getattr(usage, "input_tokens", 0) or 0)
+                tier.output_tokens += int(getattr(usage, "output_tokens", 0) or 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            escalations = sum(self._escalations.values())
+            return {
+                "models": list(self.models),
+                "requests": self._requests,
+                "escalations": escalations,
+                "escalation_rate": round(escalations / self._requests, 3) if self._requests else 0.0,
+                "escalation_reasons": dict(self._escalations),
+                "unresolved_at_top_tier": dict(self._unresolved),
+                "tiers": {model: self._tiers[model].summary() for model in self.models},
+            }
+
+
+def routers_from_config(
+    config: Dict[str, Any],
+    endpoints: Sequence[str],
+    default_models: Sequence[str],
+) -> Dict[str, ModelRouter]:
+    """Build one router per endpoint from ``{"default": [...], "<endpoint>": [...]}``.
+
+    Endpoints without an entry use the ``default`` list, or ``default_models``
+    if there is none. Each router keeps its own statistics.
+    """
+
+    default = config.get("default") or list(default_models)
+    return {endpoint: ModelRouter(config.get(endpoint) or default) for endpoint in endpoints}
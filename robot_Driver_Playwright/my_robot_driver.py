@@ -3,18 +3,48 @@
 from __future__ import annotations
 
 import argparse
+import logging
+import re
 import sys
 from contextlib import suppress
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from time import perf_counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+from robot_Driver_Playwright.driver_logging import (
+    CLI_FORMAT,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+from robot_Driver_Playwright.admission import (
+    AdmissionController,
+    AdmissionTimeoutError,
+    default_admission_controller,
+)
+from robot_Driver_Playwright.catalog import CatalogRow, ColumnarCatalog
+from robot_Driver_Playwright.catalog_store import CatalogStore, default_catalog_store
+from robot_Driver_Playwright.catalog_sync import CatalogDelta, IncrementalCatalog, read_catalog_delta
+from robot_Driver_Playwright.checkpoints import (
+    DEFAULT_MAX_RECOVERIES,
+    PHASE_AUTHENTICATED,
+    PHASE_BROWSER_READY,
+    PHASE_CATALOG_EXTRACTED,
+    PHASE_NAVIGATED,
+    RecoverableStepError,
+    StepFailedError,
+    TaskCheckpoint,
+)
+from robot_Driver_Playwright.site_adapters import SiteAdapter, adapter_for_url
+
 
 PRODUCT_CARD_SELECTOR = ".shelf-item"
 PRODUCT_TITLE_SELECTOR = ".shelf-item__title"
 PRODUCT_PRICE_SELECTOR = ".shelf-item__price .val"
+PRODUCT_BUY_BUTTON_SELECTOR = ".shelf-item__buy-btn"
 
 SIGN_IN_BUTTON_SELECTOR = "#signin"
 USERNAME_MENU_TEXT = "Select Username"
@@ -25,7 +55,45 @@ PASSWORD_OPTION_PREFIX = "react-select-3-option"
 STRATEGY_MATCH = "match"
 STRATEGY_MIN_PRICE = "min_price"
 STRATEGY_MAX_PRICE = "max_price"
-ALLOWED_STRATEGIES = [STRATEGY_MATCH, STRATEGY_MIN_PRICE, STRATEGY_MAX_PRICE]
+STRATEGY_PRICE_RANGE = "price_range"
+STRATEGY_TOP_K_CHEAPEST = "top_k_cheapest"
+STRATEGY_NTH_CHEAPEST = "nth_cheapest"
+STRATEGY_CLOSEST_PRICE = "closest_price"
+STRATEGY_MEDIAN_PRICE = "median_price"
+ALLOWED_STRATEGIES = [
+    STRATEGY_MATCH,
+    STRATEGY_MIN_PRICE,
+    STRATEGY_MAX_PRICE,
+    STRATEGY_PRICE_RANGE,
+    STRATEGY_TOP_K_CHEAPEST,
+    STRATEGY_NTH_CHEAPEST,
+    STRATEGY_CLOSEST_PRICE,
+    STRATEGY_MEDIAN_PRICE,
+]
+
+# How long a page gets to run a trivial script before a timed-out step counts as a hang.
+RESPONSIVE_PROBE_MS = 2_000
+
+
+@dataclass
+class SelectionParams:
+    """Extra inputs used by the parameterised price strategies."""
+
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    target_price: Optional[float] = None
+    rank: int = 1
+    count: int = 5
+
+    def validate(self, strategy: str) -> None:
+        if strategy == STRATEGY_PRICE_RANGE and self.price_min is None and self.price_max is None:
+            raise ValueError("Strategy 'price_range' requires price_min and/or price_max.")
+        if strategy == STRATEGY_CLOSEST_PRICE and self.target_price is None:
+            raise ValueError("Strategy 'closest_price' requires target_price.")
+        if self.rank < 1:
+            raise ValueError("rank must be at least 1.")
+        if self.count < 1:
+            raise ValueError("count must be at least 1.")
 
 
 @dataclass
@@ -38,34 +106,72 @@ class RobotDriverResult:
     success: bool
     selection_strategy: str
     error: Optional[str] = None
+    matches: List[Dict[str, Any]] = field(default_factory=list)
+    extraction: Dict[str, Any] = field(default_factory=dict)
+    backend: str = "browser"
+    fallback_reason: Optional[str] = None
+    queue_seconds: float = 0.0
+    run_seconds: Optional[float] = None
+    checkpoints: List[str] = field(default_factory=list)
+    retried_phases: List[str] = field(default_factory=list)
+    recoveries: List[Dict[str, Any]] = field(default_factory=list)
 
 
 class RobotDriver:
     """Encapsulates the BrowserStack demo automation logic."""
 
-    def __init__(self, timeout_ms: int = 10_000) -> None:
+    def __init__(
+        self,
+        timeout_ms: int = 10_000,
+        *,
+        task_id: Optional[str] = None,
+        site_adapter: Optional[SiteAdapter] = None,
+        filter_pushdown: bool = True,
+        network_capture: bool = True,
+        catalog_store: Optional[CatalogStore] = None,
+        admission: Optional[AdmissionController] = None,
+        max_recoveries: int = DEFAULT_MAX_RECOVERIES,
+    ) -> None:
+        if max_recoveries < 0:
+            raise ValueError("max_recoveries cannot be negative")
         self.timeout_ms = timeout_ms
+        self.log = get_logger(__name__, task_id)
+        self.site_adapter = site_adapter
+        self.filter_pushdown = filter_pushdown
+        self.network_capture = network_capture
+        self.catalog_store = catalog_store
+        self.admission = admission
+        self.max_recoveries = max_recoveries
+        self.last_queue_seconds = 0.0
+        self.site_url: Optional[str] = None
+        self._catalog_responses: List[Any] = []
+        self._capture_attached = False
         self._playwright = None
         self._browser = None
+        self._context = None
         self.page = None
+        self._page_crashed = False
+        self._step_timed_out = False
+        self.last_catalog: Optional[ColumnarCatalog] = None
+        self.incremental_catalog = IncrementalCatalog()
+        self.last_matches: List[Dict[str, Any]] = []
+        self.last_extraction: Dict[str, Any] = {}
 
     # ------------------------------------------------------------------
     # Browser lifecycle helpers
     # ------------------------------------------------------------------
     def _start_browser(self, headless: bool) -> bool:
         try:
-            print("Starting browser...")
+            self.log.info("Starting browser...")
             self._playwright = sync_playwright().start()
             self._browser = self._playwright.chromium.launch(headless=headless)
-            self.page = self._browser.new_page()
-            with suppress(Exception):
-                self.page.set_default_timeout(self.timeout_ms)
-            print("Browser started successfully.")
+            self._open_context()
+            self.log.info("Browser started successfully.")
             return True
         except PlaywrightTimeoutError as exc:
-            print(f"Playwright timeout while starting browser: {exc}")
+            self.log.error("Playwright timeout while starting browser: %s", exc)
         except Exception as exc:  # noqa: BLE001 - provide user friendly message
-            print(f"Unexpected error starting browser: {exc}")
+            self.log.error("Unexpected error starting browser: %s", exc)
         return False
 
     def _close_browser(self) -> None:
@@ -75,38 +181,124 @@ class RobotDriver:
         with suppress(Exception):
             if self._playwright:
                 self._playwright.stop()
-        print("Browser closed")
+        self.log.info("Browser closed")
+
+    def _open_context(self, storage_state: Optional[Dict[str, Any]] = None) -> None:
+        self._context = self._browser.new_context(storage_state=storage_state)
+        self.page = self._context.new_page()
+        self._capture_attached = False
+        self._catalog_responses = []
+        self._page_crashed = False
+        self.page.on("crash", self._on_crash)
+        with suppress(Exception):
+            self.page.set_default_timeout(self.timeout_ms)
+
+    def _reset_context(self, headless: bool, storage_state: Optional[Dict[str, Any]]) -> bool:
+        """Replace the current context with a fresh one, relaunching the browser if it died."""
+
+        with suppress(Exception):
+            if self._context:
+                self._context.close()
+        try:
+            if self._browser is None or not self._browser.is_connected():
+                self.log.warning("Browser is gone; relaunching it")
+                self._close_browser()
+                self._playwright = sync_playwright().start()
+                self._browser = self._playwright.chromium.launch(headless=headless)
+            self._open_context(storage_state)
+            self.log.info("Fresh browser context ready%s", " with saved login" if storage_state else "")
+            return True
+        except Exception as exc:  # noqa: BLE001 - reported as a failed start
+            self.log.error("Could not open a fresh browser context: %s", exc)
+            return False
+
+    def _on_crash(self, _page) -> None:
+        self.log.error("Page crashed")
+        self._page_crashed = True
+
+    def _recoverable_reason(self) -> Optional[str]:
+        """Say why the last step failed if a fresh context may fix it, else ``None``."""
+
+        try:
+            if self._page_crashed:
+                return "page crashed"
+            if self._browser is not None and not self._browser.is_connected():
+                return "browser disconnected"
+            if self.page is not None and self.page.is_closed():
+                return "page closed"
+        except Exception as exc:  # noqa: BLE001 - a dead browser can fail the checks too
+            return f"browser unreachable ({exc})"
+        # A timeout on a live page usually means the element never appears (a bad
+        # option index, a site without the button); a fresh context would only repeat it.
+        if self._step_timed_out and not self._page_responsive():
+            return "page unresponsive after a timeout"
+        return None
+
+    def _page_responsive(self) -> bool:
+        """Return ``True`` if the page still runs scripts within :data:`RESPONSIVE_PROBE_MS`."""
+
+        if self.page is None:
+            return False
+        try:
+            self.page.wait_for_function("() => true", polling=100, timeout=RESPONSIVE_PROBE_MS)
+        except Exception:  # noqa: BLE001 - a hung or dead page fails the probe either way
+            return False
+        return True
+
+    def _saved_storage_state(self) -> Optional[Dict[str, Any]]:
+        if self._context is None:
+            return None
+        try:
+            return self._context.storage_state()
+        except Exception as exc:  # noqa: BLE001 - recovery will log in again instead
+            self.log.warning("Could not save the login state: %s", exc)
+            return None
+
+    def _still_logged_in(self) -> bool:
+        try:
+            self.page.get_by_text("demouser").first.wait_for(state="visible", timeout=5_000)
+        except Exception:  # noqa: BLE001
+            return False
+        return True
 
     # ------------------------------------------------------------------
     # Core automation steps
     # ------------------------------------------------------------------
     def _navigate(self, url: str) -> bool:
         try:
-            print(f"Navigating to {url}")
-            self.page.goto(url, wait_until="networkidle")
-            print("Page loaded successfully.")
+            self.log.info("Navigating to %s", url)
+            self.site_url = url
+            if self.site_adapter is None:
+                self.site_adapter = adapter_for_url(url)
+            capturing = self._attach_catalog_capture()
+            # The catalog arrives as JSON, so there is no need to wait for the
+            # grid to render; login and extraction wait on their own elements.
+            self.page.goto(url, wait_until="domcontentloaded" if capturing else "networkidle")
+            self.log.info("Page loaded successfully.")
             return True
         except PlaywrightTimeoutError:
-            print("Timeout: page took too long to load")
+            self.log.error("Timeout: page took too long to load")
+            self._step_timed_out = True
         except Exception as exc:  # noqa: BLE001
-            print(f"Error navigating to site: {exc}")
+            self.log.error("Error navigating to site: %s", exc)
         return False
 
     def _login(self, username_index: int, password_index: int) -> bool:
         try:
-            print("Logging in...")
+            self.log.info("Logging in...")
             self.page.click(SIGN_IN_BUTTON_SELECTOR, timeout=5_000)
             self._select_drop_down_option(USERNAME_MENU_TEXT, USERNAME_OPTION_PREFIX, username_index)
             self._select_drop_down_option(PASSWORD_MENU_TEXT, PASSWORD_OPTION_PREFIX, password_index)
             self.page.get_by_role("button", name="Log In").click(timeout=5_000)
             if self.page.get_by_text("demouser").is_visible(timeout=5_000):
-                print("Login successful.")
+                self.log.info("Login successful.")
                 return True
-            print("Login verification failed")
+            self.log.warning("Login verification failed")
         except PlaywrightTimeoutError:
-            print("Login timeout: element not found or page too slow")
+            self.log.error("Login timeout: element not found or page too slow")
+            self._step_timed_out = True
         except Exception as exc:  # noqa: BLE001
-            print(f"Error during login: {exc}")
+            self.log.error("Error during login: %s", exc)
         return False
 
     def _select_drop_down_option(self, menu_text: str, option_prefix: str, option_index: int) -> None:
@@ -119,27 +311,221 @@ class RobotDriver:
         self,
         product_name: str,
         strategy: str,
+        params: Optional[SelectionParams] = None,
+        entries: Optional[List[dict]] = None,
+        catalog: Optional[ColumnarCatalog] = None,
     ) -> Tuple[bool, Optional[str], Optional[str]]:
+        self.last_matches = []
         try:
-            print(f"Searching for product: {product_name} (strategy: {strategy})")
-            self.page.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=10_000)
-            entries = self._collect_catalog_entries()
+            self.log.info("Searching for product: %s (strategy: %s)", product_name, strategy)
+            if entries is None:
+                entries = self._gather_catalog(product_name)
             if not entries:
-                print("No products found on the page")
+                self.log.warning("No products found on the page")
                 return False, None, "Price not available"
 
-            if strategy == STRATEGY_MAX_PRICE:
-                return self._select_by_price(entries, product_name, max)
-            if strategy == STRATEGY_MIN_PRICE:
-                return self._select_by_price(entries, product_name, min)
-            return self._select_by_name(entries, product_name)
+            if strategy == STRATEGY_MATCH:
+                return self._select_by_name(entries, product_name)
+            self.last_catalog = catalog if catalog is not None else ColumnarCatalog.from_entries(entries)
+            return self._select_by_price(
+                self.last_catalog,
+                product_name,
+                strategy,
+                params or SelectionParams(),
+            )
         except PlaywrightTimeoutError:
-            print("Timeout waiting for products to load")
+            self.log.error("Timeout waiting for products to load")
             return False, None, "Timed out waiting for products"
         except Exception as exc:  # noqa: BLE001
-            print(f"Error searching for product: {exc}")
+            self.log.error("Error searching for product: %s", exc)
             return False, None, "Error occurred"
 
+    def _push_down_filter(self, product_name: str) -> Optional[str]:
+        """Apply the storefront's own filter for ``product_name`` when the adapter knows one."""
+
+        if not self.filter_pushdown or self.site_adapter is None:
+            return None
+        filter_value = self.site_adapter.filter_for_keyword(product_name)
+        if filter_value is None:
+            return None
+        try:
+            applied = self.site_adapter.apply_filter(
+                self.page,
+                filter_value,
+                PRODUCT_CARD_SELECTOR,
+                timeout_ms=5_000,
+            )
+        except Exception as exc:  # noqa: BLE001 - fall back to the unfiltered grid
+            self.log.warning("Could not apply site filter '%s': %s", filter_value, exc)
+            return None
+        if not applied:
+            return None
+        self.log.info("Applied site filter '%s' before extraction", filter_value)
+        return filter_value
+
+    def _refresh_catalog(self) -> List[dict]:
+        """Reload the current page and extract the catalog again."""
+
+        self._catalog_responses = []
+        self.page.reload(wait_until="domcontentloaded" if self._capture_attached else "networkidle")
+        return self._gather_catalog()
+
+    def _sync_catalog(self) -> CatalogDelta:
+        """Fetch only the cards added, removed or changed since the last sync.
+
+        The first sync on a document installs the in-page observer and returns
+        every card; later syncs cost O(changes). The result is applied to
+        ``incremental_catalog``.
+        """
+
+        delta = read_catalog_delta(
+            self.page,
+            card_selector=PRODUCT_CARD_SELECTOR,
+            title_selector=PRODUCT_TITLE_SELECTOR,
+            price_selector=PRODUCT_PRICE_SELECTOR,
+            parse_price=self._parse_price,
+        )
+        self.incremental_catalog.apply(delta)
+        self.last_extraction = {
+            "cards": delta.scanned,
+            "collect_seconds": delta.sync_seconds,
+            "site_filter": None,
+            "source": "incremental",
+            "delta": delta.size,
+        }
+        self.log.info(
+            "Catalog sync%s: +%d ~%d -%d (%d card(s) rescanned, %d tracked) in %.3fs",
+            " (full)" if delta.full else "",
+            len(delta.added),
+            len(delta.changed),
+            len(delta.removed),
+            delta.scanned,
+            delta.tracked,
+            delta.sync_seconds,
+        )
+        return delta
+
+    def _is_parked(self, url: str) -> bool:
+        """Return ``True`` while the page is still logged in and showing catalog cards."""
+
+        try:
+            if self.page is None or self.page.is_closed():
+                return False
+            if not self.page.url.startswith(url.rstrip("/")):
+                return False
+            if self.page.locator(PRODUCT_CARD_SELECTOR).count() == 0:
+                return False
+            return self.page.get_by_text("demouser").is_visible()
+        except Exception as exc:  # noqa: BLE001
+            self.log.warning("Parked page check failed: %s", exc)
+            return False
+
+    def _add_to_cart(self, product_title: str) -> bool:
+        """Click "Add to cart" on the card whose title is exactly ``product_title``."""
+
+        try:
+            title_pattern = re.compile(rf"^\s*{re.escape(product_title)}\s*$", re.IGNORECASE)
+            card = self.page.locator(PRODUCT_CARD_SELECTOR).filter(
+                has=self.page.locator(PRODUCT_TITLE_SELECTOR, has_text=title_pattern)
+            ).first
+            card.locator(PRODUCT_BUY_BUTTON_SELECTOR).click(timeout=5_000)
+            self.log.info("Added to cart: %s", product_title)
+            return True
+        except PlaywrightTimeoutError:
+            self.log.error("Timeout adding '%s' to cart", product_title)
+        except Exception as exc:  # noqa: BLE001
+            self.log.error("Error adding '%s' to cart: %s", product_title, exc)
+        return False
+
+    def _attach_catalog_capture(self) -> bool:
+        """Start recording catalog JSON responses if the site adapter names one."""
+
+        self._catalog_responses = []
+        if not self.network_capture or not self.site_adapter.catalog_response_path:
+            return False
+        if not self._capture_attached:
+            self.page.on("response", self._on_response)
+            self._capture_attached = True
+        return True
+
+    def _on_response(self, response) -> None:
+        if response.ok and self.site_adapter.is_catalog_response(response.url):
+            self._catalog_responses.append(response)
+
+    def _captured_catalog_entries(self) -> Optional[List[dict]]:
+        # Newest first: bodies of responses from before the login redirect may
+        # already have been evicted by the browser.
+        for response in reversed(self._catalog_responses):
+            try:
+                entries = self.site_adapter.parse_catalog_payload(response.json())
+            except Exception as exc:  # noqa: BLE001 - try older responses, then the DOM
+                self.log.debug("Ignoring unreadable catalog response %s: %s", response.url, exc)
+                continue
+            if entries:
+                return entries
+        return None
+
+    def _gather_catalog(self, product_name: Optional[str] = None) -> List[dict]:
+        """Read the catalog from the captured JSON response, falling back to the DOM."""
+
+        site_filter = None
+        page_filtered = False
+        started = perf_counter()
+        entries = self._captured_catalog_entries()
+        source = "network"
+        if entries is None:
+            source = "dom"
+            self.page.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=10_000)
+            if product_name is not None:
+                site_filter = self._push_down_filter(product_name)
+            page_filtered = site_filter is not None or self._page_filtered()
+            started = perf_counter()
+            entries = self._collect_catalog_entries()
+        self.last_extraction = {
+            "cards": len(entries),
+            "collect_seconds": round(perf_counter() - started, 4),
+            "site_filter": site_filter,
+            "page_filtered": page_filtered,
+            "source": source,
+        }
+        self.log.info(
+            "Extracted %d card(s) from %s in %.3fs (site filter: %s)",
+            len(entries),
+            source,
+            self.last_extraction["collect_seconds"],
+            site_filter or "none",
+        )
+        self._record_snapshot(entries)
+        return entries
+
+    def _record_snapshot(self, entries: List[dict]) -> None:
+        """Hand the extracted catalog to the history store, if one is configured."""
+
+        store = self.catalog_store or default_catalog_store()
+        if store is None or self.site_url is None or not entries:
+            return
+        store.record(
+            self.site_url,
+            entries,
+            source=self.last_extraction.get("source"),
+            complete=not self.last_extraction.get("page_filtered")
+            and self.last_extraction.get("site_filter") is None,
+        )
+
+    def _page_filtered(self) -> bool:
+        """Return ``True`` if a site filter, ticked by anyone, narrows the grid on the page."""
+
+        if self.site_adapter is None:
+            return False
+        try:
+            active = self.site_adapter.active_filters(self.page)
+        except Exception as exc:  # noqa: BLE001 - unknown means the grid may be partial
+            self.log.warning("Could not read the page's site filters: %s", exc)
+            return True
+        if active:
+            self.log.info("Page is already filtered by %s; snapshot is partial", ", ".join(active))
+        return bool(active)
+
     def _collect_catalog_entries(self) -> List[dict]:
         entries: List[dict] = []
         cards = self.page.locator(PRODUCT_CARD_SELECTOR)
@@ -164,24 +550,46 @@ class RobotDriver:
 
     def _select_by_price(
         self,
-        entries: List[dict],
+        catalog: ColumnarCatalog,
         product_name: str,
-        reducer,
+        strategy: str,
+        params: SelectionParams,
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         keyword = product_name.strip().lower()
-        filtered = [entry for entry in entries if keyword and keyword in entry["title"].lower()]
-        target_pool = filtered or entries
-        target_pool = [entry for entry in target_pool if entry["price_value"] is not None]
+        rows: List[CatalogRow] = []
+        if strategy == STRATEGY_MIN_PRICE:
+            rows = [row for row in [catalog.cheapest(keyword)] if row]
+        elif strategy == STRATEGY_MAX_PRICE:
+            rows = [row for row in [catalog.most_expensive(keyword)] if row]
+        elif strategy == STRATEGY_NTH_CHEAPEST:
+            rows = [row for row in [catalog.nth_cheapest(keyword, params.rank)] if row]
+        elif strategy == STRATEGY_CLOSEST_PRICE:
+            rows = [row for row in [catalog.closest_to_price(keyword, params.target_price)] if row]
+        elif strategy == STRATEGY_MEDIAN_PRICE:
+            rows = [row for row in [catalog.median(keyword)] if row]
+        elif strategy == STRATEGY_TOP_K_CHEAPEST:
+            rows = catalog.top_k_cheapest(keyword, params.count)
+        elif strategy == STRATEGY_PRICE_RANGE:
+            rows = catalog.price_range(
+                keyword,
+                price_min=params.price_min,
+                price_max=params.price_max,
+                count=params.count,
+            )
 
-        if not target_pool:
-            print("Unable to determine product prices from catalog")
+        if not rows:
+            self.log.warning("Unable to determine product prices from catalog")
             return False, None, "Price not available"
 
-        selected = reducer(target_pool, key=lambda entry: entry["price_value"])
-        print(
-            f"Selected product by price: {selected['title']} at {selected['price_text']}"
+        self.last_matches = [row.to_dict() for row in rows]
+        selected = rows[0]
+        self.log.info(
+            "Selected product by price: %s at %s (%d match(es))",
+            selected.title,
+            selected.price_text,
+            len(rows),
         )
-        return True, selected["title"], selected["price_text"]
+        return True, selected.title, selected.price_text
 
     def _select_by_name(
         self,
@@ -190,12 +598,14 @@ class RobotDriver:
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         normalized_target = product_name.strip().lower()
         best_partial: Optional[Tuple[str, str]] = None
+        debug_enabled = self.log.isEnabledFor(logging.DEBUG)
 
         for index, entry in enumerate(entries):
             title = entry["title"]
             price_text = entry["price_text"]
             normalized_title = title.lower().strip()
-            print(f"Checking product {index + 1}: '{title}'")
+            if debug_enabled:
+                self.log.debug("Checking product %d: '%s'", index + 1, title)
 
             if normalized_title == normalized_target:
                 return True, title, price_text
@@ -205,17 +615,17 @@ class RobotDriver:
 
         if best_partial:
             match_title, match_price = best_partial
-            print(f"Using closest match: {match_title}")
+            self.log.info("Using closest match: %s", match_title)
             return True, match_title, match_price
 
-        print(f"Product '{product_name}' not found")
+        self.log.warning("Product '%s' not found", product_name)
         return False, None, "Product not found"
 
     def _extract_price(self, card) -> str:
         try:
             price_text = card.locator(PRODUCT_PRICE_SELECTOR).inner_text().strip()
             if price_text:
-                print(f"Product price: {price_text}")
+                self.log.debug("Product price: %s", price_text)
                 return price_text
         except Exception:
             pass
@@ -242,10 +652,30 @@ class RobotDriver:
         username_index: int = 0,
         password_index: int = 0,
     ) -> List[Dict[str, Any]]:
-        """Gather the current product catalog without making a selection."""
+        """Gather the current product catalog without making a selection.
+
+        Raises :class:`AdmissionTimeoutError` if the host does not admit the run in time.
+        """
 
-        print("Collecting catalog snapshot for AI planning")
+        self.log.info("Collecting catalog snapshot for AI planning")
+
+        with self._admission_controller().admit(url) as ticket:
+            self.last_queue_seconds = ticket.queue_seconds
+            return self._collect_catalog_snapshot(
+                url,
+                headless=headless,
+                username_index=username_index,
+                password_index=password_index,
+            )
 
+    def _collect_catalog_snapshot(
+        self,
+        url: str,
+        *,
+        headless: bool,
+        username_index: int,
+        password_index: int,
+    ) -> List[Dict[str, Any]]:
         if not self._start_browser(headless=headless):
             raise RuntimeError("Failed to start Playwright while gathering catalog snapshot")
 
@@ -256,9 +686,7 @@ class RobotDriver:
             if not self._login(username_index=username_index, password_index=password_index):
                 raise RuntimeError("Login failed during catalog snapshot")
 
-            self.page.wait_for_selector(PRODUCT_CARD_SELECTOR, timeout=10_000)
-            entries = self._collect_catalog_entries()
-            return entries
+            return self._gather_catalog()
         finally:
             self._close_browser()
 
@@ -271,71 +699,239 @@ class RobotDriver:
         username_index: int = 0,
         password_index: int = 0,
         selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
     ) -> RobotDriverResult:
-        print("Starting Robot Driver Task")
-        print(f"Target: {product_name}")
+        self.log.info("Starting Robot Driver Task")
+        self.log.info("Target: %s", product_name)
 
-        if selection_strategy not in ALLOWED_STRATEGIES:
-            raise ValueError(
-                f"Unsupported selection strategy '{selection_strategy}'. "
-                f"Choose from {ALLOWED_STRATEGIES}."
-            )
+        selection_params = self._validated_params(selection_strategy, selection_params)
 
-        if not self._start_browser(headless=headless):
+        try:
+            with self._admission_controller().admit(url) as ticket:
+                self.last_queue_seconds = ticket.queue_seconds
+                result = self._run_task_steps(
+                    url,
+                    product_name,
+                    headless=headless,
+                    username_index=username_index,
+                    password_index=password_index,
+                    selection_strategy=selection_strategy,
+                    selection_params=selection_params,
+                )
+        except AdmissionTimeoutError as exc:
             return RobotDriverResult(
                 requested_product=product_name,
                 matched_product=None,
                 price=None,
                 success=False,
                 selection_strategy=selection_strategy,
-                error="Failed to start browser",
+                error=str(exc),
+                queue_seconds=round(exc.queue_seconds, 3),
             )
+        result.queue_seconds = round(ticket.queue_seconds, 3)
+        result.run_seconds = round(ticket.run_seconds, 3)
+        return result
+
+    def _run_task_steps(
+        self,
+        url: str,
+        product_name: str,
+        *,
+        headless: bool,
+        username_index: int,
+        password_index: int,
+        selection_strategy: str,
+        selection_params: SelectionParams,
+    ) -> RobotDriverResult:
+        checkpoint = TaskCheckpoint()
+        checkpoint.begin(PHASE_BROWSER_READY)
+        if not self._start_browser(headless=headless):
+            return self._failed_result(product_name, selection_strategy, "Failed to start browser")
 
         try:
-            if not self._navigate(url):
-                return RobotDriverResult(
-                    requested_product=product_name,
-                    matched_product=None,
-                    price=None,
-                    success=False,
-                    selection_strategy=selection_strategy,
-                    error="Failed to navigate to site",
-                )
+            checkpoint.reach(PHASE_BROWSER_READY)
+            while True:
+                try:
+                    result = self._resume_task_steps(
+                        checkpoint,
+                        url,
+                        product_name,
+                        username_index=username_index,
+                        password_index=password_index,
+                        selection_strategy=selection_strategy,
+                        selection_params=selection_params,
+                    )
+                    break
+                except RecoverableStepError as exc:
+                    if len(checkpoint.recoveries) >= self.max_recoveries:
+                        self.log.error(
+                            "%s failed (%s) and the recovery budget of %d is spent",
+                            exc.phase,
+                            exc.reason,
+                            self.max_recoveries,
+                        )
+                        result = self._failed_result(product_name, selection_strategy, exc.error)
+                        break
+                    resumed_from = checkpoint.rewind(exc.phase, exc.reason)
+                    self.log.warning(
+                        "%s failed (%s); resuming from %s on a fresh context (recovery %d/%d)",
+                        exc.phase,
+                        exc.reason,
+                        resumed_from,
+                        len(checkpoint.recoveries),
+                        self.max_recoveries,
+                    )
+                    checkpoint.begin(PHASE_BROWSER_READY)
+                    if not self._reset_context(headless, checkpoint.storage_state):
+                        result = self._failed_result(product_name, selection_strategy, "Failed to start browser")
+                        break
+                    checkpoint.reach(PHASE_BROWSER_READY)
+                except StepFailedError as exc:
+                    result = self._failed_result(product_name, selection_strategy, exc.error)
+                    break
+        finally:
+            self._close_browser()
+        result.checkpoints = list(checkpoint.reached)
+        result.retried_phases = list(checkpoint.retried_phases)
+        result.recoveries = list(checkpoint.recoveries)
+        return result
 
-            if not self._login(username_index=username_index, password_index=password_index):
-                return RobotDriverResult(
-                    requested_product=product_name,
-                    matched_product=None,
-                    price=None,
-                    success=False,
-                    selection_strategy=selection_strategy,
-                    error="Failed to login",
+    def _resume_task_steps(
+        self,
+        checkpoint: TaskCheckpoint,
+        url: str,
+        product_name: str,
+        *,
+        username_index: int,
+        password_index: int,
+        selection_strategy: str,
+        selection_params: SelectionParams,
+    ) -> RobotDriverResult:
+        """Run every phase ``checkpoint`` does not already hold, then select the product."""
+
+        if not checkpoint.has(PHASE_CATALOG_EXTRACTED):
+            if not checkpoint.has(PHASE_NAVIGATED):
+                self._run_step(checkpoint, PHASE_NAVIGATED, "Failed to navigate to site", lambda: self._navigate(url))
+                checkpoint.reach(PHASE_NAVIGATED)
+
+            if checkpoint.has(PHASE_AUTHENTICATED) and self._still_logged_in():
+                self.log.info("Still logged in from the saved session; skipping login")
+            else:
+                self._run_step(
+                    checkpoint,
+                    PHASE_AUTHENTICATED,
+                    "Failed to login",
+                    lambda: self._login(username_index=username_index, password_index=password_index),
                 )
+                checkpoint.reach(PHASE_AUTHENTICATED, storage_state=self._saved_storage_state())
 
-            found, matched_name, price = self._locate_product(
-                product_name,
-                strategy=selection_strategy,
+            entries = self._run_step(
+                checkpoint,
+                PHASE_CATALOG_EXTRACTED,
+                "Failed to extract product price",
+                lambda: self._gather_catalog(product_name),
             )
-            if not found or not price or price == "Price not available":
-                return RobotDriverResult(
-                    requested_product=product_name,
-                    matched_product=matched_name,
-                    price=price if price != "Price not available" else None,
-                    success=False,
-                    selection_strategy=selection_strategy,
-                    error="Failed to extract product price",
-                )
+            checkpoint.reach(PHASE_CATALOG_EXTRACTED, catalog=entries, extraction=self.last_extraction)
+
+        self.last_extraction = dict(checkpoint.extraction)
+        return self.locate_on_current_page(
+            product_name,
+            selection_strategy=selection_strategy,
+            selection_params=selection_params,
+            entries=checkpoint.catalog,
+        )
+
+    def _run_step(self, checkpoint: TaskCheckpoint, phase: str, error: str, step: Callable[[], Any]) -> Any:
+        """Run one phase; raise :class:`RecoverableStepError` or :class:`StepFailedError` if it fails."""
 
-            print(f"SUCCESS! Found {matched_name} - Price: {price}")
+        checkpoint.begin(phase)
+        self._step_timed_out = False
+        try:
+            outcome = step()
+        except PlaywrightTimeoutError as exc:
+            self.log.error("Timeout during %s: %s", phase, exc)
+            self._step_timed_out = True
+            outcome = None
+        except Exception as exc:  # noqa: BLE001 - classified below
+            self.log.error("Error during %s: %s", phase, exc)
+            outcome = None
+        if outcome:
+            self.log.info("Checkpoint reached: %s", phase)
+            return outcome
+        reason = self._recoverable_reason()
+        if reason is not None:
+            raise RecoverableStepError(phase, error, reason)
+        raise StepFailedError(phase, error)
+
+    def _failed_result(self, product_name: str, selection_strategy: str, error: str) -> RobotDriverResult:
+        return RobotDriverResult(
+            requested_product=product_name,
+            matched_product=None,
+            price=None,
+            success=False,
+            selection_strategy=selection_strategy,
+            error=error,
+            extraction=self.last_extraction,
+        )
+
+    def _admission_controller(self) -> AdmissionController:
+        return self.admission or default_admission_controller()
+
+    @staticmethod
+    def _validated_params(
+        selection_strategy: str,
+        selection_params: Optional[SelectionParams],
+    ) -> SelectionParams:
+        if selection_strategy not in ALLOWED_STRATEGIES:
+            raise ValueError(
+                f"Unsupported selection strategy '{selection_strategy}'. "
+                f"Choose from {ALLOWED_STRATEGIES}."
+            )
+        selection_params = selection_params or SelectionParams()
+        selection_params.validate(selection_strategy)
+        return selection_params
+
+    def locate_on_current_page(
+        self,
+        product_name: str,
+        *,
+        selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
+        entries: Optional[List[dict]] = None,
+    ) -> RobotDriverResult:
+        """Extract the catalog from the already logged-in page and select a product.
+
+        Pass ``entries`` to select from a catalog that was already extracted.
+        """
+
+        selection_params = self._validated_params(selection_strategy, selection_params)
+        found, matched_name, price = self._locate_product(
+            product_name,
+            strategy=selection_strategy,
+            params=selection_params,
+            entries=entries,
+        )
+        if not found or not price or price == "Price not available":
             return RobotDriverResult(
                 requested_product=product_name,
                 matched_product=matched_name,
-                price=price,
-                success=True,
+                price=price if price != "Price not available" else None,
+                success=False,
                 selection_strategy=selection_strategy,
+                error="Failed to extract product price",
+                extraction=self.last_extraction,
             )
-        finally:
-            self._close_browser()
+
+        self.log.info("SUCCESS! Found %s - Price: %s", matched_name, price)
+        return RobotDriverResult(
+            requested_product=product_name,
+            matched_product=matched_name,
+            price=price,
+            success=True,
+            selection_strategy=selection_strategy,
+            matches=self.last_matches,
+            extraction=self.last_extraction,
+        )
 
 
 def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
@@ -351,25 +947,92 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         default=STRATEGY_MATCH,
         help="Product selection strategy",
     )
+    parser.add_argument("--price-min", type=float, default=None, help="Lower bound for price_range")
+    parser.add_argument("--price-max", type=float, default=None, help="Upper bound for price_range")
+    parser.add_argument("--target-price", type=float, default=None, help="Target for closest_price")
+    parser.add_argument("--rank", type=int, default=1, help="1-based rank for nth_cheapest")
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=5,
+        help="Maximum number of matches for top_k_cheapest and price_range",
+    )
     parser.add_argument("--timeout", type=int, default=10_000, help="Default timeout in milliseconds")
+    parser.add_argument(
+        "--max-recoveries",
+        type=int,
+        default=DEFAULT_MAX_RECOVERIES,
+        help="How many times a crashed or timed-out run may resume from its last checkpoint",
+    )
+    parser.add_argument(
+        "--no-filter-pushdown",
+        dest="filter_pushdown",
+        action="store_false",
+        help="Always scrape the full grid instead of applying the site's vendor filter first",
+    )
+    parser.add_argument(
+        "--no-network-capture",
+        dest="network_capture",
+        action="store_false",
+        help="Scrape rendered product cards instead of reading the catalog JSON response",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log every catalog card inspected during extraction and selection",
+    )
+    parser.add_argument("--log-file", default=None, help="Also write timestamped logs to this file")
     return parser.parse_args(argv)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
     args = parse_args(argv)
-    driver = RobotDriver(timeout_ms=args.timeout)
+    configure_logging(
+        logging.DEBUG if args.verbose else logging.INFO,
+        fmt=CLI_FORMAT,
+        log_file=args.log_file,
+    )
+    try:
+        return _run_cli(args)
+    finally:
+        shutdown_logging()
+
+
+def _run_cli(args: argparse.Namespace) -> int:
+    driver = RobotDriver(
+        timeout_ms=args.timeout,
+        filter_pushdown=args.filter_pushdown,
+        network_capture=args.network_capture,
+        max_recoveries=args.max_recoveries,
+    )
     result = driver.run_complete_task(
         url=args.url,
         product_name=args.product,
         headless=args.headless,
         selection_strategy=args.strategy,
+        selection_params=SelectionParams(
+            price_min=args.price_min,
+            price_max=args.price_max,
+            target_price=args.target_price,
+            rank=args.rank,
+            count=args.count,
+        ),
     )
 
     print("\nFINAL RESULTS")
     print("-" * 50)
+    for recovery in result.recoveries:
+        print(
+            f"Recovered: {recovery['failed_phase']} failed ({recovery['reason']}), "
+            f"resumed from {recovery['resumed_from']}"
+        )
     if result.success:
         print(f"SUCCESS! Product '{result.matched_product or result.requested_product}' found.")
         print(f"Price: {result.price}")
+        if len(result.matches) > 1:
+            print("Matches:")
+            for match in result.matches:
+                print(f"  - {match['title']}: {match['price_text']}")
         print("\nTask completed successfully.")
         return 0
 
@@ -0,0 +1,386 @@
+"""Warm pool of logged-in pages parked on the catalog.
+
+Each pooled page is a :class:`~robot_Driver_Playwright.browser_sessions.BrowserSession`
+that has already started a browser, navigated, logged in and loaded the
+``.shelf-item`` cards. A request checks a page out, extracts the catalog and
+selects a product, then hands the page back, so browser start-up, navigation
+and login are paid once per page rather than once per request.
+
+A maintenance thread keeps the pool healthy: parked pages older than the
+freshness interval are reloaded, and pages that have drifted (navigated away,
+logged out, lost their cards, crashed) are closed and replaced. It also
+samples each page's browser RSS and JS heap through a
+:class:`~robot_Driver_Playwright.browser_memory.BrowserMemoryMonitor`, and
+recycles pages that grow past their limits or have served too many requests.
+
+:meth:`WarmPagePool.resize` changes the pool size while it serves. Growing
+opens pages in the background. Shrinking closes idle pages first, and pages
+that are checked out are closed when they come back.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Dict, Iterator, Optional
+
+from robot_Driver_Playwright.admission import AdmissionTimeoutError
+from robot_Driver_Playwright.browser_memory import KIND_BROWSER, RECYCLE_TASKS, BrowserMemoryMonitor
+from robot_Driver_Playwright.browser_sessions import (
+    COMMAND_REFRESH_CATALOG,
+    BrowserSession,
+    SessionError,
+)
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.my_robot_driver import (
+    STRATEGY_MATCH,
+    RobotDriver,
+    RobotDriverResult,
+    SelectionParams,
+)
+
+BACKEND_WARM_POOL = "warm_pool"
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_FRESHNESS_SECONDS = 120.0
+DEFAULT_CHECKOUT_TIMEOUT_SECONDS = 2.0
+
+
+class PoolExhaustedError(SessionError):
+    """Raised when no parked page became available within the checkout timeout."""
+
+
+class WarmPagePool:
+    """Fixed-size pool of pages parked, logged in, on one storefront's catalog."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        size: int = DEFAULT_POOL_SIZE,
+        headless: bool = True,
+        timeout_ms: int = 10_000,
+        freshness_seconds: float = DEFAULT_FRESHNESS_SECONDS,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT_SECONDS,
+        maintenance_interval: float = 5.0,
+        username_index: int = 0,
+        password_index: int = 0,
+        memory_monitor: Optional[BrowserMemoryMonitor] = None,
+    ) -> None:
+        self.url = url
+        self.size = size
+        self.headless = headless
+        self.timeout_ms = timeout_ms
+        self.freshness_seconds = freshness_seconds
+        self.checkout_timeout = checkout_timeout
+        self.maintenance_interval = maintenance_interval
+        self.username_index = username_index
+        self.password_index = password_index
+        self.memory = memory_monitor or BrowserMemoryMonitor()
+        self._idle: "queue.Queue[BrowserSession]" = queue.Queue()
+        self._sessions: Dict[str, BrowserSession] = {}
+        self._pending = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._opener = ThreadPoolExecutor(max_workers=max(1, size), thread_name_prefix="pool-open")
+        self._maintainer: Optional[threading.Thread] = None
+        self._log = get_logger(__name__, "page-pool")
+        self._counts = {
+            "checkouts": 0,
+            "exhausted": 0,
+            "wait_seconds": 0.0,
+            "refreshes": 0,
+            "inline_refreshes": 0,
+            "drifted": 0,
+            "replacements": 0,
+            "recycled": 0,
+            "drained": 0,
+            "open_failures": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Begin opening pages in the background and start the maintenance thread."""
+
+        if self._maintainer is not None:
+            return
+        self._top_up()
+        self._maintainer = threading.Thread(target=self._maintain_loop, name="page-pool", daemon=True)
+        self._maintainer.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._opener.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def serves(self, url: str) -> bool:
+        """Return ``True`` if requests for ``url`` can use this pool's pages."""
+
+        return url.rstrip("/") == self.url.rstrip("/")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[BrowserSession]:
+        """Borrow a parked page; it is returned (or replaced, on a browser error) on exit.
+
+        A ``ValueError`` is bad input and an :class:`AdmissionTimeoutError` a busy
+        host, not a bad page, so in both cases the page goes back to the pool.
+        """
+
+        session = self._acquire(self.checkout_timeout if timeout is None else timeout)
+        healthy = False
+        try:
+            yield session
+            healthy = True
+        except (ValueError, AdmissionTimeoutError):
+            healthy = True
+            raise
+        finally:
+            self._release(session, healthy)
+
+    def run_task(
+        self,
+        product_name: str,
+        *,
+        selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[RobotDriverResult]:
+        """Select a product on a warm page, or return ``None`` if none is free."""
+
+        # Reject bad parameters before they cost a checkout.
+        selection_params = RobotDriver._validated_params(selection_strategy, selection_params)
+        try:
+            with self.checkout(timeout) as session:
+                result = session.locate(
+                    product_name,
+                    selection_strategy=selection_strategy,
+                    selection_params=selection_params,
+                )
+        except PoolExhaustedError:
+            return None
+        except AdmissionTimeoutError as exc:
+            return RobotDriverResult(
+                requested_product=product_name,
+                matched_product=None,
+                price=None,
+                success=False,
+                selection_strategy=selection_strategy,
+                error=str(exc),
+                backend=BACKEND_WARM_POOL,
+                queue_seconds=round(exc.queue_seconds, 3),
+            )
+        result.backend = BACKEND_WARM_POOL
+        return result
+
+    def resize(self, size: int) -> None:
+        """Grow or shrink the pool; checked-out pages are never closed under a request."""
+
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        with self._lock:
+            previous, self.size = self.size, size
+        if size != previous:
+            self._log.info("Resizing warm pool from %d to %d page(s)", previous, size)
+        self._drain_excess()
+        self._top_up()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            checkouts = self._counts["checkouts"]
+            return {
+                **self._counts,
+                "wait_seconds": round(self._counts["wait_seconds"], 3),
+                "avg_wait_ms": round(self._counts["wait_seconds"] / checkouts * 1000, 2) if checkouts else 0.0,
+                "size": self.size,
+                "open": len(self._sessions),
+                "idle": self._idle.qsize(),
+                "opening": self._pending,
+                "url": self.url,
+                "freshness_seconds": self.freshness_seconds,
+            }
+
+    def maintain(self) -> None:
+        """Refresh stale parked pages, replace drifted or oversized ones and refill the pool."""
+
+        self._drain_excess()
+        self._top_up()
+        for _ in range(self._idle.qsize()):
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if self._is_stale(session):
+                    session.execute(COMMAND_REFRESH_CATALOG)
+                    self._count("refreshes")
+                if not session.is_parked():
+                    self._count("drifted")
+                    self._log.warning("Pooled page %s drifted; replacing it", session.session_id)
+                    self._replace(session)
+                    continue
+                reason = self._memory_check(session)
+                if reason is not None:
+                    self._recycle(session, reason)
+                    continue
+            except AdmissionTimeoutError:
+                pass  # the host is busy; refresh on a later pass
+            except Exception as exc:  # noqa: BLE001 - any failure means the page is unusable
+                self._log.warning("Pooled page %s failed maintenance: %s", session.session_id, exc)
+                self._replace(session)
+                continue
+            self._idle.put(session)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _acquire(self, timeout: float) -> BrowserSession:
+        started = monotonic()
+        deadline = started + timeout
+        while True:
+            remaining = deadline - monotonic()
+            try:
+                session = self._idle.get(timeout=max(0.0, remaining))
+            except queue.Empty:
+                self._count("exhausted")
+                raise PoolExhaustedError(f"No warm page available within {timeout:.1f}s") from None
+            if session.closed:
+                continue
+            if self._is_stale(session):
+                try:
+                    session.execute(COMMAND_REFRESH_CATALOG)
+                    self._count("inline_refreshes")
+                except AdmissionTimeoutError:
+                    self._idle.put(session)
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    self._log.warning("Pooled page %s failed to refresh: %s", session.session_id, exc)
+                    self._replace(session)
+                    continue
+            with self._lock:
+                self._counts["checkouts"] += 1
+                self._counts["wait_seconds"] += monotonic() - started
+            return session
+
+    def _release(self, session: BrowserSession, healthy: bool) -> None:
+        max_tasks = self.memory.limits.max_context_tasks
+        if healthy and max_tasks is not None and session.commands_run >= max_tasks:
+            self._recycle(session, RECYCLE_TASKS)
+        elif self._over_size():
+            self._retire(session)
+        elif healthy and not session.closed and not self._stop.is_set():
+            self._idle.put(session)
+        else:
+            self._replace(session)
+
+    def _memory_check(self, session: BrowserSession) -> Optional[str]:
+        """Sample ``session`` if it is due; return why it should be recycled, or ``None``."""
+
+        if not self.memory.due(f"session-{session.session_id}"):
+            return None
+        reason = None
+        for sample in session.sample_memory():
+            reason = self.memory.record(sample) or reason
+        return reason
+
+    def _recycle(self, session: BrowserSession, reason: str) -> None:
+        self.memory.recycled(f"session-{session.session_id}", KIND_BROWSER, reason)
+        self._count("recycled")
+        self._replace(session)
+
+    def _over_size(self) -> bool:
+        with self._lock:
+            return len(self._sessions) > self.size
+
+    def _drain_excess(self) -> None:
+        """Close idle pages while the pool holds more than ``size``."""
+
+        while self._over_size():
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._retire(session)
+
+    def _retire(self, session: BrowserSession) -> None:
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+            self._counts["drained"] += 1
+        session.close()
+        self.memory.forget(f"session-{session.session_id}")
+        self.memory.forget(f"session-{session.session_id}/context")
+        self._log.info("Drained pooled page %s (pool size %d)", session.session_id, self.size)
+
+    def _replace(self, session: BrowserSession) -> None:
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+            self._counts["replacements"] += 1
+        session.close()
+        label = f"session-{session.session_id}"
+        self.memory.forget(label)
+        self.memory.forget(f"{label}/context")
+        self._top_up()
+
+    def _top_up(self) -> None:
+        if self._stop.is_set():
+            return
+        with self._lock:
+            missing = self.size - len(self._sessions) - self._pending
+            self._pending += max(0, missing)
+        for _ in range(missing):
+            self._opener.submit(self._open_one)
+
+    def _open_one(self) -> None:
+        session = BrowserSession(f"pool-{next(self._ids)}", timeout_ms=self.timeout_ms)
+        try:
+            session.open(
+                self.url,
+                headless=self.headless,
+                username_index=self.username_index,
+                password_index=self.password_index,
+            )
+        except Exception as exc:  # noqa: BLE001 - retried on the next maintenance pass
+            with self._lock:
+                self._pending -= 1
+                self._counts["open_failures"] += 1
+            self._log.warning("Failed to open pooled page: %s", exc)
+            return
+        with self._lock:
+            self._pending -= 1
+            if self._stop.is_set():
+                stopped = True
+            else:
+                stopped = False
+                self._sessions[session.session_id] = session
+        if stopped:
+            session.close()
+            return
+        self._log.info("Parked page %s on %s", session.session_id, self.url)
+        self._idle.put(session)
+
+    def _is_stale(self, session: BrowserSession) -> bool:
+        return monotonic() - session.refreshed_at > self.freshness_seconds
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _maintain_loop(self) -> None:
+        while not self._stop.wait(self.maintenance_interval):
+            try:
+                self.maintain()
+            except Exception as exc:  # noqa: BLE001 - keep the maintenance thread alive
+                self._log.warning("Page pool maintenance failed: %s", exc)
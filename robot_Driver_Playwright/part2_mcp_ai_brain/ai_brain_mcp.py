@@ -11,29 +11,56 @@ Example: "Buy the cheapest blue shirt on this site"
 
 import os
 import json
+import queue
+import threading
+from concurrent.futures import Future
+from time import perf_counter
 from anthropic import Anthropic
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 
+from robot_Driver_Playwright.driver_logging import CLI_FORMAT, configure_logging
+from robot_Driver_Playwright.llm_client import ResilientAnthropicClient
+from robot_Driver_Playwright.model_router import DEFAULT_SMALL_MODEL, ESCALATE_STUCK, ModelRouter
+from robot_Driver_Playwright.part2_mcp_ai_brain.playwright_tools import TOOL_DEFINITIONS, PlaywrightTools, tool_failed
+from robot_Driver_Playwright.screenshots import ScreenshotCapturer
+from robot_Driver_Playwright.trace_cache import TraceCache, TraceStep
+
 # Load environment variables
 load_dotenv()
 
+# Tools that only read the page; a replayed trace does not need them
+OBSERVATION_TOOLS = {"playwright_get_page_info", "playwright_get_text", "playwright_screenshot"}
+
+# Small model first; escalate to the larger one when the agent gets stuck
+DEFAULT_AGENT_MODELS = f"{DEFAULT_SMALL_MODEL},claude-sonnet-4-20250514"
+
 
 class AIRobotDriver:
     """
     AI-Powered Robot Driver that uses Claude to plan and execute browser tasks
     """
     
-    def __init__(self):
+    def __init__(self, trace_cache=None, streaming=True, anthropic_client=None, model_router=None):
         """Initialize the AI Robot Driver with Anthropic client"""
         api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
+        if anthropic_client is None and not api_key:
             raise ValueError(
                 "ANTHROPIC_API_KEY not found! "
                 "Please set it in your .env file or environment."
             )
         
-        self.client = Anthropic(api_key=api_key)
+        # Bounded concurrency, per-call timeouts, retries and a circuit breaker
+        self.client = ResilientAnthropicClient(anthropic_client or Anthropic(api_key=api_key))
+        # Stream responses and run each tool call as soon as its input is complete
+        self.streaming = streaming
+        self.model_router = model_router or ModelRouter(
+            os.getenv("AGENT_MODEL_TIERS", DEFAULT_AGENT_MODELS).split(",")
+        )
+        # Tool sequences of solved goals, replayed instead of asking Claude again
+        self.trace_cache = trace_cache or TraceCache(os.getenv("AGENT_TRACE_CACHE", "agent_traces.json"))
+        # Downscaled screenshots, encoded off the browser thread, skipped when the page is unchanged
+        self.screenshots = ScreenshotCapturer()
         self.conversation_history = []
         self.playwright = None
         self.browser = None
@@ -41,343 +68,310 @@ class AIRobotDriver:
         
     def _define_tools(self):
         """Define the tools available to Claude"""
-        return [
-            {
-                "name": "playwright_navigate",
-                "description": "Navigate to a URL in the browser",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The URL to navigate to"
-                        }
-                    },
-                    "required": ["url"]
-                }
-            },
-            {
-                "name": "playwright_click",
-                "description": "Click an element on the page using a selector",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "CSS selector of the element to click"
-                        }
-                    },
-                    "required": ["selector"]
-                }
-            },
-            {
-                "name": "playwright_fill",
-                "description": "Type text into an input field",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "CSS selector of the input field"
-                        },
-                        "text": {
-                            "type": "string",
-                            "description": "Text to type into the field"
-                        }
-                    },
-                    "required": ["selector", "text"]
-                }
-            },
-            {
-                "name": "playwright_wait",
-                "description": "Wait for an element to appear",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "selector": {
-                            "type": "string",
-                            "description": "CSS selector to wait for"
-                        }
-                    },
-                    "required": ["selector"]
-                }
-            },
-            {
-                "name": "playwright_find_cheapest_product",
-                "description": "Find the cheapest iPhone product on the page and return its details",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            },
-            {
-                "name": "playwright_click_cheapest_iphone",
-                "description": "Find the cheapest iPhone and click its 'Add to cart' button",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            },
-            {
-                "name": "playwright_get_page_info",
-                "description": "Get accessibility tree and visible elements on the current page. Returns structured data about buttons, inputs, text, and other interactive elements.",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            },
-            {
-                "name": "playwright_get_text",
-                "description": "Get all visible text from the current page",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            }
-        ]
+        return TOOL_DEFINITIONS
 
     def _execute_tool(self, tool_name: str, tool_input: dict):
         """Execute the tool that Claude requested"""
-        try:
-            if tool_name == "playwright_navigate":
-                url = tool_input.get("url")
-                self.page.goto(url)
-                return f"Successfully navigated to {url}"
-            
-            elif tool_name == "playwright_click":
-                selector = tool_input.get("selector")
-                self.page.click(selector)
-                return f"Clicked {selector}"
-            
-            elif tool_name == "playwright_fill":
-                selector = tool_input.get("selector")
-                text = tool_input.get("text")
-                self.page.fill(selector, text)
-                return f"Typed into {selector}"
-            
-            elif tool_name == "playwright_wait":
-                selector = tool_input.get("selector")
-                self.page.wait_for_selector(selector, timeout=5000)
-                return f"Element appeared: {selector}"
-            
-            elif tool_name == "playwright_find_cheapest_product":
-                try:
-                    # Get page text and extract iPhone prices
-                    page_text = self.page.inner_text("body")
-                    
-                    import re
-                    # Find all iPhone mentions with prices
-                    iphone_pattern = r'(iPhone[^$]*)\s*\$([0-9,]+\.?[0-9]*)'
-                    matches = re.findall(iphone_pattern, page_text)
-                    
-                    products = []
-                    for name_part, price_str in matches:
-                        try:
-                            price = float(price_str.replace(',', ''))
-                            name = name_part.strip()
-                            products.append({'name': name, 'price': price, 'price_text': f'${price_str}'})
-                        except:
-                            continue
-                    
-                    if products:
-                        cheapest = min(products, key=lambda x: x['price'])
-                        all_prices = [f"{p['name']}: {p['price_text']}" for p in products]
-                        return f"Found {len(products)} iPhones: {', '.join(all_prices)}. Cheapest: {cheapest['name']} at {cheapest['price_text']}"
-                    else:
-                        return f"No iPhone products found in text: {page_text[:500]}"
-                        
-                except Exception as e:
-                    return f"Error finding products: {str(e)}"
-            
-            elif tool_name == "playwright_click_cheapest_iphone":
-                try:
-                    # Get page text and find cheapest iPhone
-                    page_text = self.page.inner_text("body")
-                    
-                    import re
-                    iphone_pattern = r'(iPhone[^$]*)\s*\$([0-9,]+\.?[0-9]*)'
-                    matches = re.findall(iphone_pattern, page_text)
-                    
-                    products = []
-                    for name_part, price_str in matches:
-                        try:
-                            price = float(price_str.replace(',', ''))
-                            name = name_part.strip()
-                            products.append({'name': name, 'price': price})
-                        except:
-                            continue
-                    
-                    if products:
-                        cheapest = min(products, key=lambda x: x['price'])
-                        
-                        # Find the "Add to cart" button near this iPhone name
-                        # Look for elements containing the iPhone name
-                        iphone_text = cheapest['name'].split()[0] + " " + cheapest['name'].split()[1]  # e.g. "iPhone XR"
-                        
-                        # Try different selectors to find the add to cart button
-                        selectors_to_try = [
-                            f"text='{iphone_text}' >> .. >> text='Add to cart'",
-                            f":has-text('{iphone_text}') >> text='Add to cart'",
-                            f"div:has-text('{iphone_text}') >> button:has-text('Add to cart')",
-                            "button:has-text('Add to cart')"
-                        ]
-                        
-                        for selector in selectors_to_try:
-                            try:
-                                buttons = self.page.locator(selector).all()
-                                if buttons:
-                                    buttons[0].click()
-                                    return f"Added cheapest iPhone to cart: {cheapest['name']} (${cheapest['price']})"
-                            except:
-                                continue
-                                
-                        return f"Found cheapest iPhone {cheapest['name']} but couldn't find its add to cart button"
-                    else:
-                        return "No iPhone products found to add to cart"
-                        
-                except Exception as e:
-                    return f"Error adding to cart: {str(e)}"
-            
-            elif tool_name == "playwright_get_page_info":
-                page_info = self._get_page_accessibility_tree()
-                return page_info
-            
-            elif tool_name == "playwright_get_text":
-                text_content = self.page.inner_text("body")
-                return f"Page text: {text_content[:2000]}"
-            
+        return PlaywrightTools(self.page, self.screenshots).execute(tool_name, tool_input)
+
+    @staticmethod
+    def _finish_screenshots(pending: list):
+        """
+        Wait for screenshots still encoding and put them in their tool results
+
+        Runs after the browser has moved on to the turn's other tools, so
+        encoding overlaps with browser work and generation.
+        """
+        for tool_result, step in pending:
+            try:
+                shot = tool_result["content"].result()
+            except Exception as e:
+                step["result"] = tool_result["content"] = f"Error encoding screenshot: {str(e)}"
+                continue
+            content = [{"type": "text", "text": shot.summary()}]
+            if shot.data:
+                content.append({
+                    "type": "image",
+                    "source": {"type": "base64", "media_type": shot.media_type, "data": shot.base64()}
+                })
+            tool_result["content"] = content
+            step["result"] = shot.summary()
+            step["screenshot"] = shot.to_dict()
+            print(f"  Screenshot: {shot.summary()}")
+
+    @staticmethod
+    def _tool_failed(tool_result: str) -> bool:
+        """Check whether a tool result reports a failure"""
+        return tool_failed(tool_result)
+
+    def _replay_trace(self, trace, url: str, result: dict):
+        """
+        Re-run a recorded tool trace without calling Claude
+
+        The first navigation goes to ``url``, not the URL the trace was
+        recorded with, so the query string of this run is kept.
+
+        Returns:
+            str or None: Description of the failed step, or None if every step succeeded
+        """
+        print(f"Replaying {len(trace.steps)}-step trace recorded for this goal")
+        navigated = False
+        for index, step in enumerate(trace.steps):
+            tool_input = step.input
+            if step.tool == "playwright_navigate" and not navigated:
+                tool_input = {**step.input, "url": url}
+                navigated = True
+            tool_result = self._execute_tool(step.tool, tool_input)
+            print(f"  Replay: {step.tool} - Result: {tool_result}")
+            result["steps_taken"].append({
+                "iteration": 0,
+                "tool": step.tool,
+                "input": tool_input,
+                "result": tool_result,
+                "replayed": True
+            })
+            if self._tool_failed(tool_result):
+                self.trace_cache.replay_failed(trace, index, tool_result)
+                return f"{step.tool}({json.dumps(tool_input)}) failed with: {tool_result}"
+        return None
+
+    def _record_trace(self, goal: str, url: str, result: dict):
+        """Store the successful tool calls of this run for later replay"""
+        actions = [step for step in result["steps_taken"] if step["tool"] not in OBSERVATION_TOOLS]
+        # Claude can claim success after a failed final action; don't keep that as a recipe
+        if not actions or self._tool_failed(actions[-1]["result"]):
+            return
+        steps = []
+        for step in actions:
+            trace_step = TraceStep(tool=step["tool"], input=step.get("input", {}))
+            if self._tool_failed(step["result"]) or (steps and steps[-1] == trace_step):
+                continue
+            steps.append(trace_step)
+        self.trace_cache.record(goal, url, steps, llm_calls=result["llm_calls"])
+
+    def _stream_response(self, request: dict, on_tool_use):
+        """
+        Stream Claude's response, calling on_tool_use for each tool_use block
+        as soon as its input JSON is complete
+
+        Playwright pages only work on the thread that created them, so the
+        stream is read on a helper thread and finished tool calls are handed
+        back here. The browser works on one tool while the model is still
+        generating the next.
+
+        Returns:
+            tuple: The complete response and the seconds the model took to produce it
+        """
+        events = queue.Queue()
+        
+        def read_stream():
+            started = perf_counter()
+            try:
+                with self.client.messages.stream(**request) as stream:
+                    for event in stream:
+                        if event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                            events.put(("tool_use", event.content_block))
+                    events.put(("done", (stream.get_final_message(), perf_counter() - started)))
+            except Exception as e:
+                events.put(("error", e))
+        
+        threading.Thread(target=read_stream, name="claude-stream", daemon=True).start()
+        while True:
+            kind, payload = events.get()
+            if kind == "tool_use":
+                on_tool_use(payload)
+            elif kind == "done":
+                return payload
             else:
-                return f"Unknown tool: {tool_name}"
-                
-        except Exception as e:
-            return f"Error: {str(e)}"
+                raise payload
 
-    def _get_page_accessibility_tree(self):
+    def _stuck_reason(self, new_steps: list, previous_calls: list, task_complete: bool):
         """
-        Get accessibility tree and visible elements - THIS IS THE MCP MAGIC!
-        Returns structured info about interactive elements on the page
+        Check whether the last iteration made no progress
+
+        Returns:
+            str or None: Why the agent looks stuck, or None if it moved forward
         """
-        try:
-            # Get all important elements
-            elements_info = {
-                "buttons": [],
-                "inputs": [],
-                "links": [],
-                "dropdown_options": [],
-                "text": [],
-                "page_title": self.page.title()
+        if task_complete:
+            return None
+        if not new_steps:
+            return "no tool call and no completion"
+        failed = [step["tool"] for step in new_steps if self._tool_failed(step["result"])]
+        if failed:
+            return f"{failed[0]} failed"
+        calls = [(step["tool"], json.dumps(step["input"], sort_keys=True)) for step in new_steps]
+        if calls == previous_calls:
+            return f"repeated {calls[0][0]}"
+        return None
+
+    def _run_agent_loop(self, goal: str, url: str, max_iterations: int, result: dict, replay_failure=None):
+        """Let Claude pick tools until it reports the task complete or iterations run out"""
+        # Define the tools Claude can use
+        tools = self._define_tools()
+        
+        # Build system prompt with MCP instructions
+        system_prompt = f"""You are an AI web automation agent controlling a browser via Playwright tools.
+
+TASK: {goal}
+TARGET: {url}
+
+AVAILABLE TOOLS:
+1. playwright_navigate(url) - Go to a website
+2. playwright_find_cheapest_product() - Find the cheapest iPhone on the page
+3. playwright_click_cheapest_iphone() - Add the cheapest iPhone to cart
+4. playwright_get_page_info() - Get structured info about the page
+5. playwright_screenshot(selector?, clip?) - Take a small screenshot (skipped if the page is unchanged)
+
+SIMPLE WORKFLOW:
+1. Navigate to the site
+2. Find the cheapest iPhone product
+3. Click "Add to cart" for that product
+4. Say "TASK_COMPLETE"
+
+IMPORTANT:
+- The products are already visible on the main page - no login needed
+- Use playwright_find_cheapest_product() to identify the cheapest iPhone
+- Use playwright_click_cheapest_iphone() to add it to cart
+- Keep it simple - just these 3 steps!
+
+You will receive the current page structure in each step."""
+        
+        # Initialize conversation
+        first_message = f"Please accomplish this task: {goal}"
+        if replay_failure:
+            # Tell Claude what the replay already did so it continues from here
+            done = [step["tool"] for step in result["steps_taken"] if not self._tool_failed(step["result"])]
+            first_message += (
+                f"\n\nThese steps were already completed: {', '.join(done) or 'none'}. "
+                f"The next step, {replay_failure}. Continue from the current page state."
+            )
+        messages = [
+            {
+                "role": "user",
+                "content": first_message
             }
+        ]
+        
+        # Start on the small model; move up a tier whenever the agent gets stuck
+        model = self.model_router.first()
+        previous_calls = []
+        
+        # Loop - Claude responds, uses tools, we execute, repeat
+        for iteration in range(max_iterations):
+            print(f"Iteration {iteration + 1}/{max_iterations}")
+            result["llm_calls"] += 1
             
-            # Find all buttons and their text
-            buttons = self.page.locator("button, [role='button']").all()
-            for i, button in enumerate(buttons[:15]):  # Limit to first 15
-                try:
-                    text = button.inner_text()
-                    selector = self._get_selector(button)
-                    if text.strip():
-                        elements_info["buttons"].append({
-                            "index": i,
-                            "text": text.strip(),
-                            "selector": selector
-                        })
-                except:
-                    pass
-            
-            # Find all input fields
-            inputs = self.page.locator("input, textarea").all()
-            for i, inp in enumerate(inputs[:15]):  # Limit to first 15
-                try:
-                    placeholder = inp.get_attribute("placeholder") or ""
-                    input_type = inp.get_attribute("type") or "text"
-                    selector = self._get_selector(inp)
-                    elements_info["inputs"].append({
-                        "index": i,
-                        "type": input_type,
-                        "placeholder": placeholder,
-                        "selector": selector
-                    })
-                except:
-                    pass
+            tool_results = []
+            pending_screenshots = []
+            started = perf_counter()
+            steps_before = len(result["steps_taken"])
+            timing = {
+                "iteration": iteration + 1,
+                "model": model,
+                "streamed": self.streaming,
+                "first_action_seconds": None
+            }
             
-            # Find all links
-            links = self.page.locator("a[href]").all()
-            for i, link in enumerate(links[:15]):  # Limit to first 15
-                try:
-                    text = link.inner_text()
-                    href = link.get_attribute("href")
-                    selector = self._get_selector(link)
-                    if text.strip():
-                        elements_info["links"].append({
-                            "index": i,
-                            "text": text.strip(),
-                            "href": href,
-                            "selector": selector
-                        })
-                except:
-                    pass
+            def run_tool(block):
+                """Execute one tool_use block and queue its result for Claude"""
+                if timing["first_action_seconds"] is None:
+                    timing["first_action_seconds"] = round(perf_counter() - started, 4)
+                print(f"  Tool: {block.name} - Input: {block.input}")
+                tool_result = self._execute_tool(block.name, block.input)
+                
+                # Store result to send back to Claude
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": tool_result
+                })
+                
+                result["steps_taken"].append({
+                    "iteration": timing["iteration"],
+                    "tool": block.name,
+                    "input": block.input,
+                    "result": tool_result
+                })
+                if isinstance(tool_result, Future):
+                    # Still encoding; filled in before the results go back to Claude
+                    print("  Result: screenshot captured, encoding")
+                    pending_screenshots.append((tool_results[-1], result["steps_taken"][-1]))
+                else:
+                    print(f"  Result: {tool_result}")
             
-            # Find dropdown options if visible
+            # Get Claude's response with tool support; when streaming, each
+            # tool runs as soon as its input is complete
+            request = {
+                "model": model,
+                "max_tokens": 1024,
+                "system": system_prompt,
+                "tools": tools,
+                "messages": messages
+            }
             try:
-                options = self.page.locator("[role='option']").all()
-                for i, option in enumerate(options[:20]):  # Limit to first 20
-                    try:
-                        text = option.inner_text()
-                        selector = self._get_selector(option)
-                        if text.strip():
-                            elements_info["dropdown_options"].append({
-                                "index": i,
-                                "text": text.strip(),
-                                "selector": selector
-                            })
-                    except:
-                        pass
-            except:
-                pass
+                if self.streaming:
+                    response, llm_seconds = self._stream_response(request, run_tool)
+                else:
+                    response = self.client.messages.create(**request)
+                    llm_seconds = perf_counter() - started
+                    for block in response.content:
+                        if block.type == "tool_use":
+                            run_tool(block)
+            except Exception:
+                self.model_router.record_call(model, perf_counter() - started, ok=False)
+                raise
+            self.model_router.record_call(model, llm_seconds, getattr(response, "usage", None))
+            self._finish_screenshots(pending_screenshots)
             
-            # Get visible text
-            body_text = self.page.inner_text("body")
-            elements_info["text"] = body_text[:2000]
+            timing["llm_seconds"] = round(llm_seconds, 4)
+            timing["iteration_seconds"] = round(perf_counter() - started, 4)
+            result["timings"].append(timing)
+            print(f"  Claude response: {response.stop_reason} "
+                  f"(first action {timing['first_action_seconds']}s, iteration {timing['iteration_seconds']}s)")
             
-            return f"Page Info:\n{json.dumps(elements_info, indent=2)}"
+            # Add Claude's response to history
+            messages.append({"role": "assistant", "content": response.content})
             
-        except Exception as e:
-            return f"Error getting page info: {str(e)}"
-    
-    def _get_selector(self, element):
-        """Get a usable CSS selector for an element"""
-        try:
-            # Try to get ID
-            elem_id = element.get_attribute("id")
-            if elem_id:
-                return f"#{elem_id}"
+            # Check for text that signals completion
+            task_complete = False
+            for block in response.content:
+                if hasattr(block, 'text'):
+                    text = block.text
+                    if "TASK_COMPLETE" in text or "completed" in text.lower():
+                        task_complete = True
+                        result["success"] = True
+                        print(f"  Task complete: {text[:100]}")
+            
+            # If Claude used tools, send results back
+            if tool_results:
+                messages.append({
+                    "role": "user",
+                    "content": tool_results
+                })
+            
+            # If task is complete, break
+            if task_complete:
+                break
             
-            # Try to get unique selector via evaluate
-            selector = element.evaluate("""
-                el => {
-                    let path = [];
-                    while (el.parentElement) {
-                        let selector = el.tagName.toLowerCase();
-                        if (el.id) {
-                            selector += '#' + el.id;
-                            path.unshift(selector);
-                            break;
-                        } else {
-                            let sibling = el;
-                            let nth = 1;
-                            while (sibling = sibling.previousElementSibling) {
-                                if (sibling.tagName.toLowerCase() == selector) nth++;
-                            }
-                            if (nth > 1) selector += ':nth-of-type(' + nth + ')';
-                        }
-                        path.unshift(selector);
-                        el = el.parentElement;
-                    }
-                    return path.join(' > ');
-                }
-            """)
-            return selector
-        except:
-            return "element"
+            # A stuck small model hands the rest of the task to a larger one
+            new_steps = result["steps_taken"][steps_before:]
+            stuck = self._stuck_reason(new_steps, previous_calls, task_complete)
+            previous_calls = [(step["tool"], json.dumps(step["input"], sort_keys=True)) for step in new_steps]
+            if stuck:
+                larger = self.model_router.escalate(model, ESCALATE_STUCK)
+                if larger:
+                    print(f"  Agent stuck ({stuck}) - escalating from {model} to {larger}")
+                    timing["escalated_to"] = larger
+                    model = larger
+            
+            # If no tools were called and not complete, ask to continue
+            if not tool_results and response.stop_reason == "end_turn":
+                print("No tools called. Asking to continue...")
+                messages.append({
+                    "role": "user",
+                    "content": "Please continue with the next step or say TASK_COMPLETE."
+                })
+        
 
     def execute_task_with_ai(self, goal: str, url: str, max_iterations: int = 5):
         """
@@ -398,7 +392,11 @@ class AIRobotDriver:
             "success": False,
             "goal": goal,
             "steps_taken": [],
-            "error": None
+            "error": None,
+            "replayed": False,
+            "llm_calls": 0,
+            "llm_calls_avoided": 0,
+            "timings": []
         }
         
         try:
@@ -406,119 +404,27 @@ class AIRobotDriver:
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(headless=True)
             self.page = self.browser.new_page()
+            # A new page: the previous run's last screenshot says nothing about it
+            self.screenshots.reset()
             
-            # Define the tools Claude can use
-            tools = self._define_tools()
+            # Replay a trace that already solved this goal on this site
+            replay_failure = None
+            trace = self.trace_cache.lookup(goal, url)
+            if trace is not None:
+                replay_failure = self._replay_trace(trace, url, result)
+                if replay_failure is None:
+                    self.trace_cache.replay_succeeded(trace)
+                    result["success"] = True
+                    result["replayed"] = True
+                    result["llm_calls_avoided"] = trace.llm_calls
+                    print(f"Replay complete - skipped {trace.llm_calls} Claude call(s)")
+                    return result
+                print(f"Replay failed, handing over to Claude: {replay_failure}")
             
-            # Build system prompt with MCP instructions
-            system_prompt = f"""You are an AI web automation agent controlling a browser via Playwright tools.
-
-TASK: {goal}
-TARGET: {url}
-
-AVAILABLE TOOLS:
-1. playwright_navigate(url) - Go to a website
-2. playwright_find_cheapest_product() - Find the cheapest iPhone on the page
-3. playwright_click_cheapest_iphone() - Add the cheapest iPhone to cart
-4. playwright_get_page_info() - Get structured info about the page
-5. playwright_screenshot() - Take a screenshot
-
-SIMPLE WORKFLOW:
-1. Navigate to the site
-2. Find the cheapest iPhone product
-3. Click "Add to cart" for that product
-4. Say "TASK_COMPLETE"
-
-IMPORTANT:
-- The products are already visible on the main page - no login needed
-- Use playwright_find_cheapest_product() to identify the cheapest iPhone
-- Use playwright_click_cheapest_iphone() to add it to cart
-- Keep it simple - just these 3 steps!
-
-You will receive the current page structure in each step."""
-            
-            # Initialize conversation
-            messages = [
-                {
-                    "role": "user",
-                    "content": f"Please accomplish this task: {goal}"
-                }
-            ]
+            self._run_agent_loop(goal, url, max_iterations, result, replay_failure)
             
-            # Loop - Claude responds, uses tools, we execute, repeat
-            for iteration in range(max_iterations):
-                print(f"Iteration {iteration + 1}/{max_iterations}")
-                
-                # Get Claude's response with tool support
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-20250514",
-                    max_tokens=1024,
-                    system=system_prompt,
-                    tools=tools,
-                    messages=messages
-                )
-                
-                print(f"  Claude response: {response.stop_reason}")
-                
-                # Add Claude's response to history
-                messages.append({"role": "assistant", "content": response.content})
-                
-                # Check if Claude wants to use tools
-                tool_results = []
-                task_complete = False
-                
-                for block in response.content:
-                    # Check for text that signals completion
-                    if hasattr(block, 'text'):
-                        text = block.text
-                        if "TASK_COMPLETE" in text or "completed" in text.lower():
-                            task_complete = True
-                            result["success"] = True
-                            print(f"  Task complete: {text[:100]}")
-                    
-                    # Handle tool use
-                    if block.type == "tool_use":
-                        tool_name = block.name
-                        tool_input = block.input
-                        tool_id = block.id
-                        
-                        print(f"  Tool: {tool_name} - Input: {tool_input}")
-                        
-                        # Execute the tool
-                        tool_result = self._execute_tool(tool_name, tool_input)
-                        print(f"  Result: {tool_result}")
-                        
-                        # Store result to send back to Claude
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_id,
-                            "content": tool_result
-                        })
-                        
-                        result["steps_taken"].append({
-                            "iteration": iteration + 1,
-                            "tool": tool_name,
-                            "result": tool_result
-                        })
-                
-                # If Claude used tools, send results back
-                if tool_results:
-                    messages.append({
-                        "role": "user",
-                        "content": tool_results
-                    })
-                
-                # If task is complete, break
-                if task_complete:
-                    break
-                
-                # If no tools were called and not complete, ask to continue
-                if not tool_results and response.stop_reason == "end_turn":
-                    print("No tools called. Asking to continue...")
-                    messages.append({
-                        "role": "user",
-                        "content": "Please continue with the next step or say TASK_COMPLETE."
-                    })
+            if result["success"]:
+                self._record_trace(goal, url, result)
                     
         except Exception as e:
             result["error"] = str(e)
@@ -551,6 +457,7 @@ def simple_demo():
         print(f"Goal: {result['goal']}")
         print(f"Success: {result['success']}")
         print(f"Steps Taken: {len(result['steps_taken'])}")
+        print(f"Claude calls: {result['llm_calls']} (avoided by replay: {result['llm_calls_avoided']})")
         for step in result['steps_taken']:
             tool = step['tool']
             result_text = step['result']
@@ -560,6 +467,8 @@ def simple_demo():
         
         if result['error']:
             print(f"Error: {result['error']}")
+        print(f"Trace cache: {driver.trace_cache.stats()}")
+        print(f"Model tiers: {driver.model_router.stats()}")
             
     except ValueError as e:
         print(f"Configuration Error: {e}")
@@ -570,4 +479,5 @@ def simple_demo():
 
 
 if __name__ == "__main__":
+    configure_logging(fmt=CLI_FORMAT)
     simple_demo()
\ No newline at end of file
@@ -0,0 +1,410 @@
+"""
+PLAYWRIGHT TOOLS FOR THE AI BRAIN
+=================================
+The browser tools Claude can call, shared by the agent loop in
+ai_brain_mcp.py and the MCP server (robot_Driver_Playwright/mcp_server.py).
+
+PlaywrightTools wraps a single page, so each caller decides which browser,
+context and page the tools act on. Every tool returns text, except
+playwright_screenshot: it returns a Future that resolves to a Screenshot once
+the image has been encoded off the browser thread.
+"""
+
+import json
+
+from robot_Driver_Playwright.screenshots import ScreenshotCapturer
+
+# Tool results that mean the step did not do what was asked
+FAILED_TOOL_PREFIXES = ("Error", "Unknown tool", "No iPhone products found")
+
+
+TOOL_DEFINITIONS = [
+    {
+        "name": "playwright_navigate",
+        "description": "Navigate to a URL in the browser",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "The URL to navigate to"
+                }
+            },
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "playwright_click",
+        "description": "Click an element on the page using a selector",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "CSS selector of the element to click"
+                }
+            },
+            "required": ["selector"]
+        }
+    },
+    {
+        "name": "playwright_fill",
+        "description": "Type text into an input field",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "CSS selector of the input field"
+                },
+                "text": {
+                    "type": "string",
+                    "description": "Text to type into the field"
+                }
+            },
+            "required": ["selector", "text"]
+        }
+    },
+    {
+        "name": "playwright_wait",
+        "description": "Wait for an element to appear",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "CSS selector to wait for"
+                }
+            },
+            "required": ["selector"]
+        }
+    },
+    {
+        "name": "playwright_find_cheapest_product",
+        "description": "Find the cheapest iPhone product on the page and return its details",
+        "input_schema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "playwright_click_cheapest_iphone",
+        "description": "Find the cheapest iPhone and click its 'Add to cart' button",
+        "input_schema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "playwright_get_page_info",
+        "description": "Get accessibility tree and visible elements on the current page. Returns structured data about buttons, inputs, text, and other interactive elements.",
+        "input_schema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "playwright_get_text",
+        "description": "Get all visible text from the current page",
+        "input_schema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "playwright_screenshot",
+        "description": "Take a small screenshot of the viewport, a clip rectangle or one element. Skipped if the page has not changed since the last screenshot of the same region.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "selector": {
+                    "type": "string",
+                    "description": "CSS selector of the element to capture (optional)"
+                },
+                "clip": {
+                    "type": "object",
+                    "description": "Rectangle to capture in CSS pixels (optional)",
+                    "properties": {
+                        "x": {"type": "number"},
+                        "y": {"type": "number"},
+                        "width": {"type": "number"},
+                        "height": {"type": "number"}
+                    },
+                    "required": ["x", "y", "width", "height"]
+                },
+                "force": {
+                    "type": "boolean",
+                    "description": "Capture even if the page has not changed"
+                }
+            }
+        }
+    }
+]
+
+
+def tool_failed(tool_result: str) -> bool:
+    """Check whether a tool result reports a failure"""
+    return tool_result.startswith(FAILED_TOOL_PREFIXES) or "couldn't find" in tool_result
+
+
+class PlaywrightTools:
+    """
+    Executes the browser tools against one Playwright page
+    """
+    
+    def __init__(self, page, screenshots=None):
+        self.page = page
+        # Keep one capturer per page so unchanged pages are not captured twice
+        self.screenshots = screenshots or ScreenshotCapturer()
+
+    def execute(self, tool_name: str, tool_input: dict):
+        """Run one tool against the page and return its result text (a Future for screenshots)"""
+        try:
+            if tool_name == "playwright_navigate":
+                url = tool_input.get("url")
+                self.page.goto(url)
+                return f"Successfully navigated to {url}"
+            
+            elif tool_name == "playwright_click":
+                selector = tool_input.get("selector")
+                self.page.click(selector)
+                return f"Clicked {selector}"
+            
+            elif tool_name == "playwright_fill":
+                selector = tool_input.get("selector")
+                text = tool_input.get("text")
+                self.page.fill(selector, text)
+                return f"Typed into {selector}"
+            
+            elif tool_name == "playwright_wait":
+                selector = tool_input.get("selector")
+                self.page.wait_for_selector(selector, timeout=5000)
+                return f"Element appeared: {selector}"
+            
+            elif tool_name == "playwright_find_cheapest_product":
+                try:
+                    # Get page text and extract iPhone prices
+                    page_text = self.page.inner_text("body")
+                    
+                    import re
+                    # Find all iPhone mentions with prices
+                    iphone_pattern = r'(iPhone[^$]*)\s*\$([0-9,]+\.?[0-9]*)'
+                    matches = re.findall(iphone_pattern, page_text)
+                    
+                    products = []
+                    for name_part, price_str in matches:
+                        try:
+                            price = float(price_str.replace(',', ''))
+                            name = name_part.strip()
+                            products.append({'name': name, 'price': price, 'price_text': f'${price_str}'})
+                        except:
+                            continue
+                    
+                    if products:
+                        cheapest = min(products, key=lambda x: x['price'])
+                        all_prices = [f"{p['name']}: {p['price_text']}" for p in products]
+                        return f"Found {len(products)} iPhones: {', '.join(all_prices)}. Cheapest: {cheapest['name']} at {cheapest['price_text']}"
+                    else:
+                        return f"No iPhone products found in text: {page_text[:500]}"
+                        
+                except Exception as e:
+                    return f"Error finding products: {str(e)}"
+            
+            elif tool_name == "playwright_click_cheapest_iphone":
+                try:
+                    # Get page text and find cheapest iPhone
+                    page_text = self.page.inner_text("body")
+                    
+                    import re
+                    iphone_pattern = r'(iPhone[^$]*)\s*\$([0-9,]+\.?[0-9]*)'
+                    matches = re.findall(iphone_pattern, page_text)
+                    
+                    products = []
+                    for name_part, price_str in matches:
+                        try:
+                            price = float(price_str.replace(',', ''))
+                            name = name_part.strip()
+                            products.append({'name': name, 'price': price})
+                        except:
+                            continue
+                    
+                    if products:
+                        cheapest = min(products, key=lambda x: x['price'])
+                        
+                        # Find the "Add to cart" button near this iPhone name
+                        # Look for elements containing the iPhone name
+                        iphone_text = cheapest['name'].split()[0] + " " + cheapest['name'].split()[1]  # e.g. "iPhone XR"
+                        
+                        # Try different selectors to find the add to cart button
+                        selectors_to_try = [
+                            f"text='{iphone_text}' >> .. >> text='Add to cart'",
+                            f":has-text('{iphone_text}') >> text='Add to cart'",
+                            f"div:has-text('{iphone_text}') >> button:has-text('Add to cart')",
+                            "button:has-text('Add to cart')"
+                        ]
+                        
+                        for selector in selectors_to_try:
+                            try:
+                                buttons = self.page.locator(selector).all()
+                                if buttons:
+                                    buttons[0].click()
+                                    return f"Added cheapest iPhone to cart: {cheapest['name']} (${cheapest['price']})"
+                            except:
+                                continue
+                                
+                        return f"Found cheapest iPhone {cheapest['name']} but couldn't find its add to cart button"
+                    else:
+                        return "No iPhone products found to add to cart"
+                        
+                except Exception as e:
+                    return f"Error adding to cart: {str(e)}"
+            
+            elif tool_name == "playwright_get_page_info":
+                page_info = self._get_page_accessibility_tree()
+                return page_info
+            
+            elif tool_name == "playwright_get_text":
+                text_content = self.page.inner_text("body")
+                return f"Page text: {text_content[:2000]}"
+            
+            elif tool_name == "playwright_screenshot":
+                # Capture here; downscaling and encoding finish on a worker thread
+                return self.screenshots.capture(
+                    self.page,
+                    selector=tool_input.get("selector"),
+                    clip=tool_input.get("clip"),
+                    force=bool(tool_input.get("force"))
+                )
+            
+            else:
+                return f"Unknown tool: {tool_name}"
+                
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def _get_page_accessibility_tree(self):
+        """
+        Get accessibility tree and visible elements - THIS IS THE MCP MAGIC!
+        Returns structured info about interactive elements on the page
+        """
+        try:
+            # Get all important elements
+            elements_info = {
+                "buttons": [],
+                "inputs": [],
+                "links": [],
+                "dropdown_options": [],
+                "text": [],
+                "page_title": self.page.title()
+            }
+            
+            # Find all buttons and their text
+            buttons = self.page.locator("button, [role='button']").all()
+            for i, button in enumerate(buttons[:15]):  # Limit to first 15
+                try:
+                    text = button.inner_text()
+                    selector = self._get_selector(button)
+                    if text.strip():
+                        elements_info["buttons"].append({
+                            "index": i,
+                            "text": text.strip(),
+                            "selector": selector
+                        })
+                except:
+                    pass
+            
+            # Find all input fields
+            inputs = self.page.locator("input, textarea").all()
+            for i, inp in enumerate(inputs[:15]):  # Limit to first 15
+                try:
+                    placeholder = inp.get_attribute("placeholder") or ""
+                    input_type = inp.get_attribute("type") or "text"
+                    selector = self._get_selector(inp)
+                    elements_info["inputs"].append({
+                        "index": i,
+                        "type": input_type,
+                        "placeholder": placeholder,
+                        "selector": selector
+                    })
+                except:
+                    pass
+            
+            # Find all links
+            links = self.page.locator("a[href]").all()
+            for i, link in enumerate(links[:15]):  # Limit to first 15
+                try:
+                    text = link.inner_text()
+                    href = link.get_attribute("href")
+                    selector = self._get_selector(link)
+                    if text.strip():
+                        elements_info["links"].append({
+                            "index": i,
+                            "text": text.strip(),
+                            "href": href,
+                            "selector": selector
+                        })
+                except:
+                    pass
+            
+            # Find dropdown options if visible
+            try:
+                options = self.page.locator("[role='option']").all()
+                for i, option in enumerate(options[:20]):  # Limit to first 20
+                    try:
+                        text = option.inner_text()
+                        selector = self._get_selector(option)
+                        if text.strip():
+                            elements_info["dropdown_options"].append({
+                                "index": i,
+                                "text": text.strip(),
+                                "selector": selector
+                            })
+                    except:
+                        pass
+            except:
+                pass
+            
+            # Get visible text
+            body_text = self.page.inner_text("body")
+            elements_info["text"] = body_text[:2000]
+            
+            return f"Page Info:\n{json.dumps(elements_info, indent=2)}"
+            
+        except Exception as e:
+            return f"Error getting page info: {str(e)}"
+    
+    def _get_selector(self, element):
+        """Get a usable CSS selector for an element"""
+        try:
+            # Try to get ID
+            elem_id = element.get_attribute("id")
+            if elem_id:
+                return f"#{elem_id}"
+            
+            # Try to get unique selector via evaluate
+            selector = element.evaluate("""
+                el => {
+                    let path = [];
+                    while (el.parentElement) {
+                        let selector = el.tagName.toLowerCase();
+                        if (el.id) {
+                            selector += '#' + el.id;
+                            path.unshift(selector);
+                            break;
+                        } else {
+                            let sibling = el;
+                            let nth = 1;
+                            while (sibling = sibling.previousElementSibling) {
+                                if (sibling.tagName.toLowerCase() == selector) nth++;
+                            }
+                            if (nth > 1) selector += ':nth-of-type(' + nth + ')';
+                        }
+                        path.unshift(selector);
+                        el = el.parentElement;
+                    }
+                    return path.join(' > ');
+                }
+            """)
+            return selector
+        except:
+            return "element"
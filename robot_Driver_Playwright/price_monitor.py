@@ -0,0 +1,333 @@
+"""Scheduled price watches that share one logged-in extraction per site.
+
+A :class:`Watch` asks "tell me when this product's price crosses this
+threshold", re-checked every ``interval_seconds``. :class:`PriceMonitor` runs a
+scheduler thread that, on every tick, groups the watches that are due by page
+(host, path and query) and backend (plus any watch for that page falling due
+within its jitter window). Watches on other categories or filtered listings of
+the same host are separate groups, because they read a different catalog. Each group gets one driver run: one login and one catalog
+extraction, after which every watch in the group is answered from the same
+snapshot.
+
+A :class:`PriceEvent` is emitted only when a watch's price moves from one side
+of its threshold to the other. The first observation emits an event only if
+the price is already at or below the threshold. Next-due times are jittered,
+and at most ``max_concurrent_sites`` site runs are in flight at once, so a
+long watch list does not stampede the browser or the storefront.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from time import monotonic, time
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.catalog import ColumnarCatalog
+from robot_Driver_Playwright.catalog_store import site_key
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.http_backend import (
+    ALLOWED_BACKENDS,
+    BACKEND_BROWSER,
+    BACKEND_HTTP,
+    HttpRobotDriver,
+)
+from robot_Driver_Playwright.my_robot_driver import (
+    STRATEGY_MATCH,
+    RobotDriver,
+    SelectionParams,
+)
+
+DIRECTION_BELOW = "below"
+DIRECTION_ABOVE = "above"
+
+DEFAULT_TICK_SECONDS = 1.0
+DEFAULT_JITTER = 0.1
+DEFAULT_MAX_CONCURRENT_SITES = 2
+
+
+def page_key(url: str) -> str:
+    """Return the host, path and query of ``url``: the page a group of watches shares."""
+
+    parsed = urlparse(url)
+    key = site_key(url) + (parsed.path.rstrip("/") if parsed.netloc else "")
+    return f"{key}?{parsed.query}" if parsed.query else key
+
+
+@dataclass
+class Watch:
+    """A product whose price is re-checked on a fixed interval."""
+
+    watch_id: str
+    product_name: str
+    url: str
+    threshold: float
+    interval_seconds: float
+    selection_strategy: str = STRATEGY_MATCH
+    selection_params: SelectionParams = field(default_factory=SelectionParams)
+    backend: str = BACKEND_BROWSER
+    next_due: float = 0.0
+    last_checked: Optional[float] = None
+    last_price: Optional[float] = None
+    last_product: Optional[str] = None
+    last_error: Optional[str] = None
+    side: Optional[str] = None
+    checks: int = 0
+
+    @property
+    def group_key(self) -> Tuple[str, str]:
+        return page_key(self.url), self.backend
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["next_due_in_seconds"] = round(max(0.0, self.next_due - monotonic()), 2)
+        del data["next_due"]
+        return data
+
+
+@dataclass
+class PriceEvent:
+    """A watch's price crossed its threshold."""
+
+    watch_id: str
+    product_name: str
+    matched_product: Optional[str]
+    direction: str
+    price: float
+    previous_price: Optional[float]
+    threshold: float
+    url: str
+    at: float = field(default_factory=time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PriceMonitor:
+    """Scheduler for :class:`Watch` objects, batching due watches per site."""
+
+    def __init__(
+        self,
+        *,
+        tick_seconds: float = DEFAULT_TICK_SECONDS,
+        jitter: float = DEFAULT_JITTER,
+        max_concurrent_sites: int = DEFAULT_MAX_CONCURRENT_SITES,
+        headless: bool = True,
+        timeout_ms: int = 10_000,
+        event_history: int = 500,
+        on_event: Optional[Callable[[PriceEvent], None]] = None,
+    ) -> None:
+        self.tick_seconds = tick_seconds
+        self.jitter = jitter
+        self.max_concurrent_sites = max_concurrent_sites
+        self.headless = headless
+        self.timeout_ms = timeout_ms
+        self.on_event = on_event
+        self._watches: Dict[str, Watch] = {}
+        self._events: Deque[PriceEvent] = deque(maxlen=event_history)
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_sites, thread_name_prefix="price-watch")
+        self._scheduler: Optional[threading.Thread] = None
+        self._log = get_logger(__name__, "price-monitor")
+        self._counts = {"site_runs": 0, "watch_checks": 0, "events": 0, "errors": 0, "deferred": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._scheduler is not None:
+            return
+        self._scheduler = threading.Thread(target=self._schedule_loop, name="price-monitor", daemon=True)
+        self._scheduler.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def add_watch(
+        self,
+        *,
+        product_name: str,
+        url: str,
+        threshold: float,
+        interval_seconds: float,
+        selection_strategy: str = STRATEGY_MATCH,
+        selection_params: Optional[SelectionParams] = None,
+        backend: str = BACKEND_BROWSER,
+    ) -> Watch:
+        """Register a watch; raises ``ValueError`` for invalid settings."""
+
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        if backend not in ALLOWED_BACKENDS:
+            raise ValueError(f"Unsupported backend '{backend}'. Choose from {ALLOWED_BACKENDS}.")
+        params = RobotDriver._validated_params(selection_strategy, selection_params)
+        watch = Watch(
+            watch_id=uuid.uuid4().hex[:12],
+            product_name=product_name,
+            url=url,
+            threshold=threshold,
+            interval_seconds=interval_seconds,
+            selection_strategy=selection_strategy,
+            selection_params=params,
+            backend=backend,
+            # Spread the first checks of a bulk registration over the jitter window.
+            next_due=monotonic() + random.uniform(0, self.jitter * interval_seconds),
+        )
+        with self._lock:
+            self._watches[watch.watch_id] = watch
+        self._log.info("Watching %s on %s (threshold %.2f every %.0fs)", product_name, url, threshold, interval_seconds)
+        return watch
+
+    def remove_watch(self, watch_id: str) -> bool:
+        with self._lock:
+            return self._watches.pop(watch_id, None) is not None
+
+    def watches(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [watch.to_dict() for watch in self._watches.values()]
+
+    def events(self, limit: int = 100, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = [event for event in self._events if since is None or event.at >= since]
+        return [event.to_dict() for event in events[-limit:]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counts,
+                "watches": len(self._watches),
+                "sites_in_flight": len(self._in_flight),
+                "max_concurrent_sites": self.max_concurrent_sites,
+            }
+
+    def run_due(self, *, wait: bool = False) -> int:
+        """Dispatch one site run per group of due watches; return how many were dispatched."""
+
+        now = monotonic()
+        groups: Dict[Tuple[str, str], List[Watch]] = {}
+        with self._lock:
+            due_keys = {watch.group_key for watch in self._watches.values() if watch.next_due <= now}
+            for watch in self._watches.values():
+                # Pull in watches for the same page that fall due within their
+                # jitter window, so jitter does not split a page into many runs.
+                if watch.group_key in due_keys and watch.next_due <= now + self.jitter * watch.interval_seconds:
+                    groups.setdefault(watch.group_key, []).append(watch)
+            dispatch: List[Tuple[Tuple[str, str], List[Watch]]] = []
+            for key, watches in groups.items():
+                # One run per site at a time, and never more than the executor can start.
+                if key in self._in_flight or len(self._in_flight) >= self.max_concurrent_sites:
+                    self._counts["deferred"] += 1
+                    continue
+                self._in_flight.add(key)
+                dispatch.append((key, watches))
+        futures = [self._executor.submit(self._check_site, key, watches) for key, watches in dispatch]
+        if wait:
+            for future in futures:
+                future.result()
+        return len(futures)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _schedule_loop(self) -> None:
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.run_due()
+            except Exception as exc:  # noqa: BLE001 - keep the scheduler alive
+                self._log.warning("Price monitor tick failed: %s", exc)
+
+    def _check_site(self, key: Tuple[str, str], watches: List[Watch]) -> None:
+        site, backend = key
+        driver_cls = HttpRobotDriver if backend == BACKEND_HTTP else RobotDriver
+        driver = driver_cls(timeout_ms=self.timeout_ms, task_id=f"watch-{site}")
+        try:
+            entries = driver.collect_catalog_snapshot(watches[0].url, headless=self.headless)
+            error = None if entries else "Catalog was empty"
+        except Exception as exc:  # noqa: BLE001 - recorded on every watch in the group
+            entries, error = [], str(exc)
+        try:
+            columnar = ColumnarCatalog.from_entries(entries) if entries else None
+            for watch in watches:
+                self._evaluate(driver, watch, entries, columnar, error)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+                self._counts["site_runs"] += 1
+        self._log.info("Checked %d watch(es) on %s with one %s extraction", len(watches), site, backend)
+
+    def _evaluate(
+        self,
+        driver: RobotDriver,
+        watch: Watch,
+        entries: List[Dict[str, Any]],
+        columnar: Optional[ColumnarCatalog],
+        error: Optional[str],
+    ) -> None:
+        price: Optional[float] = None
+        matched: Optional[str] = None
+        if error is None:
+            found, matched, price_text = driver._locate_product(
+                watch.product_name,
+                strategy=watch.selection_strategy,
+                params=watch.selection_params,
+                entries=entries,
+                catalog=columnar,
+            )
+            price = driver._parse_price(price_text) if found and price_text else None
+            if price is None:
+                error = f"No price for '{watch.product_name}'"
+
+        event: Optional[PriceEvent] = None
+        with self._lock:
+            watch.checks += 1
+            watch.last_checked = time()
+            watch.last_error = error
+            watch.next_due = monotonic() + watch.interval_seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._counts["watch_checks"] += 1
+            if error is not None:
+                self._counts["errors"] += 1
+            else:
+                side = DIRECTION_BELOW if price <= watch.threshold else DIRECTION_ABOVE
+                crossed = side != watch.side if watch.side is not None else side == DIRECTION_BELOW
+                if crossed:
+                    event = PriceEvent(
+                        watch_id=watch.watch_id,
+                        product_name=watch.product_name,
+                        matched_product=matched,
+                        direction=side,
+                        price=price,
+                        previous_price=watch.last_price,
+                        threshold=watch.threshold,
+                        url=watch.url,
+                    )
+                    self._events.append(event)
+                    self._counts["events"] += 1
+                watch.side = side
+                watch.last_price = price
+                watch.last_product = matched
+
+        if event is not None:
+            self._log.info(
+                "Price watch %s: %s moved %s %.2f (now %.2f)",
+                watch.watch_id,
+                matched,
+                event.direction,
+                watch.threshold,
+                event.price,
+            )
+            if self.on_event is not None:
+                try:
+                    self.on_event(event)
+                except Exception as exc:  # noqa: BLE001 - a bad callback must not stop the monitor
+                    self._log.warning("Price event callback failed: %s", exc)
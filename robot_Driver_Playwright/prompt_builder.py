@@ -0,0 +1,189 @@
+"""Goal-aware catalog summaries for planning prompts.
+
+:class:`CatalogPromptBuilder` decides which catalog entries the planner sees.
+Instead of the first N entries, it ranks every entry by relevance to the goal:
+
+* overlap between the goal's product words and the title;
+* brand, when the goal names one (directly or through a model line such as
+  "iPhone" or "Galaxy") and the entry's vendor or title matches it;
+* price rank among the relevant entries, when the goal asks for the cheapest
+  or most expensive product.
+
+The top entries are packed as ``title|price`` rows until an explicit token
+budget is reached, followed by one line summarising what was left out. Tokens
+are estimated at four characters each, which is close enough for budgeting
+without a tokenizer round trip. Every build is logged with its entry count and
+estimated size.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from robot_Driver_Playwright.driver_logging import get_logger
+from robot_Driver_Playwright.intent_router import STOPWORDS, detect_strategy
+from robot_Driver_Playwright.my_robot_driver import STRATEGY_MAX_PRICE, STRATEGY_MIN_PRICE
+
+DEFAULT_TOKEN_BUDGET = 400
+CHARS_PER_TOKEN = 4
+
+# Goal or title fragment -> brand, for goals that name a product line.
+BRAND_ALIASES: Dict[str, str] = {
+    "iphone": "apple",
+    "ipad": "apple",
+    "macbook": "apple",
+    "apple": "apple",
+    "galaxy": "samsung",
+    "samsung": "samsung",
+    "pixel": "google",
+    "google": "google",
+    "oneplus": "oneplus",
+    "one plus": "oneplus",
+}
+
+KEYWORD_WEIGHT = 2.0
+BRAND_WEIGHT = 1.5
+PRICE_WEIGHT = 1.0
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_log = get_logger(__name__, "prompt-builder")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _brand_of(text: str) -> Optional[str]:
+    lowered = text.lower()
+    for fragment, brand in BRAND_ALIASES.items():
+        if fragment in lowered:
+            return brand
+    return None
+
+
+def _format_price(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+@dataclass
+class CatalogPrompt:
+    """A packed catalog summary and how it was built."""
+
+    text: str
+    entries_included: int
+    entries_total: int
+    estimated_tokens: int
+    token_budget: int
+    build_ms: float
+
+    def stats(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["text"]
+        return data
+
+
+class CatalogPromptBuilder:
+    """Rank catalog entries by relevance to a goal and pack them under a token budget."""
+
+    def __init__(self, *, token_budget: int = DEFAULT_TOKEN_BUDGET) -> None:
+        if token_budget <= 0:
+            raise ValueError("token_budget must be positive")
+        self.token_budget = token_budget
+
+    def build(self, goal: str, catalog: Sequence[Dict[str, Any]]) -> CatalogPrompt:
+        started = perf_counter()
+        ranked = self.rank(goal, catalog)
+
+        header = f"{len(catalog)} products, most relevant first. Columns: title|price"
+        lines = [header]
+        used = estimate_tokens(header)
+        included = 0
+        for entry in ranked:
+            row = f"{str(entry.get('title') or '').replace('|', '/')}|{_format_price(entry.get('price_value'))}"
+            cost = estimate_tokens(row) + 1
+            # Reserve room for the trailer; always show at least one row.
+            if included and used + cost + self._trailer_reserve() > self.token_budget:
+                break
+            lines.append(row)
+            used += cost
+            included += 1
+
+        omitted = ranked[included:]
+        if omitted:
+            prices = [entry["price_value"] for entry in omitted if entry.get("price_value") is not None]
+            trailer = f"(+{len(omitted)} more not shown"
+            if prices:
+                trailer += f", priced {_format_price(min(prices))}-{_format_price(max(prices))}"
+            lines.append(trailer + ")")
+
+        text = "\n".join(lines)
+        prompt = CatalogPrompt(
+            text=text,
+            entries_included=included,
+            entries_total=len(catalog),
+            estimated_tokens=estimate_tokens(text),
+            token_budget=self.token_budget,
+            build_ms=round((perf_counter() - started) * 1000, 3),
+        )
+        _log.info(
+            "Catalog prompt: %d/%d entries, ~%d tokens (budget %d)",
+            prompt.entries_included,
+            prompt.entries_total,
+            prompt.estimated_tokens,
+            prompt.token_budget,
+        )
+        return prompt
+
+    def rank(self, goal: str, catalog: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return ``catalog`` ordered from most to least relevant to ``goal``."""
+
+        goal_tokens = {token for token in _TOKEN_PATTERN.findall(goal.lower()) if token not in STOPWORDS}
+        goal_brand = _brand_of(goal)
+        strategy, _ = detect_strategy(goal)
+
+        scores: List[float] = []
+        for entry in catalog:
+            title = str(entry.get("title") or "").lower()
+            title_tokens = set(_TOKEN_PATTERN.findall(title))
+            score = 0.0
+            if goal_tokens:
+                score += KEYWORD_WEIGHT * len(goal_tokens & title_tokens) / len(goal_tokens)
+            if goal_brand is not None:
+                entry_brand = str(entry.get("vendor") or "").lower() or _brand_of(title)
+                if entry_brand == goal_brand or _brand_of(title) == goal_brand:
+                    score += BRAND_WEIGHT
+            scores.append(score)
+
+        if strategy in (STRATEGY_MIN_PRICE, STRATEGY_MAX_PRICE):
+            self._add_price_rank(catalog, scores, descending=strategy == STRATEGY_MAX_PRICE)
+
+        order = sorted(range(len(catalog)), key=lambda index: (-scores[index], index))
+        return [catalog[index] for index in order]
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _add_price_rank(catalog: Sequence[Dict[str, Any]], scores: List[float], *, descending: bool) -> None:
+        # Rank prices only among entries that already look relevant, so the
+        # cheapest iPhone outranks the cheapest product overall.
+        best = max(scores, default=0.0)
+        pool: List[Tuple[float, int]] = [
+            (entry["price_value"], index)
+            for index, entry in enumerate(catalog)
+            if entry.get("price_value") is not None and (best == 0.0 or scores[index] > 0.0)
+        ]
+        pool.sort(reverse=descending)
+        for rank, (_, index) in enumerate(pool):
+            scores[index] += PRICE_WEIGHT * (1.0 - rank / len(pool))
+
+    @staticmethod
+    def _trailer_reserve() -> int:
+        return estimate_tokens("(+0000 more not shown, priced 00000.00-00000.00)")
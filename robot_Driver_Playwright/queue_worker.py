@@ -0,0 +1,254 @@
+"""Workers that pull driver tasks from a shared :mod:`~robot_Driver_Playwright.work_queue`.
+
+Run one worker process per host, or several, all pointed at the same queue,
+and the API front end only has to enqueue tasks and collect their results.
+Capacity grows by starting more workers, wherever they run.
+
+Each worker runs ``concurrency`` threads. A thread leases one task, runs it,
+and keeps the lease alive by heartbeating every ``heartbeat_seconds`` while
+the run is in progress. If the worker process dies, its heartbeats stop, the
+lease expires after ``lease_seconds``, and another worker picks the task up.
+A run that raises is failed with ``retry``, so it goes back in line until it
+has used the queue's ``max_attempts``. :func:`run_payload` checks the
+payload before running it, and a ``ValueError`` or ``TypeError`` means the
+payload itself is bad, so that task is failed at once. A run that returns
+a result, successful or not, is completed with it.
+
+A task payload holds the ``/run-basic`` request fields. :func:`run_payload` runs
+one through :func:`~robot_Driver_Playwright.http_backend.run_task_on_backend`
+and returns the :class:`~robot_Driver_Playwright.my_robot_driver.RobotDriverResult`
+as a dict.
+
+Usage::
+
+    python -m robot_Driver_Playwright.queue_worker --queue sqlite:///tasks.sqlite
+    python -m robot_Driver_Playwright.queue_worker --queue redis://queue-host:6379/0 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from robot_Driver_Playwright.driver_logging import configure_logging, get_logger
+from robot_Driver_Playwright.http_backend import ALLOWED_BACKENDS, run_task_on_backend
+from robot_Driver_Playwright.my_robot_driver import RobotDriver, SelectionParams
+from robot_Driver_Playwright.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    LeaseLostError,
+    WorkItem,
+    WorkQueue,
+    open_work_queue,
+)
+
+TaskHandler = Callable[[Dict[str, Any], str], Dict[str, Any]]
+
+# Handler errors that another attempt would only repeat.
+PERMANENT_ERRORS = (ValueError, TypeError)
+
+_SELECTION_FIELDS = ("price_min", "price_max", "target_price", "rank", "count")
+_REQUIRED_FIELDS = ("url", "product_name")
+
+
+def run_payload(payload: Dict[str, Any], task_id: str) -> Dict[str, Any]:
+    """Run one ``/run-basic`` payload and return its result as a dict.
+
+    Raises ``ValueError`` before anything runs if the payload is incomplete or
+    asks for an unknown backend, strategy or invalid selection params.
+    """
+
+    missing = [name for name in _REQUIRED_FIELDS if not isinstance(payload.get(name), str) or not payload[name]]
+    if missing:
+        raise ValueError(f"Task payload needs {', '.join(missing)}")
+    backend = payload.get("backend", "browser")
+    if backend not in ALLOWED_BACKENDS:
+        raise ValueError(f"Unsupported backend '{backend}'. Choose from {ALLOWED_BACKENDS}.")
+    selection_params = RobotDriver._validated_params(
+        payload.get("selection_strategy", "match"),
+        SelectionParams(**{name: payload[name] for name in _SELECTION_FIELDS if name in payload}),
+    )
+    result = run_task_on_backend(
+        backend,
+        timeout_ms=payload.get("timeout_ms", 10_000),
+        task_id=task_id,
+        url=payload["url"],
+        product_name=payload["product_name"],
+        headless=payload.get("headless", True),
+        selection_strategy=payload.get("selection_strategy", "match"),
+        selection_params=selection_params,
+    )
+    return asdict(result)
+
+
+class QueueWorker:
+    """Lease tasks from ``queue`` on ``concurrency`` threads and run them with ``handler``."""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        *,
+        worker_id: Optional[str] = None,
+        concurrency: int = 1,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        heartbeat_seconds: Optional[float] = None,
+        poll_seconds: float = 0.5,
+        handler: TaskHandler = run_payload,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        heartbeat_seconds = heartbeat_seconds if heartbeat_seconds is not None else lease_seconds / 3
+        if not 0 < heartbeat_seconds < lease_seconds:
+            raise ValueError("heartbeat_seconds must be positive and shorter than lease_seconds")
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.handler = handler
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"leased": 0, "completed": 0, "errors": 0, "lease_lost": 0, "heartbeats": 0, "running": 0}
+        self._log = get_logger(__name__, self.worker_id)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._loop, name=f"queue-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self._log.info("Worker %s pulling from %s queue on %d threads", self.worker_id, self.queue.backend, self.concurrency)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop leasing; wait up to ``timeout`` for the runs in progress to finish."""
+
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_forever(self) -> None:
+        """Run until SIGINT or SIGTERM, then let the runs in progress finish."""
+
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        self._log.info("Worker %s stopping; finishing %d run(s)", self.worker_id, self.stats()["running"])
+        self.shutdown()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"worker_id": self.worker_id, "concurrency": self.concurrency, **self._stats}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self.queue.lease(self.worker_id, lease_seconds=self.lease_seconds)
+            except Exception as exc:  # noqa: BLE001
+                self._log.warning("Leasing from the queue failed: %s", exc)
+                item = None
+            if item is None:
+                self._stop.wait(self.poll_seconds)
+                continue
+            self._count("leased")
+            self._process(item)
+
+    def _process(self, item: WorkItem) -> None:
+        done = threading.Event()
+        lost = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(item, done, lost), daemon=True)
+        self._count("running")
+        beat.start()
+        try:
+            result = self.handler(item.payload, item.task_id)
+        except Exception as exc:  # noqa: BLE001
+            self._log.exception("Task %s raised on attempt %d", item.task_id, item.attempts)
+            self._count("errors")
+            retry = not isinstance(exc, PERMANENT_ERRORS)
+            self._finish(item, lost, lambda: self.queue.fail(item, f"{type(exc).__name__}: {exc}", retry=retry))
+        else:
+            if self._finish(item, lost, lambda: self.queue.complete(item, result)):
+                self._count("completed")
+        finally:
+            done.set()
+            beat.join()
+            self._count("running", -1)
+
+    def _finish(self, item: WorkItem, lost: threading.Event, action: Callable[[], None]) -> bool:
+        if not lost.is_set():
+            try:
+                action()
+                return True
+            except LeaseLostError:
+                pass
+        # Another worker owns the task now; its result is the one that counts.
+        self._log.warning("Lease on task %s was lost; dropping this worker's result", item.task_id)
+        self._count("lease_lost")
+        return False
+
+    def _heartbeat(self, item: WorkItem, done: threading.Event, lost: threading.Event) -> None:
+        while not done.wait(self.heartbeat_seconds):
+            try:
+                self.queue.heartbeat(item, lease_seconds=self.lease_seconds)
+                self._count("heartbeats")
+            except LeaseLostError:
+                lost.set()
+                return
+            except Exception as exc:  # noqa: BLE001
+                # The lease may still hold; try again on the next beat.
+                self._log.warning("Heartbeat for task %s failed: %s", item.task_id, exc)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pull Robot Driver tasks from a shared work queue")
+    parser.add_argument("--queue", required=True, help="memory://, sqlite:///path or redis://host:port/db")
+    parser.add_argument("--concurrency", type=int, default=1, help="Tasks run at once by this worker")
+    parser.add_argument("--worker-id", help="Defaults to hostname:pid")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--heartbeat-seconds", type=float, help="Defaults to a third of the lease")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_level.upper())
+    worker = QueueWorker(
+        open_work_queue(args.queue),
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        lease_seconds=args.lease_seconds,
+        heartbeat_seconds=args.heartbeat_seconds,
+    )
+    worker.run_forever()
+    worker.queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
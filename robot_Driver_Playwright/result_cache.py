@@ -0,0 +1,150 @@
+"""Stale-while-revalidate cache for task results.
+
+Entries younger than ``fresh_ttl`` are returned as-is. Entries in the
+following ``stale_ttl`` window are still returned immediately, but trigger one
+background recomputation so the next caller sees fresh data. Anything older,
+and any explicit bypass, is computed synchronously.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Set, Tuple, TypeVar
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+T = TypeVar("T")
+
+CACHE_FRESH = "fresh"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+CACHE_BYPASS = "bypass"
+
+_log = get_logger(__name__, "result-cache")
+
+
+@dataclass
+class CacheLookup:
+    """How a value was served from the cache."""
+
+    status: str
+    age_seconds: float
+
+
+@dataclass
+class _Entry(Generic[T]):
+    value: T
+    stored_at: float
+
+
+class StaleWhileRevalidateCache(Generic[T]):
+    """Thread-safe LRU cache with fresh and stale windows."""
+
+    def __init__(
+        self,
+        *,
+        fresh_ttl: float,
+        stale_ttl: float,
+        max_entries: int = 1_024,
+        should_cache: Callable[[T], bool] = lambda value: True,
+        refresh_workers: int = 2,
+    ) -> None:
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._should_cache = should_cache
+        self._entries: "OrderedDict[Hashable, _Entry[T]]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=refresh_workers,
+            thread_name_prefix="cache-refresh",
+        )
+        self._counts = {
+            CACHE_FRESH: 0,
+            CACHE_STALE: 0,
+            CACHE_MISS: 0,
+            CACHE_BYPASS: 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], T],
+        *,
+        bypass: bool = False,
+    ) -> Tuple[T, CacheLookup]:
+        """Return the cached value for ``key`` or compute it."""
+
+        if not bypass:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    age = monotonic() - entry.stored_at
+                    if age <= self.fresh_ttl:
+                        self._entries.move_to_end(key)
+                        self._counts[CACHE_FRESH] += 1
+                        return entry.value, CacheLookup(CACHE_FRESH, age)
+                    if age <= self.fresh_ttl + self.stale_ttl:
+                        self._entries.move_to_end(key)
+                        self._counts[CACHE_STALE] += 1
+                        self._schedule_refresh(key, compute)
+                        return entry.value, CacheLookup(CACHE_STALE, age)
+                    del self._entries[key]
+
+        value = compute()
+        self._store(key, value)
+        with self._lock:
+            self._counts[CACHE_BYPASS if bypass else CACHE_MISS] += 1
+        return value, CacheLookup(CACHE_BYPASS if bypass else CACHE_MISS, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counts,
+                "entries": len(self._entries),
+                "refreshing": len(self._refreshing),
+                "fresh_ttl_seconds": self.fresh_ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _schedule_refresh(self, key: Hashable, compute: Callable[[], T]) -> None:
+        # Caller holds the lock.
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._counts["refreshes"] += 1
+        self._executor.submit(self._refresh, key, compute)
+
+    def _refresh(self, key: Hashable, compute: Callable[[], T]) -> None:
+        try:
+            self._store(key, compute())
+        except Exception as exc:  # noqa: BLE001 - keep serving the stale entry
+            with self._lock:
+                self._counts["refresh_errors"] += 1
+            _log.warning("Background refresh failed for %s: %s", key, exc)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: Hashable, value: T) -> None:
+        if not self._should_cache(value):
+            return
+        with self._lock:
+            self._entries[key] = _Entry(value=value, stored_at=monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
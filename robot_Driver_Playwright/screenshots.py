@@ -0,0 +1,311 @@
+"""Compact screenshots for agents, encoded off the browser thread.
+
+A :class:`ScreenshotCapturer` takes a screenshot of the viewport, a clip
+rectangle or one element, and turns it into a small JPEG or WebP an LLM can
+read cheaply. The browser thread only pays for the raw PNG capture. Decoding,
+downscaling to fit ``max_width`` x ``max_height`` and re-encoding happen on a
+shared worker pool. Pillow releases the GIL while it resizes and encodes, so
+threads are enough. :meth:`ScreenshotCapturer.capture` returns a
+:class:`~concurrent.futures.Future`, and the caller collects the image once
+it has other browser work out of the way.
+
+Before capturing, the capturer hashes the page in the browser: URL, scroll
+position, viewport, serialised DOM and form values. If neither the hash nor
+the requested region has changed since the last capture, the capture is
+skipped and the result says so. Canvas drawing and CSS animations do not
+change the hash; pass ``force=True`` to capture anyway.
+
+Pillow is optional. Without it, Playwright encodes a JPEG on the browser
+thread at the page's CSS size and the image is not downscaled further.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+FORMAT_JPEG = "jpeg"
+FORMAT_WEBP = "webp"
+ALLOWED_FORMATS = [FORMAT_JPEG, FORMAT_WEBP]
+
+DEFAULT_MAX_WIDTH = 800
+DEFAULT_MAX_HEIGHT = 800
+DEFAULT_QUALITY = 60
+DEFAULT_ENCODE_WORKERS = 2
+
+ENCODER_PILLOW = "pillow"
+ENCODER_PLAYWRIGHT = "playwright"
+
+# FNV-1a over everything that changes what a screenshot would show.
+PAGE_HASH_SCRIPT = """
+() => {
+    const parts = [location.href, scrollX, scrollY, innerWidth, innerHeight,
+                   document.documentElement.outerHTML];
+    for (const el of document.querySelectorAll('input, textarea, select')) {
+        parts.push(el.value, el.checked);
+    }
+    const text = parts.join('\\u0001');
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0).toString(16) + ':' + text.length.toString(16);
+}
+"""
+
+_MEDIA_TYPES = {FORMAT_JPEG: "image/jpeg", FORMAT_WEBP: "image/webp"}
+
+_log = get_logger(__name__, "screenshots")
+
+_encoder_lock = threading.Lock()
+_shared_encoder: Optional[ThreadPoolExecutor] = None
+
+
+def _default_encoder() -> ThreadPoolExecutor:
+    # One small pool for every capturer in the process.
+    global _shared_encoder
+    with _encoder_lock:
+        if _shared_encoder is None:
+            _shared_encoder = ThreadPoolExecutor(
+                max_workers=DEFAULT_ENCODE_WORKERS, thread_name_prefix="screenshot-encode"
+            )
+        return _shared_encoder
+
+
+def _pillow_available() -> bool:
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class Screenshot:
+    """One capture, or a record that it was skipped because nothing changed."""
+
+    page_hash: str
+    region: str
+    skipped: bool = False
+    media_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    bytes: int = 0
+    raw_bytes: int = 0
+    capture_ms: float = 0.0
+    encode_ms: float = 0.0
+    encoder: Optional[str] = None
+    data: Optional[bytes] = field(default=None, repr=False)
+
+    def base64(self) -> Optional[str]:
+        return base64.b64encode(self.data).decode("ascii") if self.data else None
+
+    def summary(self) -> str:
+        if self.skipped:
+            return (
+                f"Page unchanged since the last screenshot of the {self.region} "
+                f"(hash {self.page_hash}); no new capture."
+            )
+        where = "off-thread" if self.encoder == ENCODER_PILLOW else "by the browser"
+        return (
+            f"Screenshot of the {self.region}: {self.width}x{self.height} {self.media_type}, "
+            f"{self.bytes} bytes, captured in {self.capture_ms} ms, encoded {where} in {self.encode_ms} ms "
+            f"(hash {self.page_hash})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["data"]
+        return data
+
+
+class ScreenshotCapturer:
+    """Capture, downscale and encode screenshots of one page, skipping unchanged ones."""
+
+    def __init__(
+        self,
+        *,
+        max_width: int = DEFAULT_MAX_WIDTH,
+        max_height: int = DEFAULT_MAX_HEIGHT,
+        image_format: str = FORMAT_JPEG,
+        quality: int = DEFAULT_QUALITY,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if image_format not in ALLOWED_FORMATS:
+            raise ValueError(f"Unsupported screenshot format '{image_format}'. Choose from {ALLOWED_FORMATS}.")
+        if max_width < 1 or max_height < 1:
+            raise ValueError("max_width and max_height must be positive")
+        if not 1 <= quality <= 100:
+            raise ValueError("quality must be between 1 and 100")
+        self.max_width = max_width
+        self.max_height = max_height
+        self.image_format = image_format
+        self.quality = quality
+        self.pillow = _pillow_available()
+        self._executor = executor
+        self._last_key: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self._counts = {
+            "captures": 0,
+            "skipped": 0,
+            "bytes": 0,
+            "raw_bytes": 0,
+            "capture_ms": 0.0,
+            "encode_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def capture(
+        self,
+        page: Any,
+        *,
+        selector: Optional[str] = None,
+        clip: Optional[Dict[str, float]] = None,
+        force: bool = False,
+    ) -> "Future[Screenshot]":
+        """Capture ``page`` on the calling (browser) thread and encode it on a worker.
+
+        ``selector`` limits the capture to the first matching element and
+        ``clip`` to a ``{x, y, width, height}`` rectangle in CSS pixels;
+        without either the viewport is captured. The returned future is
+        already done when the capture was skipped or encoded by Playwright.
+        """
+
+        region = f"element {selector}" if selector else ("clip " + self._clip_text(clip) if clip else "viewport")
+        page_hash = page.evaluate(PAGE_HASH_SCRIPT)
+        key = (page_hash, region)
+        with self._lock:
+            unchanged = key == self._last_key
+            if unchanged and not force:
+                self._counts["skipped"] += 1
+        if unchanged and not force:
+            _log.info("Skipping screenshot of %s: page unchanged (%s)", region, page_hash)
+            return self._done(Screenshot(page_hash=page_hash, region=region, skipped=True))
+
+        started = perf_counter()
+        options: Dict[str, Any] = {"scale": "css", "animations": "disabled"}
+        if self.pillow:
+            options["type"] = "png"
+        else:
+            options.update(type="jpeg", quality=self.quality)
+        if selector:
+            raw = page.locator(selector).first.screenshot(**options)
+        else:
+            raw = page.screenshot(clip=clip, **options) if clip else page.screenshot(**options)
+        capture_ms = round((perf_counter() - started) * 1000, 1)
+
+        shot = Screenshot(page_hash=page_hash, region=region, raw_bytes=len(raw), capture_ms=capture_ms)
+        if not self.pillow:
+            shot.media_type = _MEDIA_TYPES[FORMAT_JPEG]
+            shot.encoder = ENCODER_PLAYWRIGHT
+            shot.data = raw
+            shot.bytes = len(raw)
+            shot.width, shot.height = self._jpeg_size(raw)
+            return self._done(self._finish(shot, key))
+        executor = self._executor or _default_encoder()
+        return executor.submit(self._encode, shot, raw, key)
+
+    def reset(self) -> None:
+        """Forget the last capture, so the next one is taken even if the page is unchanged."""
+
+        with self._lock:
+            self._last_key = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        captures = counts["captures"]
+        return {
+            "captures": captures,
+            "skipped": counts["skipped"],
+            "bytes": counts["bytes"],
+            "raw_bytes": counts["raw_bytes"],
+            "avg_bytes": round(counts["bytes"] / captures) if captures else None,
+            "avg_capture_ms": round(counts["capture_ms"] / captures, 1) if captures else None,
+            "avg_encode_ms": round(counts["encode_ms"] / captures, 1) if captures else None,
+            "format": self.image_format if self.pillow else FORMAT_JPEG,
+            "encoder": ENCODER_PILLOW if self.pillow else ENCODER_PLAYWRIGHT,
+            "max_size": f"{self.max_width}x{self.max_height}",
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _encode(self, shot: Screenshot, raw: bytes, key: Tuple[str, str]) -> Screenshot:
+        from PIL import Image
+
+        started = perf_counter()
+        with Image.open(io.BytesIO(raw)) as image:
+            image = image.convert("RGB")
+            image.thumbnail((self.max_width, self.max_height), Image.Resampling.BILINEAR)
+            out = io.BytesIO()
+            if self.image_format == FORMAT_WEBP:
+                image.save(out, format="WEBP", quality=self.quality, method=2)
+            else:
+                image.save(out, format="JPEG", quality=self.quality, optimize=False)
+            shot.width, shot.height = image.size
+        shot.data = out.getvalue()
+        shot.bytes = len(shot.data)
+        shot.media_type = _MEDIA_TYPES[self.image_format]
+        shot.encoder = ENCODER_PILLOW
+        shot.encode_ms = round((perf_counter() - started) * 1000, 1)
+        return self._finish(shot, key)
+
+    def _finish(self, shot: Screenshot, key: Tuple[str, str]) -> Screenshot:
+        # Only a delivered image makes later captures of the same page redundant.
+        with self._lock:
+            self._last_key = key
+            self._counts["captures"] += 1
+            self._counts["bytes"] += shot.bytes
+            self._counts["raw_bytes"] += shot.raw_bytes
+            self._counts["capture_ms"] += shot.capture_ms
+            self._counts["encode_ms"] += shot.encode_ms
+        _log.info(
+            "Screenshot of %s: %sx%s %s, %d bytes (raw %d), capture %.1f ms, encode %.1f ms",
+            shot.region,
+            shot.width,
+            shot.height,
+            shot.media_type,
+            shot.bytes,
+            shot.raw_bytes,
+            shot.capture_ms,
+            shot.encode_ms,
+        )
+        return shot
+
+    @staticmethod
+    def _done(shot: Screenshot) -> "Future[Screenshot]":
+        future: "Future[Screenshot]" = Future()
+        future.set_result(shot)
+        return future
+
+    @staticmethod
+    def _clip_text(clip: Dict[str, float]) -> str:
+        return f"{clip.get('width')}x{clip.get('height')}+{clip.get('x')}+{clip.get('y')}"
+
+    @staticmethod
+    def _jpeg_size(data: bytes) -> Tuple[Optional[int], Optional[int]]:
+        # Read the frame size from the first SOF marker.
+        index = 2
+        while index + 9 < len(data):
+            if data[index] != 0xFF:
+                index += 1
+                continue
+            marker = data[index + 1]
+            length = int.from_bytes(data[index + 2 : index + 4], "big")
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height = int.from_bytes(data[index + 5 : index + 7], "big")
+                width = int.from_bytes(data[index + 7 : index + 9], "big")
+                return width, height
+            index += 2 + length
+        return None, None
@@ -0,0 +1,226 @@
+"""Site adapters that describe storefront-specific shortcuts.
+
+An adapter tells :class:`RobotDriver` which product keywords map onto filters
+the storefront already offers, and knows how to apply those filters in the
+page. Applying the site's own filter before extraction shrinks the product grid,
+so ``_collect_catalog_entries`` only walks the cards that can possibly match.
+
+Adapters can also name the JSON request that feeds the product grid. When the
+driver sees that response during navigation it reads the catalog straight from
+the payload instead of scraping rendered cards. The same endpoints, together
+with the sign-in call, let :class:`HttpRobotDriver` answer price lookups without
+a browser at all.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+_log = get_logger(__name__, "site-adapters")
+
+
+class SiteAdapter:
+    """Default adapter: no site-side filters, everything is filtered in Python."""
+
+    name = "generic"
+    hosts: Tuple[str, ...] = ()
+    # Keyword fragments (lowercase) mapped to the site's filter value.
+    vendor_filters: Dict[str, str] = {}
+    # URL path fragment of the JSON response that carries the catalog.
+    catalog_response_path: Optional[str] = None
+    # JSON sign-in endpoint and the credentials behind the login drop-downs.
+    signin_path: Optional[str] = None
+    usernames: Tuple[str, ...] = ()
+    passwords: Tuple[str, ...] = ()
+
+    @property
+    def supports_http(self) -> bool:
+        return bool(self.catalog_response_path and self.signin_path and self.usernames)
+
+    def matches_url(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == candidate or host.endswith(f".{candidate}") for candidate in self.hosts)
+
+    def filter_for_keyword(self, keyword: str) -> Optional[str]:
+        """Return the site filter implied by ``keyword``, if exactly one applies."""
+
+        lowered = keyword.strip().lower()
+        if not lowered:
+            return None
+        matches = {value for fragment, value in self.vendor_filters.items() if fragment in lowered}
+        if len(matches) != 1:
+            return None
+        return matches.pop()
+
+    def apply_filter(self, page, filter_value: str, card_selector: str, timeout_ms: int) -> bool:
+        """Apply ``filter_value`` in ``page``; return ``True`` when the grid was narrowed."""
+
+        return False
+
+    def active_filters(self, page) -> List[str]:
+        """Return the site filters currently narrowing the grid in ``page``."""
+
+        return []
+
+    def is_catalog_response(self, url: str) -> bool:
+        if not self.catalog_response_path:
+            return False
+        return self.catalog_response_path in (urlparse(url).path or "")
+
+    def parse_catalog_payload(self, payload: Any) -> Optional[List[Dict[str, Any]]]:
+        """Convert a catalog response body into driver catalog entries."""
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Browserless HTTP access
+    # ------------------------------------------------------------------
+    def http_login(
+        self,
+        session,
+        base_url: str,
+        username_index: int,
+        password_index: int,
+        timeout: float,
+    ) -> Optional[str]:
+        """Sign in through the JSON API; return the user name on success."""
+
+        if not self.supports_http:
+            return None
+        try:
+            username = self.usernames[username_index]
+            password = self.passwords[password_index]
+        except IndexError:
+            return None
+        response = session.post(
+            urljoin(base_url, self.signin_path),
+            json={"userName": username, "password": password},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            return None
+        return username
+
+    def http_fetch_catalog(
+        self,
+        session,
+        base_url: str,
+        username: Optional[str],
+        timeout: float,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch and parse the catalog JSON endpoint."""
+
+        if not self.catalog_response_path:
+            return None
+        response = session.get(
+            urljoin(base_url, self.catalog_response_path),
+            params={"userName": username} if username else None,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return self.parse_catalog_payload(response.json())
+
+
+class BStackDemoAdapter(SiteAdapter):
+    """Vendor checkboxes on the BrowserStack demo storefront."""
+
+    name = "bstackdemo"
+    hosts = ("bstackdemo.com",)
+    vendor_filters = {
+        "iphone": "Apple",
+        "apple": "Apple",
+        "galaxy": "Samsung",
+        "samsung": "Samsung",
+        "pixel": "Google",
+        "google": "Google",
+        "oneplus": "OnePlus",
+        "one plus": "OnePlus",
+    }
+
+    catalog_response_path = "/api/products"
+    signin_path = "/api/signin"
+    usernames = (
+        "demouser",
+        "image_not_loading_user",
+        "existing_orders_user",
+        "fav_user",
+        "locked_user",
+    )
+    passwords = ("testingisfun99",)
+
+    FILTER_CHECKBOX_TEMPLATE = "input[type='checkbox'][value='{value}'] + .checkmark"
+
+    def apply_filter(self, page, filter_value: str, card_selector: str, timeout_ms: int) -> bool:
+        before = page.locator(card_selector).count()
+        try:
+            page.locator(self.FILTER_CHECKBOX_TEMPLATE.format(value=filter_value)).click(
+                timeout=timeout_ms
+            )
+            page.wait_for_function(
+                "([selector, before]) => {"
+                " const count = document.querySelectorAll(selector).length;"
+                " return count > 0 && count !== before; }",
+                arg=[card_selector, before],
+                timeout=timeout_ms,
+            )
+        except PlaywrightTimeoutError:
+            _log.warning("Site filter '%s' did not narrow the product grid", filter_value)
+            return False
+        return True
+
+    def active_filters(self, page) -> List[str]:
+        checked = page.eval_on_selector_all(
+            "input[type='checkbox']:checked", "inputs => inputs.map(input => input.value)"
+        )
+        vendors = set(self.vendor_filters.values())
+        return [value for value in checked if value in vendors]
+
+    def parse_catalog_payload(self, payload: Any) -> Optional[List[Dict[str, Any]]]:
+        products = payload.get("products") if isinstance(payload, dict) else None
+        if not isinstance(products, list):
+            return None
+        entries: List[Dict[str, Any]] = []
+        for product in products:
+            if not isinstance(product, dict) or not product.get("title"):
+                continue
+            try:
+                price_value: Optional[float] = float(product["price"])
+            except (KeyError, TypeError, ValueError):
+                price_value = None
+            currency = product.get("currencyFormat") or "$"
+            vendors = product.get("availableSizes") or []
+            entries.append(
+                {
+                    "title": str(product["title"]).strip(),
+                    "price_text": (
+                        f"{currency}{price_value:.2f}" if price_value is not None else "Price not available"
+                    ),
+                    "price_value": price_value,
+                    "available": bool(product.get("isAvailable", product.get("available", True))),
+                    "vendor": vendors[0] if vendors else None,
+                }
+            )
+        return entries
+
+
+_registry: List[SiteAdapter] = [BStackDemoAdapter()]
+
+
+def register_site_adapter(adapter: SiteAdapter) -> None:
+    """Register ``adapter`` ahead of the built-in adapters."""
+
+    _registry.insert(0, adapter)
+
+
+def adapter_for_url(url: str) -> SiteAdapter:
+    """Return the first registered adapter for ``url``, or the generic adapter."""
+
+    for adapter in _registry:
+        if adapter.matches_url(url):
+            return adapter
+    return SiteAdapter()
@@ -0,0 +1,116 @@
+"""Circuit breaker of :class:`ResilientAnthropicClient` against the local fake Messages API."""
+
+from __future__ import annotations
+
+from time import sleep
+
+import pytest
+from anthropic import Anthropic, APIStatusError
+
+from benchmarks.fake_anthropic import start_fake_anthropic
+from robot_Driver_Playwright.llm_client import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CircuitOpenError,
+    LLMCallPolicy,
+    ResilientAnthropicClient,
+)
+
+RESET_SECONDS = 0.3
+
+
+@pytest.fixture
+def fake_api():
+    server, base_url = start_fake_anthropic()
+    yield server.RequestHandlerClass, base_url
+    server.shutdown()
+
+
+def _client(base_url: str) -> ResilientAnthropicClient:
+    policy = LLMCallPolicy(
+        timeout_seconds=5.0,
+        max_retries=0,
+        breaker_failures=3,
+        breaker_reset_seconds=RESET_SECONDS,
+    )
+    return ResilientAnthropicClient(Anthropic(api_key="test", base_url=base_url), policy)
+
+
+def _ping(client: ResilientAnthropicClient):
+    return client.messages.create(model="fake-model", max_tokens=16, messages=[{"role": "user", "content": "ping"}])
+
+
+def _open_breaker(client: ResilientAnthropicClient, handler) -> None:
+    handler.fail_status = 529
+    for _ in range(client.policy.breaker_failures):
+        with pytest.raises(APIStatusError):
+            _ping(client)
+
+
+def test_breaker_opens_after_consecutive_5xx(fake_api):
+    handler, base_url = fake_api
+    client = _client(base_url)
+
+    _open_breaker(client, handler)
+
+    assert client.breaker.state == BREAKER_OPEN
+    assert not client.available()
+    assert client.stats()["breaker"]["opens"] == 1
+
+
+def test_open_breaker_rejects_without_calling_the_api(fake_api):
+    handler, base_url = fake_api
+    client = _client(base_url)
+    _open_breaker(client, handler)
+    served = handler.calls
+
+    with pytest.raises(CircuitOpenError):
+        _ping(client)
+
+    assert handler.calls == served
+    assert client.stats()["short_circuited"] == 1
+
+
+def test_client_errors_do_not_open_the_breaker(fake_api):
+    handler, base_url = fake_api
+    client = _client(base_url)
+    handler.fail_status = 400
+
+    for _ in range(client.policy.breaker_failures + 1):
+        with pytest.raises(APIStatusError):
+            _ping(client)
+
+    assert client.breaker.state == BREAKER_CLOSED
+
+
+def test_half_open_probe_closes_the_breaker(fake_api):
+    handler, base_url = fake_api
+    client = _client(base_url)
+    _open_breaker(client, handler)
+    handler.fail_status = None
+    sleep(RESET_SECONDS)
+
+    assert client.breaker.state == BREAKER_HALF_OPEN
+    assert client.breaker.allow()
+    # Only one trial call is let through while half-open.
+    assert not client.breaker.allow()
+    client.breaker.release_trial()
+
+    _ping(client)
+
+    assert client.breaker.state == BREAKER_CLOSED
+    assert client.available()
+
+
+def test_failed_probe_reopens_the_breaker(fake_api):
+    handler, base_url = fake_api
+    client = _client(base_url)
+    _open_breaker(client, handler)
+    sleep(RESET_SECONDS)
+
+    with pytest.raises(APIStatusError):
+        _ping(client)
+
+    assert client.breaker.state == BREAKER_OPEN
+    assert client.stats()["breaker"]["opens"] == 2
@@ -0,0 +1,176 @@
+"""Leases, retries and cancellation on the in-process and SQLite work queues (and Redis via fakeredis)."""
+
+from __future__ import annotations
+
+from time import sleep
+
+import pytest
+
+from robot_Driver_Playwright.queue_worker import QueueWorker
+from robot_Driver_Playwright.work_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_LEASED,
+    STATUS_QUEUED,
+    LeaseLostError,
+    MemoryWorkQueue,
+    RedisWorkQueue,
+    SQLiteWorkQueue,
+)
+
+SHORT_LEASE = 0.05
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryWorkQueue()
+    elif request.param == "sqlite":
+        yield SQLiteWorkQueue(str(tmp_path / "tasks.sqlite"))
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        yield RedisWorkQueue(fakeredis.FakeRedis(decode_responses=True))
+
+
+def _expire_lease(queue, worker_id="w1", **enqueue):
+    task_id = queue.enqueue({"n": 1}, **enqueue)
+    item = queue.lease(worker_id, lease_seconds=SHORT_LEASE)
+    sleep(SHORT_LEASE * 2)
+    return task_id, item
+
+
+def test_lease_takes_tasks_in_order(queue):
+    first = queue.enqueue({"n": 1})
+    second = queue.enqueue({"n": 2})
+
+    assert queue.lease("w1").task_id == first
+    assert queue.lease("w2").task_id == second
+    assert queue.lease("w3") is None
+
+
+def test_expired_lease_is_requeued(queue):
+    task_id, _ = _expire_lease(queue)
+
+    assert queue.requeue_expired() == 1
+    assert queue.get(task_id).status == STATUS_QUEUED
+    retaken = queue.lease("w2")
+    assert retaken.task_id == task_id
+    assert retaken.attempts == 2
+    assert retaken.worker_id == "w2"
+
+
+def test_stale_lease_cannot_complete_or_heartbeat(queue):
+    task_id, stale = _expire_lease(queue)
+    current = queue.lease("w2")
+
+    with pytest.raises(LeaseLostError):
+        queue.complete(stale, {"by": "w1"})
+    with pytest.raises(LeaseLostError):
+        queue.heartbeat(stale)
+    queue.complete(current, {"by": "w2"})
+
+    assert queue.get(task_id).result == {"by": "w2"}
+
+
+def test_expiry_after_max_attempts_fails_the_task(queue):
+    task_id, _ = _expire_lease(queue, max_attempts=1)
+
+    queue.requeue_expired()
+
+    item = queue.get(task_id)
+    assert item.status == STATUS_FAILED
+    assert "Lease expired" in item.error
+    assert queue.lease("w2") is None
+
+
+def test_retry_stops_at_max_attempts(queue):
+    task_id = queue.enqueue({"n": 1}, max_attempts=2)
+
+    queue.fail(queue.lease("w1"), "boom", retry=True)
+    assert queue.get(task_id).status == STATUS_QUEUED
+    queue.fail(queue.lease("w1"), "boom again", retry=True)
+
+    item = queue.get(task_id)
+    assert item.status == STATUS_FAILED
+    assert item.attempts == 2
+    assert item.error == "boom again"
+
+
+def test_complete_clears_an_earlier_error(queue):
+    task_id = queue.enqueue({"n": 1})
+    queue.fail(queue.lease("w1"), "boom", retry=True)
+
+    queue.complete(queue.lease("w1"), {"ok": True})
+
+    item = queue.get(task_id)
+    assert item.status == STATUS_DONE
+    assert item.error is None
+    assert item.result == {"ok": True}
+
+
+def test_cancel_only_while_queued(queue):
+    queued = queue.enqueue({"n": 1})
+    leased = queue.enqueue({"n": 2})
+
+    assert queue.cancel(queued, "cancelled")
+    assert queue.get(queued).status == STATUS_FAILED
+    assert queue.get(queued).error == "cancelled"
+    # The cancelled task is out of line; the next lease gets the other one.
+    item = queue.lease("w1")
+    assert item.task_id == leased
+
+    assert not queue.cancel(leased, "too late")
+    assert queue.get(leased).status == STATUS_LEASED
+    queue.complete(item, {"ok": True})
+    assert not queue.cancel(leased, "too late")
+    assert not queue.cancel("unknown", "nothing to cancel")
+
+
+@pytest.mark.parametrize("make_queue", [MemoryWorkQueue, SQLiteWorkQueue], ids=["memory", "sqlite"])
+def test_finished_tasks_expire_after_the_result_ttl(make_queue, tmp_path):
+    args = (str(tmp_path / "tasks.sqlite"),) if make_queue is SQLiteWorkQueue else ()
+    queue = make_queue(*args, result_ttl_seconds=SHORT_LEASE)
+    done = queue.enqueue({"n": 1})
+    waiting = queue.enqueue({"n": 2})
+    queue.complete(queue.lease("w1"), {"ok": True})
+    sleep(SHORT_LEASE * 2)
+
+    queue.requeue_expired()
+
+    assert queue.get(done) is None
+    assert queue.get(waiting).status == STATUS_QUEUED
+
+
+def test_worker_fails_bad_payloads_without_retry(queue):
+    calls = []
+
+    def handler(payload, task_id):
+        calls.append(task_id)
+        raise ValueError("bad payload")
+
+    task_id = queue.enqueue({"n": 1}, max_attempts=3)
+    worker = QueueWorker(queue, handler=handler, poll_seconds=0.01)
+    worker.start()
+    try:
+        assert queue.wait(task_id, 5.0) is not None
+    finally:
+        worker.shutdown()
+
+    assert calls == [task_id]
+    assert queue.get(task_id).status == STATUS_FAILED
+
+
+def test_worker_retries_other_errors(queue):
+    def handler(payload, task_id):
+        raise RuntimeError("flaky")
+
+    task_id = queue.enqueue({"n": 1}, max_attempts=2)
+    worker = QueueWorker(queue, handler=handler, poll_seconds=0.01)
+    worker.start()
+    try:
+        item = queue.wait(task_id, 5.0)
+    finally:
+        worker.shutdown()
+
+    assert item.status == STATUS_FAILED
+    assert item.attempts == 2
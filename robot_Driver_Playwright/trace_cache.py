@@ -0,0 +1,177 @@
+"""Recorded tool traces for goals the agent has already solved.
+
+The part2 agent spends several LLM round trips deciding on a tool sequence
+(navigate, find the cheapest product, click it) that is the same every time
+for a given goal on a given site. :class:`TraceCache` keeps the tool calls of
+each successful run, keyed by the normalised goal and the page it started on
+(host plus path).
+:class:`~robot_Driver_Playwright.part2_mcp_ai_brain.ai_brain_mcp.AIRobotDriver`
+replays a cached trace straight through its tool executor and only calls the
+LLM again if a replayed step fails. A failed replay discards the trace so the
+next successful run records a fresh one.
+
+Traces are optionally persisted to a JSON file, so separate runs of the demo
+script share them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from time import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.catalog_store import site_key
+from robot_Driver_Playwright.driver_logging import get_logger
+
+# Words that do not change what a goal asks for.
+_FILLER_WORDS = {"a", "an", "the", "please", "on", "this", "page", "site", "website", "for", "me", "and", "to"}
+
+_log = get_logger(__name__, "trace-cache")
+
+
+def normalize_goal(goal: str) -> str:
+    """Lower-case ``goal``, drop punctuation and filler words, collapse whitespace."""
+
+    words = re.findall(r"[a-z0-9]+", goal.lower())
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def page_key(url: str) -> str:
+    """Return the host and path of ``url``; query and fragment are ignored."""
+
+    parsed = urlparse(url)
+    path = parsed.path if parsed.netloc else ""
+    return site_key(url) + path.rstrip("/")
+
+
+@dataclass
+class TraceStep:
+    """One recorded tool call."""
+
+    tool: str
+    input: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ToolTrace:
+    """The tool calls of one successful run, plus how many LLM calls it took."""
+
+    goal: str
+    site: str
+    steps: List[TraceStep]
+    llm_calls: int
+    recorded_at: float = field(default_factory=time)
+    replays: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ToolTrace":
+        steps = [TraceStep(**step) for step in data.get("steps", [])]
+        return cls(**{**data, "steps": steps})
+
+
+class TraceCache:
+    """LRU map of (normalised goal, start page) to the :class:`ToolTrace` that solved it."""
+
+    def __init__(self, path: Optional[str] = None, *, max_traces: int = 256) -> None:
+        self.path = path or None
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[Tuple[str, str], ToolTrace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._counts = {"lookups": 0, "hits": 0, "replays_succeeded": 0, "replays_failed": 0, "llm_calls_avoided": 0}
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def lookup(self, goal: str, url: str) -> Optional[ToolTrace]:
+        key = self._key(goal, url)
+        with self._lock:
+            self._counts["lookups"] += 1
+            trace = self._traces.get(key)
+            if trace is not None:
+                self._traces.move_to_end(key)
+                self._counts["hits"] += 1
+            return trace
+
+    def record(self, goal: str, url: str, steps: List[TraceStep], *, llm_calls: int) -> Optional[ToolTrace]:
+        """Store the steps of a successful run; empty traces are ignored."""
+
+        if not steps:
+            return None
+        key = self._key(goal, url)
+        trace = ToolTrace(goal=key[0], site=key[1], steps=list(steps), llm_calls=llm_calls)
+        with self._lock:
+            self._traces[key] = trace
+            self._traces.move_to_end(key)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        _log.info("Recorded %d-step trace for '%s' on %s", len(steps), key[0], key[1])
+        self._save()
+        return trace
+
+    def replay_succeeded(self, trace: ToolTrace) -> None:
+        with self._lock:
+            trace.replays += 1
+            self._counts["replays_succeeded"] += 1
+            self._counts["llm_calls_avoided"] += trace.llm_calls
+        self._save()
+
+    def replay_failed(self, trace: ToolTrace, step_index: int, reason: str) -> None:
+        """Drop ``trace`` after a replayed step failed; the next success re-records it."""
+
+        with self._lock:
+            self._counts["replays_failed"] += 1
+            self._traces.pop((trace.goal, trace.site), None)
+        _log.warning("Replay of '%s' on %s failed at step %d: %s", trace.goal, trace.site, step_index + 1, reason)
+        self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counts["lookups"]
+            return {
+                **self._counts,
+                "hit_rate": round(self._counts["hits"] / lookups, 3) if lookups else 0.0,
+                "traces": len(self._traces),
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _key(goal: str, url: str) -> Tuple[str, str]:
+        return normalize_goal(goal), page_key(url)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                payload = json.load(handle)
+            for data in payload.get("traces", []):
+                trace = ToolTrace.from_dict(data)
+                self._traces[(trace.goal, trace.site)] = trace
+        except (OSError, ValueError, TypeError) as exc:
+            _log.warning("Ignoring unreadable trace cache %s: %s", self.path, exc)
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            with self._lock:
+                payload = {"traces": [trace.to_dict() for trace in self._traces.values()]}
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as handle:
+                    json.dump(payload, handle, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as exc:
+                _log.warning("Could not write trace cache %s: %s", self.path, exc)
@@ -0,0 +1,762 @@
+"""A shared queue of driver tasks with leases, heartbeats and re-queueing.
+
+Front ends :meth:`~WorkQueue.enqueue` task payloads. Workers, in this process
+or in other processes and hosts, :meth:`~WorkQueue.lease` them one at a time.
+A lease lasts ``lease_seconds``; the worker extends it with
+:meth:`~WorkQueue.heartbeat` while the task runs, then calls
+:meth:`~WorkQueue.complete` or :meth:`~WorkQueue.fail`. If a worker dies,
+its heartbeats stop and the lease expires. The next :meth:`~WorkQueue.lease`
+or :meth:`~WorkQueue.requeue_expired` call puts the task back in line, or
+fails it once it has used ``max_attempts`` leases. :meth:`~WorkQueue.cancel`
+fails a task no worker has leased yet. Every lease carries a
+fresh token, so a worker whose lease was taken away cannot overwrite the
+result of the worker that took it over. Done and failed tasks are kept for
+``result_ttl_seconds`` (a day by default) and then dropped by every backend.
+
+Three interchangeable backends:
+
+* :class:`MemoryWorkQueue`: a thread-safe, in-process stand-in for tests and
+  single-process use.
+* :class:`SQLiteWorkQueue`: a SQLite file shared by the processes of one
+  host, or of hosts on one shared file system.
+* :class:`RedisWorkQueue`: any Redis-compatible server (Redis, Valkey,
+  KeyDB, ...), for workers on many hosts. Needs the ``redis`` package.
+
+:func:`open_work_queue` picks one from a URL: ``memory://``,
+``sqlite:///path/to/tasks.sqlite`` or ``redis://host:6379/0``.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from time import sleep, time
+from typing import Any, Deque, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from robot_Driver_Playwright.driver_logging import get_logger
+
+STATUS_QUEUED = "queued"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+DEFAULT_LEASE_SECONDS = 30.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RESULT_TTL_SECONDS = 24 * 3600
+
+_log = get_logger(__name__, "work-queue")
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when a worker's lease expired and the task was re-queued or taken over."""
+
+
+@dataclass
+class WorkItem:
+    """One task and its progress through the queue."""
+
+    task_id: str
+    payload: Dict[str, Any]
+    status: str = STATUS_QUEUED
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    worker_id: Optional[str] = None
+    lease_token: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    enqueued_at: float = field(default_factory=time)
+    updated_at: float = field(default_factory=time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["lease_token"]
+        return data
+
+
+class WorkQueue(ABC):
+    """The operations every backend provides."""
+
+    backend = "base"
+
+    @abstractmethod
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        task_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        """Add a task to the back of the line and return its id."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[WorkItem]:
+        """Take the oldest queued task, or return ``None`` if there is none."""
+
+    @abstractmethod
+    def heartbeat(self, item: WorkItem, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        """Extend ``item``'s lease; raise :class:`LeaseLostError` if it is no longer ours."""
+
+    @abstractmethod
+    def complete(self, item: WorkItem, result: Dict[str, Any]) -> None:
+        """Finish ``item`` with ``result``; raise :class:`LeaseLostError` if it is no longer ours."""
+
+    @abstractmethod
+    def fail(self, item: WorkItem, error: str, *, retry: bool = False) -> None:
+        """Fail ``item``, or put it back in line if ``retry`` and it has attempts left."""
+
+    @abstractmethod
+    def cancel(self, task_id: str, error: str) -> bool:
+        """Fail ``task_id`` if it is still queued; return ``False`` if it is leased, finished or unknown."""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[WorkItem]:
+        """Return the task, or ``None`` if it is unknown (or its result has expired)."""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Re-queue (or fail) every task whose lease has expired; return how many.
+
+        Also drops tasks that finished more than ``result_ttl_seconds`` ago.
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Task counts by status."""
+
+    def close(self) -> None:
+        pass
+
+    def wait(self, task_id: str, timeout: float, *, poll_seconds: float = 0.1) -> Optional[WorkItem]:
+        """Poll until ``task_id`` is done or failed; return it, or ``None`` on timeout or if unknown."""
+
+        deadline = time() + timeout
+        while True:
+            item = self.get(task_id)
+            if item is None or item.finished:
+                return item
+            if time() >= deadline:
+                return None
+            sleep(min(poll_seconds, max(0.0, deadline - time())))
+
+    @staticmethod
+    def _new_token() -> str:
+        return uuid.uuid4().hex
+
+
+# ----------------------------------------------------------------------
+# In-process stand-in
+# ----------------------------------------------------------------------
+class MemoryWorkQueue(WorkQueue):
+    """A queue held in this process; the stand-in for the shared backends."""
+
+    backend = "memory"
+
+    def __init__(self, *, result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS) -> None:
+        self.result_ttl_seconds = result_ttl_seconds
+        self._items: Dict[str, WorkItem] = {}
+        self._queued: Deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        task_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        item = WorkItem(task_id=task_id or uuid.uuid4().hex[:12], payload=payload, max_attempts=max_attempts)
+        with self._lock:
+            self._items[item.task_id] = item
+            self._queued.append(item.task_id)
+        return item.task_id
+
+    def lease(self, worker_id: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[WorkItem]:
+        self.requeue_expired()
+        with self._lock:
+            if not self._queued:
+                return None
+            item = self._items[self._queued.popleft()]
+            item.status = STATUS_LEASED
+            item.attempts += 1
+            item.worker_id = worker_id
+            item.lease_token = self._new_token()
+            item.lease_expires_at = time() + lease_seconds
+            item.updated_at = time()
+            return WorkItem(**asdict(item))
+
+    def heartbeat(self, item: WorkItem, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        with self._lock:
+            current = self._owned(item)
+            current.lease_expires_at = time() + lease_seconds
+            item.lease_expires_at = current.lease_expires_at
+
+    def complete(self, item: WorkItem, result: Dict[str, Any]) -> None:
+        with self._lock:
+            current = self._owned(item)
+            current.status = STATUS_DONE
+            current.result = result
+            current.error = None
+            current.lease_expires_at = None
+            current.updated_at = time()
+
+    def fail(self, item: WorkItem, error: str, *, retry: bool = False) -> None:
+        with self._lock:
+            current = self._owned(item)
+            current.error = error
+            current.lease_expires_at = None
+            current.updated_at = time()
+            if retry and current.attempts < current.max_attempts:
+                current.status = STATUS_QUEUED
+                self._queued.append(current.task_id)
+            else:
+                current.status = STATUS_FAILED
+
+    def cancel(self, task_id: str, error: str) -> bool:
+        with self._lock:
+            current = self._items.get(task_id)
+            if current is None or current.status != STATUS_QUEUED:
+                return False
+            self._queued.remove(task_id)
+            current.status = STATUS_FAILED
+            current.error = error
+            current.updated_at = time()
+            return True
+
+    def get(self, task_id: str) -> Optional[WorkItem]:
+        with self._lock:
+            item = self._items.get(task_id)
+            return WorkItem(**asdict(item)) if item else None
+
+    def requeue_expired(self) -> int:
+        now = time()
+        with self._lock:
+            expired = [
+                item
+                for item in self._items.values()
+                if item.status == STATUS_LEASED and item.lease_expires_at is not None and item.lease_expires_at < now
+            ]
+            for item in expired:
+                _expire(item)
+                if item.status == STATUS_QUEUED:
+                    self._queued.append(item.task_id)
+            cutoff = now - self.result_ttl_seconds
+            for task_id in [t for t, item in self._items.items() if item.finished and item.updated_at < cutoff]:
+                del self._items[task_id]
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {status: 0 for status in (STATUS_QUEUED, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+            for item in self._items.values():
+                counts[item.status] += 1
+        return {"backend": self.backend, **counts}
+
+    def _owned(self, item: WorkItem) -> WorkItem:
+        current = self._items.get(item.task_id)
+        if current is None or current.status != STATUS_LEASED or current.lease_token != item.lease_token:
+            raise LeaseLostError(f"Lease on task {item.task_id} was lost")
+        return current
+
+
+def _expire(item: WorkItem) -> None:
+    # Shared by the in-process backend; SQLite and Redis do the same in SQL and Lua.
+    item.lease_expires_at = None
+    item.updated_at = time()
+    if item.attempts >= item.max_attempts:
+        item.status = STATUS_FAILED
+        item.error = f"Lease expired on attempt {item.attempts} of {item.max_attempts} (worker {item.worker_id})"
+    else:
+        item.status = STATUS_QUEUED
+    _log.warning(
+        "Lease on task %s held by %s expired; %s",
+        item.task_id,
+        item.worker_id,
+        "re-queued" if item.status == STATUS_QUEUED else "failed",
+    )
+
+
+# ----------------------------------------------------------------------
+# SQLite
+# ----------------------------------------------------------------------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_token TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_queued ON tasks (status, seq);
+CREATE INDEX IF NOT EXISTS tasks_leases ON tasks (status, lease_expires_at);
+CREATE INDEX IF NOT EXISTS tasks_finished ON tasks (status, updated_at);
+"""
+
+_SQLITE_COLUMNS = (
+    "task_id, payload, status, attempts, max_attempts, worker_id, lease_token, "
+    "lease_expires_at, result, error, enqueued_at, updated_at"
+)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """A queue in a SQLite file; every state change is one ``BEGIN IMMEDIATE`` transaction."""
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        busy_timeout: float = 30.0,
+        result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS,
+    ) -> None:
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.result_ttl_seconds = result_ttl_seconds
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        task_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        task_id = task_id or uuid.uuid4().hex[:12]
+        now = time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO tasks (task_id, seq, payload, status, max_attempts, enqueued_at, updated_at) "
+                "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM tasks), ?, ?, ?, ?, ?)",
+                (task_id, json.dumps(payload), STATUS_QUEUED, max_attempts, now, now),
+            )
+        return task_id
+
+    def lease(self, worker_id: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[WorkItem]:
+        token = self._new_token()
+        with self._transaction() as conn:
+            self._requeue_expired(conn)
+            row = conn.execute(
+                "SELECT task_id FROM tasks WHERE status = ? ORDER BY seq LIMIT 1", (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time()
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, worker_id = ?, lease_token = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE task_id = ?",
+                (STATUS_LEASED, worker_id, token, now + lease_seconds, now, row[0]),
+            )
+            return self._select(conn, row[0])
+
+    def heartbeat(self, item: WorkItem, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        expires = time() + lease_seconds
+        self._update_owned(item, "lease_expires_at = ?", (expires,))
+        item.lease_expires_at = expires
+
+    def complete(self, item: WorkItem, result: Dict[str, Any]) -> None:
+        self._update_owned(
+            item,
+            "status = ?, result = ?, error = NULL, lease_expires_at = NULL, updated_at = ?",
+            (STATUS_DONE, json.dumps(result), time()),
+        )
+
+    def fail(self, item: WorkItem, error: str, *, retry: bool = False) -> None:
+        with self._transaction() as conn:
+            current = self._select(conn, item.task_id)
+            if current is None or current.status != STATUS_LEASED or current.lease_token != item.lease_token:
+                raise LeaseLostError(f"Lease on task {item.task_id} was lost")
+            requeue = retry and current.attempts < current.max_attempts
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, lease_expires_at = NULL, updated_at = ?, "
+                "seq = CASE WHEN ? THEN (SELECT MAX(seq) + 1 FROM tasks) ELSE seq END WHERE task_id = ?",
+                (STATUS_QUEUED if requeue else STATUS_FAILED, error, time(), requeue, item.task_id),
+            )
+
+    def cancel(self, task_id: str, error: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, updated_at = ? WHERE task_id = ? AND status = ?",
+                (STATUS_FAILED, error, time(), task_id, STATUS_QUEUED),
+            )
+            return cursor.rowcount == 1
+
+    def get(self, task_id: str) -> Optional[WorkItem]:
+        with self._connection() as conn:
+            return self._select(conn, task_id)
+
+    def requeue_expired(self) -> int:
+        with self._transaction() as conn:
+            return self._requeue_expired(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connection() as conn:
+            rows = dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            **{status: rows.get(status, 0) for status in (STATUS_QUEUED, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)},
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so two workers cannot lease the same row.
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _update_owned(self, item: WorkItem, assignments: str, args: tuple) -> None:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE task_id = ? AND status = ? AND lease_token = ?",
+                (*args, item.task_id, STATUS_LEASED, item.lease_token),
+            )
+            if cursor.rowcount != 1:
+                raise LeaseLostError(f"Lease on task {item.task_id} was lost")
+
+    def _requeue_expired(self, conn: sqlite3.Connection) -> int:
+        now = time()
+        expired = conn.execute(
+            "SELECT task_id, worker_id, attempts, max_attempts FROM tasks "
+            "WHERE status = ? AND lease_expires_at < ?",
+            (STATUS_LEASED, now),
+        ).fetchall()
+        for task_id, worker_id, attempts, max_attempts in expired:
+            if attempts >= max_attempts:
+                conn.execute(
+                    "UPDATE tasks SET status = ?, error = ?, lease_expires_at = NULL, updated_at = ? WHERE task_id = ?",
+                    (
+                        STATUS_FAILED,
+                        f"Lease expired on attempt {attempts} of {max_attempts} (worker {worker_id})",
+                        now,
+                        task_id,
+                    ),
+                )
+            else:
+                conn.execute(
+                    "UPDATE tasks SET status = ?, lease_expires_at = NULL, updated_at = ?, "
+                    "seq = (SELECT MAX(seq) + 1 FROM tasks) WHERE task_id = ?",
+                    (STATUS_QUEUED, now, task_id),
+                )
+            _log.warning(
+                "Lease on task %s held by %s expired; %s",
+                task_id,
+                worker_id,
+                "failed" if attempts >= max_attempts else "re-queued",
+            )
+        conn.execute(
+            "DELETE FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+            (STATUS_DONE, STATUS_FAILED, now - self.result_ttl_seconds),
+        )
+        return len(expired)
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, task_id: str) -> Optional[WorkItem]:
+        row = conn.execute(f"SELECT {_SQLITE_COLUMNS} FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        (task_id, payload, status, attempts, max_attempts, worker_id, token, expires, result, error, enqueued, updated) = row
+        return WorkItem(
+            task_id=task_id,
+            payload=json.loads(payload),
+            status=status,
+            attempts=attempts,
+            max_attempts=max_attempts,
+            worker_id=worker_id,
+            lease_token=token,
+            lease_expires_at=expires,
+            result=json.loads(result) if result else None,
+            error=error,
+            enqueued_at=enqueued,
+            updated_at=updated,
+        )
+
+
+# ----------------------------------------------------------------------
+# Redis-compatible
+# ----------------------------------------------------------------------
+# Each state change is one Lua script, so it is atomic on the server.
+# KEYS[1] = queued list, KEYS[2] = lease sorted set, KEYS[3] = task hash.
+_LUA_LEASE = """
+local task_id = redis.call('LPOP', KEYS[1])
+if not task_id then return false end
+local key = ARGV[5] .. task_id
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'status', 'leased', 'worker_id', ARGV[1], 'lease_token', ARGV[2],
+           'lease_expires_at', ARGV[3], 'updated_at', ARGV[4])
+redis.call('ZADD', KEYS[2], ARGV[3], task_id)
+return task_id
+"""
+
+_LUA_HEARTBEAT = """
+if redis.call('HGET', KEYS[3], 'status') ~= 'leased' or redis.call('HGET', KEYS[3], 'lease_token') ~= ARGV[1] then
+  return 0
+end
+redis.call('HSET', KEYS[3], 'lease_expires_at', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+
+# ARGV: token, now, task_id, final status or '' for retry, field, value, result ttl
+_LUA_FINISH = """
+if redis.call('HGET', KEYS[3], 'status') ~= 'leased' or redis.call('HGET', KEYS[3], 'lease_token') ~= ARGV[1] then
+  return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[3])
+redis.call('HDEL', KEYS[3], 'lease_expires_at')
+redis.call('HSET', KEYS[3], ARGV[5], ARGV[6], 'updated_at', ARGV[2])
+if ARGV[5] == 'result' then
+  redis.call('HDEL', KEYS[3], 'error')
+end
+local attempts = tonumber(redis.call('HGET', KEYS[3], 'attempts'))
+local max_attempts = tonumber(redis.call('HGET', KEYS[3], 'max_attempts'))
+if ARGV[4] == '' and attempts < max_attempts then
+  redis.call('HSET', KEYS[3], 'status', 'queued')
+  redis.call('RPUSH', KEYS[1], ARGV[3])
+else
+  redis.call('HSET', KEYS[3], 'status', ARGV[4] == '' and 'failed' or ARGV[4])
+  redis.call('EXPIRE', KEYS[3], ARGV[7])
+end
+return 1
+"""
+
+# ARGV: task_id, now, error, result ttl
+_LUA_CANCEL = """
+if redis.call('HGET', KEYS[3], 'status') ~= 'queued' then
+  return 0
+end
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+redis.call('HSET', KEYS[3], 'status', 'failed', 'error', ARGV[3], 'updated_at', ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return 1
+"""
+
+# ARGV: now, task key prefix, result ttl
+_LUA_REQUEUE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[1])
+for _, task_id in ipairs(expired) do
+  local key = ARGV[2] .. task_id
+  redis.call('ZREM', KEYS[2], task_id)
+  redis.call('HDEL', key, 'lease_expires_at')
+  redis.call('HSET', key, 'updated_at', ARGV[1])
+  local attempts = tonumber(redis.call('HGET', key, 'attempts'))
+  local max_attempts = tonumber(redis.call('HGET', key, 'max_attempts'))
+  if attempts >= max_attempts then
+    local worker = redis.call('HGET', key, 'worker_id') or '?'
+    redis.call('HSET', key, 'status', 'failed', 'error',
+               'Lease expired on attempt ' .. attempts .. ' of ' .. max_attempts .. ' (worker ' .. worker .. ')')
+    redis.call('EXPIRE', key, ARGV[3])
+  else
+    redis.call('HSET', key, 'status', 'queued')
+    redis.call('RPUSH', KEYS[1], task_id)
+  end
+end
+return expired
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """A queue on a Redis-compatible server; ``client`` is a ``redis.Redis``-like object."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        prefix: str = "robot_driver:queue",
+        result_ttl_seconds: int = DEFAULT_RESULT_TTL_SECONDS,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queued_key = f"{prefix}:queued"
+        self._leases_key = f"{prefix}:leases"
+        self._task_prefix = f"{prefix}:task:"
+        self._lease_script = client.register_script(_LUA_LEASE)
+        self._heartbeat_script = client.register_script(_LUA_HEARTBEAT)
+        self._finish_script = client.register_script(_LUA_FINISH)
+        self._cancel_script = client.register_script(_LUA_CANCEL)
+        self._requeue_script = client.register_script(_LUA_REQUEUE)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisWorkQueue":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The Redis work queue requires redis (pip install redis)") from exc
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        *,
+        task_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> str:
+        task_id = task_id or uuid.uuid4().hex[:12]
+        now = time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(
+            self._task_key(task_id),
+            mapping={
+                "payload": json.dumps(payload),
+                "status": STATUS_QUEUED,
+                "attempts": 0,
+                "max_attempts": max_attempts,
+                "enqueued_at": now,
+                "updated_at": now,
+            },
+        )
+        pipe.rpush(self._queued_key, task_id)
+        pipe.execute()
+        return task_id
+
+    def lease(self, worker_id: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[WorkItem]:
+        self.requeue_expired()
+        now = time()
+        task_id = self._lease_script(
+            keys=[self._queued_key, self._leases_key],
+            args=[worker_id, self._new_token(), now + lease_seconds, now, self._task_prefix],
+        )
+        return self.get(_text(task_id)) if task_id else None
+
+    def heartbeat(self, item: WorkItem, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        expires = time() + lease_seconds
+        if not self._heartbeat_script(
+            keys=self._keys(item.task_id),
+            args=[item.lease_token, expires, item.task_id],
+        ):
+            raise LeaseLostError(f"Lease on task {item.task_id} was lost")
+        item.lease_expires_at = expires
+
+    def complete(self, item: WorkItem, result: Dict[str, Any]) -> None:
+        self._finish(item, STATUS_DONE, "result", json.dumps(result))
+
+    def fail(self, item: WorkItem, error: str, *, retry: bool = False) -> None:
+        self._finish(item, "" if retry else STATUS_FAILED, "error", error)
+
+    def cancel(self, task_id: str, error: str) -> bool:
+        return bool(
+            self._cancel_script(
+                keys=self._keys(task_id),
+                args=[task_id, time(), error, self.result_ttl_seconds],
+            )
+        )
+
+    def get(self, task_id: str) -> Optional[WorkItem]:
+        data = {_text(key): _text(value) for key, value in self.client.hgetall(self._task_key(task_id)).items()}
+        if not data:
+            return None
+        return WorkItem(
+            task_id=task_id,
+            payload=json.loads(data["payload"]),
+            status=data["status"],
+            attempts=int(data.get("attempts", 0)),
+            max_attempts=int(data["max_attempts"]),
+            worker_id=data.get("worker_id"),
+            lease_token=data.get("lease_token"),
+            lease_expires_at=float(data["lease_expires_at"]) if data.get("lease_expires_at") else None,
+            result=json.loads(data["result"]) if data.get("result") else None,
+            error=data.get("error"),
+            enqueued_at=float(data["enqueued_at"]),
+            updated_at=float(data["updated_at"]),
+        )
+
+    def requeue_expired(self) -> int:
+        expired = self._requeue_script(
+            keys=[self._queued_key, self._leases_key],
+            args=[time(), self._task_prefix, self.result_ttl_seconds],
+        )
+        for task_id in expired:
+            _log.warning("Lease on task %s expired; re-queued or failed", _text(task_id))
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "prefix": self.prefix,
+            STATUS_QUEUED: self.client.llen(self._queued_key),
+            STATUS_LEASED: self.client.zcard(self._leases_key),
+        }
+
+    def close(self) -> None:
+        self.client.close()
+
+    def _finish(self, item: WorkItem, status: str, field_name: str, value: str) -> None:
+        if not self._finish_script(
+            keys=self._keys(item.task_id),
+            args=[item.lease_token, time(), item.task_id, status, field_name, value, self.result_ttl_seconds],
+        ):
+            raise LeaseLostError(f"Lease on task {item.task_id} was lost")
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self._task_prefix}{task_id}"
+
+    def _keys(self, task_id: str) -> list:
+        return [self._queued_key, self._leases_key, self._task_key(task_id)]
+
+
+def _text(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ----------------------------------------------------------------------
+# Factory
+# ----------------------------------------------------------------------
+def open_work_queue(url: str) -> WorkQueue:
+    """Open a queue from ``memory://``, ``sqlite:///path`` or ``redis://...`` (also ``rediss://``)."""
+
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryWorkQueue()
+    if scheme == "sqlite":
+        # As in SQLAlchemy: sqlite:///tasks.sqlite is relative, sqlite:////var/tasks.sqlite absolute.
+        path = url[len("sqlite:///") :] if url.startswith("sqlite:///") else ""
+        if not path:
+            raise ValueError("sqlite work queue URL needs a path, e.g. sqlite:///tasks.sqlite")
+        return SQLiteWorkQueue(path)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisWorkQueue.from_url(url)
+    raise ValueError(f"Unsupported work queue URL '{url}'. Use memory://, sqlite:///path or redis://host:port/db.")